@@ -102,6 +102,7 @@ class AIPlayer(Player):
     def getMove(self, currentState):
         legalMoves = listAllLegalMoves(currentState)
         hill = getConstrList(currentState, self.playerId, [(ANTHILL)])[0].coords
+        bestPaths = {} #the path each ant should take, found once per ant
         for move in legalMoves:
             if(move.moveType == MOVE_ANT):
                 ant = getAntAt(currentState, move.coordList[0])#retrieve ant object
@@ -129,17 +130,13 @@ class AIPlayer(Player):
                         enemyQueen = getAntList(currentState, (not self.playerId), [(QUEEN)])[0].coords
                         endPoint = enemyQueen
 
-                    possiblePaths = listAllMovementPaths(currentState, antCoords, 2)
-                    steps = 100
-                    finalPath = None
-                    #find the fastest path to the end point
-                    for path in possiblePaths:
-                        pathEndCoord = path[-1]#look last coord in path
-                        stepsToEnd = stepsToReach(currentState, pathEndCoord, endPoint)
-                        if(stepsToEnd < steps):
-                            steps = stepsToEnd
-                            finalPath = path
-                    if(move.coordList == finalPath):
+                    if(endPoint == None):#nowhere to go
+                        continue
+                    #find the fastest path to the end point (looking two
+                    #steps ahead, as this player always has)
+                    if(antCoords not in bestPaths):
+                        bestPaths[antCoords] = bestMoveToward(currentState, ant, endPoint, 2).coordList
+                    if(move.coordList == bestPaths[antCoords]):
                         return move
             #build move
             elif(move.moveType == BUILD):
@@ -0,0 +1,513 @@
+import random, math, time, multiprocessing
+from Player import *
+from Constants import *
+from Ant import UNIT_STATS
+from Move import Move
+from AIPlayerUtils import *
+from MoveEngine import applyMove, undoMove
+from CompactState import CompactState
+from SearchTimer import MoveClock
+
+#
+# MCTS.py
+#
+# A Monte Carlo Tree Search player.  Instead of searching every move to a
+# fixed depth it grows a tree one node at a time, choosing which branch to
+# explore with UCT (the average result of a move plus a bonus for moves that
+# have been tried less often), and values each new node by playing the game
+# out from it with a fast, simple policy (a rollout).
+#
+# Rollouts apply and undo moves on a single state (see MoveEngine) and only
+# look at a handful of moves each turn, so many can be run per move.  They
+# can optionally be run in a pool of worker processes.  The tree is kept
+# between calls to getMove and the part below the new position reused.
+#
+
+# how many rollouts to run per move
+ROLLOUTS = 200
+# how many rollouts to run from each new node (they are averaged)
+ROLLOUT_BATCH = 4
+# how many turns a rollout plays before the position is scored
+ROLLOUT_TURNS = 20
+# UCT exploration constant
+EXPLORATION = 1.4
+# chance that a rollout moves an ant somewhere at random
+RANDOM_MOVE_CHANCE = 0.1
+# chance that a rollout builds a drone when it can afford one
+DRONE_CHANCE = 0.3
+# run each batch of rollouts in a pool of worker processes
+PARALLEL_ROLLOUTS = False
+# how many worker processes to use (None for one per CPU)
+ROLLOUT_PROCESSES = None
+# how many plies below the old root to look for the new position
+REUSE_DEPTH = 4
+
+# a representation of a 'node' in the search tree
+treeNode = {
+    # the Move that leads to this node from its parent
+    "move"      : None,
+    # the player who made the move
+    "player"    : None,
+    # the parent node
+    "parent"    : None,
+    # the expanded children
+    "children"  : None,
+    # moves that have no child yet (None until the node is first visited)
+    "untried"   : None,
+    # the number of rollouts through this node
+    "visits"    : 0,
+    # the sum of their results, from the point of view of "player"
+    "wins"      : 0.0,
+    # the winner of the game at this node (None if it isn't over)
+    "winner"    : None,
+    # the hash of the state at this node
+    "hash"      : None
+}
+
+##
+# getWinner
+#
+# Description: Checks whether the game is over (the same tests as
+#   Game.hasWon)
+#
+# Parameters:
+#   state - The GameState to check
+#
+# Return: The id of the winning player, or None
+##
+def getWinner(state):
+    for playerId in (PLAYER_ONE, PLAYER_TWO):
+        inv = state.inventories[playerId]
+        enemyInv = state.inventories[1 - playerId]
+        enemyHill = enemyInv.getAnthill()
+        if enemyInv.getQueen() is None or inv.foodCount >= FOOD_GOAL or \
+           (enemyHill is not None and enemyHill.captureHealth <= 0) or \
+           (enemyInv.foodCount == 0 and len(enemyInv.ants) == 1):
+            return playerId
+    return None
+
+##
+# scoreState
+#
+# Description: Scores a position a rollout stopped in before the game ended
+#   by the food and queen health of each player
+#
+# Parameters:
+#   state - The GameState to score
+#   playerId - The player to score it for
+#
+# Return: A score between 0.0 (lost) and 1.0 (won)
+##
+def scoreState(state, playerId):
+    playerInv = state.inventories[playerId]
+    enemyInv = state.inventories[1 - playerId]
+    food = (playerInv.foodCount - enemyInv.foodCount) / float(FOOD_GOAL)
+    health = 0.0
+    for inv, sign in ((playerInv, 1), (enemyInv, -1)):
+        queen = inv.getQueen()
+        if queen is not None:
+            health += sign * queen.health / float(UNIT_STATS[QUEEN][HEALTH])
+    score = 0.5 + 0.35 * food + 0.15 * health
+    return min(1.0, max(0.0, score))
+
+##
+# closest
+#
+# Return: the coordinates in targets that an ant at coords can reach soonest
+#   (None if targets is empty)
+##
+def closest(state, coords, targets):
+    best = None
+    bestSteps = None
+    for target in targets:
+        steps = stepsToReach(state, coords, target)
+        if best is None or steps < bestSteps:
+            best = target
+            bestSteps = steps
+    return best
+
+##
+# rolloutTurn
+#
+# Description: Plays one turn for the player whose turn it is with the
+#   rollout policy: build a worker (or sometimes a drone) when one can be
+#   afforded, move the queen off the anthill, send workers between food and
+#   home and everything else at the enemy queen, then end the turn
+#
+# Parameters:
+#   state - The GameState to play on (modified in place)
+#   rnd - A random.Random
+#   undos - A list that the undo record of each move is appended to
+#
+# Return: The winner if the game ended during the turn, otherwise None
+##
+def rolloutTurn(state, rnd, undos):
+    playerId = state.whoseTurn
+    playerInv = state.inventories[playerId]
+    enemyInv = state.inventories[1 - playerId]
+
+    # build on the anthill if it is free
+    hill = playerInv.getAnthill()
+    if hill is not None and getAntAt(state, hill.coords) is None:
+        workers = len(playerInv.getEntitiesOfType(WORKER))
+        buildType = None
+        if workers < 2 and playerInv.foodCount >= UNIT_STATS[WORKER][COST]:
+            buildType = WORKER
+        elif playerInv.foodCount >= UNIT_STATS[DRONE][COST] and rnd.random() < DRONE_CHANCE:
+            buildType = DRONE
+        if buildType is not None:
+            undos.append(applyMove(state, Move(BUILD, [hill.coords], buildType)))
+
+    foods = [food.coords for food in getConstrList(state, NEUTRAL, (FOOD,))]
+    homes = [constr.coords for constr in getConstrList(state, playerId, (ANTHILL, TUNNEL))]
+    enemyQueen = enemyInv.getQueen()
+
+    for ant in list(playerInv.ants):
+        if ant.hasMoved:
+            continue
+        movement = UNIT_STATS[ant.type][MOVEMENT]
+
+        if ant.type == QUEEN:
+            # the queen only moves to keep the anthill free
+            if hill is None or ant.coords != hill.coords:
+                continue
+            paths = [path for path in listAllMovementDestinations(state, ant.coords, movement, True)
+                     if getConstrAt(state, path[-1]) is None]
+            if not paths:
+                continue
+            move = Move(MOVE_ANT, rnd.choice(paths), None)
+
+        elif rnd.random() < RANDOM_MOVE_CHANCE:
+            move = Move(MOVE_ANT, rnd.choice(listAllMovementDestinations(state, ant.coords, movement)), None)
+
+        else:
+            if ant.type == WORKER:
+                if ant.carrying:
+                    target = closest(state, ant.coords, homes)
+                else:
+                    target = closest(state, ant.coords, foods)
+            elif enemyQueen is not None:
+                target = enemyQueen.coords
+            else:
+                target = None
+            # stay put on the target (food is picked up and dropped off at
+            # the end of the turn)
+            if target is None or ant.coords == target:
+                continue
+            move = bestMoveToward(state, ant, target)
+
+        undos.append(applyMove(state, move))
+        winner = getWinner(state)
+        if winner is not None:
+            return winner
+
+    undos.append(applyMove(state, Move(END, None, None)))
+    return getWinner(state)
+
+##
+# rollout
+#
+# Description: Plays the game out from a state with the rollout policy and
+#   puts the state back the way it was
+#
+# Parameters:
+#   state - The GameState to play from (restored before returning)
+#   playerId - The player to score the result for
+#   rnd - A random.Random
+#
+# Return: 1.0 for a win, 0.0 for a loss or the scoreState of the position
+#   reached after ROLLOUT_TURNS turns
+##
+def rollout(state, playerId, rnd):
+    undos = []
+    try:
+        for turn in xrange(ROLLOUT_TURNS):
+            winner = rolloutTurn(state, rnd, undos)
+            if winner is not None:
+                return 1.0 if winner == playerId else 0.0
+        return scoreState(state, playerId)
+    finally:
+        for undo in reversed(undos):
+            undoMove(state, undo)
+
+##
+# _rolloutBatch
+#
+# runs in a worker process: plays several rollouts from a packed state
+#
+# Parameters:
+#    task - (packed state, player id, number of rollouts, random seed)
+#
+# Return: the sum of the rollout results
+def _rolloutBatch(task):
+    stateData, playerId, count, seed = task
+    state = CompactState.deserialize(stateData).toGameState()
+    rnd = random.Random(seed)
+    return sum([rollout(state, playerId, rnd) for i in xrange(count)])
+
+##
+#AIPlayer
+#Description: The responsbility of this class is to interact with the game by
+#deciding a valid move based on a given game state. This class has methods that
+#will be implemented by students in Dr. Nuxoll's AI course.
+#
+#Variables:
+#   playerId - The id of the player.
+##
+class AIPlayer(Player):
+
+    #__init__
+    #Description: Creates a new Player
+    #
+    #Parameters:
+    #   inputPlayerId - The id to give the new player (int)
+    ##
+    def __init__(self, inputPlayerId):
+        super(AIPlayer,self).__init__(inputPlayerId, "Monte Carlo")
+
+        # search settings (see the constants above)
+        self.rollouts = ROLLOUTS
+        self.rolloutBatch = ROLLOUT_BATCH
+        self.useParallelRollouts = PARALLEL_ROLLOUTS
+        self.pool = None
+        self.random = random.Random()
+
+        # the tree from the last move (reused when the game reaches one of
+        # its positions)
+        self.root = None
+
+        # time control (the rollouts stop early if the move runs out of time)
+        self.clock = MoveClock()
+
+        # statistics on the last search
+        self.rolloutCount = 0
+        self.reusedVisits = 0
+        self.searchTime = 0.0
+
+    ##
+    #getPlacement
+    #
+    #Description: called during setup phase for each Construction that
+    #   must be placed by the player.  These items are: 1 Anthill on
+    #   the player's side; 1 tunnel on player's side; 9 grass on the
+    #   player's side; and 2 food on the enemy's side.
+    #
+    #Parameters:
+    #   currentState - the state of the game at this point in time.
+    #
+    #Return: The coordinates of where the construction is to be placed
+    ##
+    def getPlacement(self, currentState):
+        self.root = None
+        if currentState.phase == SETUP_PHASE_1:    #stuff on my side
+            rows = range(0, 4)
+            numToPlace = 11
+        elif currentState.phase == SETUP_PHASE_2:   #stuff on foe's side
+            rows = range(6, 10)
+            numToPlace = 2
+        else:
+            return [(0, 0)]
+
+        moves = []
+        while len(moves) < numToPlace:
+            x = random.randint(0, 9)
+            y = random.choice(rows)
+            if currentState.board[x][y].constr == None and (x, y) not in moves:
+                moves.append((x, y))
+        return moves
+
+    ##
+    #getMove
+    #Description: Grows the search tree from the current state until the
+    #   rollouts are used up or the move runs out of time and returns the most
+    #   visited move
+    #
+    #Parameters:
+    #   currentState - The state of the current game waiting for the player's
+    #       move (GameState)
+    #
+    #Return: The Move to be made
+    ##
+    def getMove(self, currentState):
+        started = time.time()
+        deadline = self.clock.startMove(currentState)
+        self.searchState = currentState.fastclone()
+        self.root = self.findRoot(self.searchState)
+        self.reusedVisits = self.root["visits"]
+        self.rolloutCount = 0
+
+        try:
+            # always run at least one iteration so the root has a child
+            self.runIteration()
+            while self.rolloutCount < self.rollouts and deadline.remaining() > 0:
+                self.runIteration()
+        finally:
+            self.clock.endMove()
+        self.searchTime = time.time() - started
+
+        best = max(self.root["children"], key=lambda child: child["visits"])
+        return best["move"]
+
+    ##
+    #findRoot
+    #Description: Looks for the state in the tree kept from the last move
+    #   (a few plies below its root) so that its statistics can be reused
+    #
+    #Parameters:
+    #   state - The state to search from
+    #
+    #Return: The node for the state (a new node if it wasn't found)
+    ##
+    def findRoot(self, state):
+        stateHash = state.getHash()
+        if self.root is not None:
+            level = [self.root]
+            for depth in xrange(REUSE_DEPTH + 1):
+                nextLevel = []
+                for node in level:
+                    if node["hash"] == stateHash:
+                        node["parent"] = None
+                        node["move"] = None
+                        return node
+                    nextLevel.extend(node["children"] or [])
+                level = nextLevel
+
+        root = treeNode.copy()
+        root["children"] = []
+        root["hash"] = stateHash
+        return root
+
+    ##
+    #runIteration
+    #Description: One round of the search: selects a node with UCT, expands
+    #   one of its untried moves, runs a batch of rollouts from the new node
+    #   and adds the results to every node on the way back to the root
+    ##
+    def runIteration(self):
+        state = self.searchState
+        node = self.root
+        undos = []
+
+        # selection: walk down through nodes with no untried moves
+        while node["winner"] is None:
+            if node["untried"] is None:
+                node["untried"] = listAllLegalMoves(state, True)
+                self.random.shuffle(node["untried"])
+            if node["untried"]:
+                break
+            node = self.selectChild(node)
+            undos.append(applyMove(state, node["move"]))
+
+        # expansion: add a child for one untried move
+        if node["winner"] is None:
+            move = node["untried"].pop()
+            child = treeNode.copy()
+            child["move"] = move
+            child["player"] = state.whoseTurn
+            child["parent"] = node
+            child["children"] = []
+            undos.append(applyMove(state, move))
+            child["hash"] = state.getHash()
+            child["winner"] = getWinner(state)
+            node["children"].append(child)
+            node = child
+
+        # simulation
+        if node["winner"] is not None:
+            count = self.rolloutBatch
+            total = count * (1.0 if node["winner"] == self.playerId else 0.0)
+        else:
+            count, total = self.runRollouts(state)
+        self.rolloutCount += count
+
+        for undo in reversed(undos):
+            undoMove(state, undo)
+
+        # backpropagation (each node keeps results for the player who moved
+        # into it)
+        while node is not None:
+            node["visits"] += count
+            if node["player"] == self.playerId:
+                node["wins"] += total
+            else:
+                node["wins"] += count - total
+            node = node["parent"]
+
+    ##
+    #selectChild
+    #
+    #Return: the child of a node with the highest UCT value
+    ##
+    def selectChild(self, node):
+        logVisits = math.log(node["visits"])
+        def uct(child):
+            return child["wins"] / child["visits"] + \
+                   EXPLORATION * math.sqrt(logVisits / child["visits"])
+        return max(node["children"], key=uct)
+
+    ##
+    #runRollouts
+    #Description: Runs a batch of rollouts from a state, in the worker
+    #   processes if parallel rollouts are on
+    #
+    #Parameters:
+    #   state - The state to play from
+    #
+    #Return: (the number of rollouts, the sum of their results)
+    ##
+    def runRollouts(self, state):
+        count = self.rolloutBatch
+        if not self.useParallelRollouts:
+            return count, sum([rollout(state, self.playerId, self.random) for i in xrange(count)])
+
+        if self.pool is None:
+            self.processes = ROLLOUT_PROCESSES
+            if self.processes is None:
+                self.processes = multiprocessing.cpu_count()
+            self.pool = multiprocessing.Pool(self.processes)
+        workers = self.processes
+        stateData = CompactState.fromGameState(state).serialize()
+        tasks = [(stateData, self.playerId, count / workers + (i < count % workers),
+                  self.random.getrandbits(32))
+                 for i in xrange(min(workers, count))]
+        return count, sum(self.pool.map(_rolloutBatch, tasks))
+
+    ##
+    #getSearchStats
+    #
+    #Return: a dictionary with the rollouts run by the last search, the
+    #   visits it kept from the tree of the move before and its speed
+    ##
+    def getSearchStats(self):
+        return { "rollouts" : self.rolloutCount,
+                 "reused_visits" : self.reusedVisits,
+                 "root_visits" : self.root["visits"],
+                 "root_children" : len(self.root["children"]),
+                 "seconds" : self.searchTime,
+                 "rollouts_per_second" : self.rolloutCount / max(self.searchTime, 1e-6) }
+
+    ##
+    #getAttack
+    #Description: Gets the attack to be made from the Player
+    #
+    #Parameters:
+    #   currentState - A clone of the current state (GameState)
+    #   attackingAnt - The ant currently making the attack (Ant)
+    #   enemyLocation - The Locations of the Enemies that can be attacked (Location[])
+    ##
+    def getAttack(self, currentState, attackingAnt, enemyLocations):
+        #Attack a random enemy.
+        return enemyLocations[random.randint(0, len(enemyLocations) - 1)]
+
+    ##
+    #registerWin
+    #Description: The last method, registerWin, is called when the game ends and simply
+    #indicates to the AI whether it has won or lost the game. This is to help with
+    #learning algorithms to develop more successful strategies.
+    #
+    #Parameters:
+    #   hasWon - True if the player has won the game, False if the player lost. (Boolean)
+    #
+    def registerWin(self, hasWon):
+        self.root = None
+        self.clock.reset()
@@ -1,8 +1,16 @@
-import math, heapq
+import math, time, random
 from Player import *
-from Construction import Construction
-from Ant import Ant
 from AIPlayerUtils import *
+from MoveEngine import applyMove, undoMove, isQuietMove
+from TranspositionTable import *
+from SearchTimer import MoveClock, iterativeDeepening
+from MoveOrdering import historyKey
+from ParallelSearch import RootSearchPool, LazySMPSearch, PonderSearch
+from EvaluationCache import cachedEvaluation
+from IncrementalEval import IncrementalScore, closenessTable, toFixed, fromFixed
+from BeamWidth import FixedBeam
+from TurnPlanner import TurnPlanner
+from SelectiveSearch import SelectiveSearch, nullWindow, failsToImprove, LMR_REDUCTION
 
 # set constants
 
@@ -13,22 +21,84 @@ FOOD_WEIGHT = 1000
 DISTANCE_WEIGHT = 250
 CARRY_WEIGHT = 500
 QUEEN_EDGE_WEIGHT = 200
+# how many children to search below each node when the beam isn't adaptive
+# (see SelectiveSearch)
 SET_POOL = 4
+# look positions up in a transposition table before expanding them
+USE_TRANSPOSITIONS = True
+# memory cap for the transposition table
+TRANSPOSITION_BYTES = 16 * 1024 * 1024
+# deepen the search until the move's time runs out (see SearchTimer) rather
+# than always searching to MAX_DEPTH
+USE_TIME_BUDGET = True
+# the deepest an iterative deepening search will go
+DEPTH_LIMIT = 12
+# search the root moves in a pool of worker processes (see ParallelSearch)
+PARALLEL_ROOT = False
+# how many worker processes to use (None for one per CPU)
+ROOT_PROCESSES = None
+# run the whole search in several worker processes sharing a transposition
+# table (Lazy SMP, see ParallelSearch)
+LAZY_SMP = False
+# how many Lazy SMP workers to use (None for one per CPU)
+SMP_WORKERS = None
+# the most a Lazy SMP helper's random jitter adds to a child's value when
+# ordering moves
+ORDER_JITTER = 0.01
+# the memory a search's nodes are expected to stay within (see SearchNode)
+SEARCH_MEMORY_CEILING = 16 * 1024 * 1024
+# plan whole turns and search over turns rather than single moves (see
+# TurnPlanner); the rest of a turn's moves follow the plan made at its start
+USE_TURN_PLANNER = False
+# how many turns the turn search looks ahead without a time budget, and the
+# most it deepens to with one
+TURN_DEPTH = 2
+TURN_LIMIT = 6
+# go on searching in a worker process while the opponent takes its turn
+# (pondering, see ParallelSearch.PonderSearch).  The worker and this player
+# share a transposition table, so the move search that follows finds what
+# the worker searched.  Not used by the turn planner.
+PONDER = False
 
-# a representation of a 'node' in the search tree
-treeNode = {
-    # backreference to parent node
-    "parent"            : None,
-    # the Move that would be taken in the given state from the parent node
-    "move"              : None,
-    # the state that would be reached by taking the above move
-    "potential_state"   : None,
-    # an evaluation of the potential_state
-    "state_value"       : 0.0,
-    # alpha/beta values for minimax
-    "alpha"             : -INFINITY,
-    "beta"              : INFINITY,
-}
+# the name of the WorkerScore on a state
+WORKER_SCORE = "MiniMax.workers"
+
+##
+# WorkerScore
+#
+# Description: The part of evaluateState that depends on each worker: a
+#   bonus for carrying food and a bonus for being close to the worker's goal
+#   (food, or its anthill or tunnel when carrying), kept as a running total
+#   (see IncrementalEval)
+#
+# Variables:
+#   foodTable - Closeness to the nearest food for every cell
+#   homeTables - Closeness to the nearest of each player's anthill and tunnels
+##
+class WorkerScore(IncrementalScore):
+
+    refreshTypes = (ANTHILL, TUNNEL)
+
+    def __init__(self, foodCoords):
+        IncrementalScore.__init__(self, WORKER_SCORE)
+        self.foodTable = closenessTable(foodCoords, DISTANCE_WEIGHT)
+        self.homeTables = None
+        self.carryBonus = toFixed(CARRY_WEIGHT)
+
+    def refresh(self):
+        self.homeTables = [closenessTable([c.coords for c in
+                                           getConstrList(self.state, playerId, (ANTHILL, TUNNEL))],
+                                          DISTANCE_WEIGHT)
+                           for playerId in (PLAYER_ONE, PLAYER_TWO)]
+        IncrementalScore.refresh(self)
+
+    def antTerm(self, ant):
+        if ant.type != WORKER:
+            return 0
+        x, y = ant.coords
+        if ant.carrying:
+            return self.carryBonus + self.homeTables[ant.player][x][y]
+        return self.foodTable[x][y]
 
 ##
 # AIPlayer
@@ -40,7 +110,7 @@ treeNode = {
 # Variables:
 #    playerId - The id of the player.
 ##
-class AIPlayer(Player):
+class AIPlayer(SelectiveSearch, Player):
 
     ##
     # __init__
@@ -56,222 +126,430 @@ class AIPlayer(Player):
 
         # initialize our food location tracker to be empty
         self.foodList = []
+
+        # search settings (see the constants above)
+        self.maxDepth = MAX_DEPTH
+        self.useTranspositions = USE_TRANSPOSITIONS
+
+        # results are kept from move to move; the table is bounded so old
+        # positions are replaced as the game goes on
+        self.transpositions = TranspositionTable(TRANSPOSITION_BYTES)
+        self.nodeCount = 0
+        self.tableCutoffs = 0
+
+        # the selective search settings (see SelectiveSearch), with SET_POOL
+        # children searched below each node unless the beam is adaptive
+        self.initSearch(SEARCH_MEMORY_CEILING, FixedBeam(SET_POOL))
+
+        # the turn planner and the moves left of the plan for this turn, each
+        # with the hash of the state it is to be made from
+        self.useTurnPlanner = USE_TURN_PLANNER
+        self.turnDepth = TURN_DEPTH
+        self.planner = TurnPlanner(inputPlayerId, self.evaluateForPlayer)
+        self.turnPlan = []
+
+        # the root of the search tree and the hash of the root's position
+        self.rootNode = None
+        self.rootKey = None
+
+        # parallel root search (the pool is started on first use)
+        self.useParallelRoot = PARALLEL_ROOT
+        self.rootPool = None
+
+        # Lazy SMP (the workers are started on first use) and the move order
+        # jitter of a helper worker
+        self.useLazySMP = LAZY_SMP
+        self.smp = None
+        self.orderingJitter = 0.0
+        self.jitterRandom = random.Random()
+
+        # pondering (the worker is started on first use), how often the
+        # worker's best move was the move the opponent made, the nodes it
+        # searched and the depth it last completed
+        self.usePondering = PONDER
+        self.ponder = None
+        self.ponderHits = 0
+        self.ponderMisses = 0
+        self.ponderNodes = 0
+        self.ponderDepth = None
+
+        # time control
+        self.useTimeBudget = USE_TIME_BUDGET
+        self.clock = MoveClock()
+        self.deadline = None
+        self.completedDepth = None
     
     ##
-    # evaluateNodes
+    # exploreTree
+    #
+    # Description: Searches the move tree below a node with alpha/beta
+    #   pruning.  Values are from this player's point of view: this player
+    #   maximizes and the opponent minimizes.  Only the children that look
+    #   best for the player to move are searched (see BeamWidth).  Positions
+    #   are looked up in the transposition table before being expanded and
+    #   the result is stored there afterwards.
+    #
+    #   With principal variation search the first child (the one the move
+    #   ordering thinks best) is searched with the full window and the rest
+    #   with a null window around alpha (or beta), which only shows whether
+    #   they are better.  One that is is searched again with the full window.
     #
-    # Description: Takes a list of nodes and returns the min or
-    # max node depending on whose turn it is
+    #   Late quiet children may be searched less deeply first, and quiet
+    #   children near the leaves that look hopeless not searched at all
+    #   (see SelectiveSearch).
     #
     # Parameters:
-    #   nodes - The list of nodes to evaluate
+    #   currentNode - The node being 'searched' from (its state is
+    #       self.searchState)
+    #   currentDepth - The depth of the recursive tree search
+    #   alpha - The value this player is already assured of
+    #   beta - The value the opponent is already assured of
+    #   reduction - How many plies less deep than usual the node is searched
     #
-    # Return: The appropriate min or max node
+    # Return: The value of the node (currentNode.bestChild is set to the
+    #   child the value came from)
     ##
-    def evaluateNodes(self, nodes):
-        # look through the nodes and find the best min/max state value
-        # based on the appropriate alpha/beta score and whose turn it is
-        if self.playerId == nodes[0]['potential_state'].whoseTurn:
-            maxScore = max(n['alpha'] for n in nodes)
-            bestNodes = [n for n in nodes if n['alpha'] == maxScore]
-            return random.choice(bestNodes)
+    def exploreTree(self, currentNode, currentDepth, alpha, beta, reduction=0):
+
+        # the search walks the tree on a single state, applying each move
+        # before visiting a child and undoing it afterwards
+        currentState = self.searchState
+        whoseTurn = currentState.whoseTurn
+        self.nodeCount += 1
+
+        # give up (see SearchTimer) if this move is out of time
+        if self.deadline is not None:
+            self.deadline.check()
+
+        # determine whether this is a Min or a Max player
+        isMax = whoseTurn == self.playerId
+
+        # how many plies are searched below this node
+        depthLeft = self.maxDepth + 1 - currentDepth - reduction
+
+        # reuse an earlier search of this position if it went deep enough
+        # (the root always searches so that it has a move to return).  Once
+        # the beam has been widened only results of the wider search will do.
+        hashKey = currentState.getHash()
+        tableMove = NO_MOVE
+        if self.useTranspositions:
+            entry = self.transpositions.probe(hashKey)
+            if entry is not None:
+                tableMove = entry[ENTRY_MOVE]
+                if entry[ENTRY_DEPTH] >= depthLeft and currentNode.parent is not None \
+                   and (not self.beam.widening
+                        or entry[ENTRY_GENERATION] == self.transpositions.generation):
+                    value = entry[ENTRY_VALUE]
+                    flag = entry[ENTRY_FLAG]
+                    if flag == EXACT or (flag == LOWER_BOUND and value >= beta) \
+                       or (flag == UPPER_BOUND and value <= alpha):
+                        self.tableCutoffs += 1
+                        return value
+
+        nodesToIterate = self.expandNode(currentNode, currentDepth, tableMove, isMax)
+
+        # expand and evaluate the subnodes for this node
+        originalAlpha = alpha
+        originalBeta = beta
+        bestNode = None
+        if isMax:
+            bestValue = -INFINITY
         else:
-            minScore = min(n['beta'] for n in nodes)
-            bestNodes = [n for n in nodes if n['beta'] == minScore]
-            return random.choice(bestNodes)
-    
+            bestValue = INFINITY
+        for childIndex, newNode in enumerate(nodesToIterate):
+
+            # BASE STEP (leaf node or the game is over)
+            if depthLeft == 1 or self.isGameOver(newNode):
+                value = newNode.stateValue
+
+            # FUTILITY PRUNING (a quiet child of a frontier node that would
+            # have to gain more than the margin to matter)
+            elif childIndex > 0 and depthLeft == 2 \
+                 and self.isFutile(newNode.stateValue, alpha, beta, isMax) \
+                 and isQuietMove(currentState, newNode.move):
+                self.futilityPrunes += 1
+                value = newNode.stateValue
+
+            # RECURSIVE STEP (branch node)
+            else:
+                reduce = self.isReducible(childIndex, depthLeft) \
+                         and isQuietMove(currentState, newNode.move)
+                # the move is taken back even if the search runs out of time
+                # (see SearchTimer), as the state is searched again
+                undo = applyMove(currentState, newNode.move)
+                try:
+                    value = self.searchChild(newNode, childIndex, currentDepth + 1, alpha, beta,
+                                             isMax, reduction, reduce)
+                finally:
+                    undoMove(currentState, undo)
+            newNode.value = value
+
+            # update our best value and alpha/beta bounds
+            if isMax:
+                if value > bestValue:
+                    bestValue = value
+                    bestNode = newNode
+                if value > alpha:
+                    alpha = value
+            else:
+                if value < bestValue:
+                    bestValue = value
+                    bestNode = newNode
+                if value < beta:
+                    beta = value
+
+            # the other player won't allow this node to be reached
+            if alpha >= beta:
+                self.orderer.recordCutoff(currentDepth, newNode.moveKey,
+                                          newNode.historyKey, depthLeft, childIndex)
+                break
+
+        currentNode.bestChild = bestNode
+
+        # remember the result and whether it is exact or only a bound
+        if self.useTranspositions and bestNode is not None:
+            if bestValue <= originalAlpha:
+                flag = UPPER_BOUND
+            elif bestValue >= originalBeta:
+                flag = LOWER_BOUND
+            else:
+                flag = EXACT
+            self.transpositions.store(hashKey, depthLeft, flag, bestValue,
+                                      moveKey(bestNode.move))
+
+        return bestValue
+
     ##
-    # exploreTree
+    # searchChild
     #
-    # Description: Explores the move search tree recursively and
-    #   returns the node with the Move that leads to the best branch
-    #   in the tree using alpha/beta pruning
+    # Description: Searches below a child node (whose move has been made).
+    #   A reduced child is first searched LMR_REDUCTION plies less deep with
+    #   a null window, and only searched at full depth if that shows it may
+    #   be better than the best child so far.  With principal variation
+    #   search every child but the first is then searched with a null window
+    #   and, if it proves better, again with the full window.
     #
     # Parameters:
-    #   currentNode - The State being 'searched' from
-    #   currentDepth - The depth of the recursive tree search
+    #   node - The child node
+    #   childIndex - Its position in the search order
+    #   depth - Its depth
+    #   alpha, beta - The window of its parent
+    #   isMax - True if this player moves at the parent
+    #   reduction - How many plies less deep than usual the parent is searched
+    #   reduce - True to try a reduced search first
     #
-    # Return: A node containing the best predicted Move
+    # Return: The value of the child
     ##
-    def exploreTree(self, currentNode, currentDepth):
+    def searchChild(self, node, childIndex, depth, alpha, beta, isMax, reduction, reduce):
+        if reduce:
+            self.lmrReductions += 1
+            value = self.nullWindowSearch(node, depth, alpha, beta, isMax,
+                                          reduction + LMR_REDUCTION)
+            if failsToImprove(value, alpha, beta, isMax):
+                return value
+            self.lmrResearches += 1
 
-        # create alias lookup/reference variables
-        currentState = currentNode["potential_state"]
-        whoseTurn = currentState.whoseTurn
+        if childIndex == 0 or not self.usePVS:
+            return self.exploreTree(node, depth, alpha, beta, reduction)
+        value = self.nullWindowSearch(node, depth, alpha, beta, isMax, reduction)
+        if alpha < value < beta:
+            self.pvsResearches += 1
+            value = self.exploreTree(node, depth, alpha, beta, reduction)
+        return value
 
-        # determine whether this is a Min or a Max player
-        isMax = whoseTurn == self.playerId
+    ##
+    # nullWindowSearch
+    #
+    # Description: Searches below a child node with a null window at alpha
+    #   (when this player moves at the parent) or at beta
+    #
+    # Return: The value of the child: no better than alpha (or beta) if it
+    #   can't beat it
+    ##
+    def nullWindowSearch(self, node, depth, alpha, beta, isMax, reduction):
+        alpha, beta = nullWindow(alpha, beta, isMax)
+        return self.exploreTree(node, depth, alpha, beta, reduction)
+
+    ##
+    # expandNode
+    #
+    # Description: Creates the child nodes of a node (each is evaluated
+    #   with evaluateForPlayer) and picks the ones to search, in the order
+    #   they should be searched
+    #
+    # Parameters:
+    #   currentNode - The node to expand (its state is self.searchState)
+    #   currentDepth - The depth of the node
+    #   tableMove - The node's moveKey from the transposition table
+    #   isMax - True if this player is the one moving
+    #
+    # Return: a list of child nodes
+    ##
+    def expandNode(self, currentNode, currentDepth, tableMove, isMax):
+        currentState = self.searchState
+
+        # a node that was expanded earlier keeps its children
+        if currentNode.children is not None:
+            self.reusedExpansions += 1
+            return self.selectChildren(currentNode.children, currentDepth, tableMove, isMax)
 
         # generate a list of Nodes from the possible Moves
         possibleNodes = []
-        for m in listAllLegalMoves(currentState):
+        for m in listAllLegalMoves(currentState, True):
 
             #ignore moving the queen if she is not on structure
             if m.moveType == MOVE_ANT:
-                if getAntAt(currentState, m.coordList[0]) == QUEEN:
+                ant = getAntAt(currentState, m.coordList[0])
+                if ant is not None and ant.type == QUEEN:
                     if getConstrAt(currentState, m.coordList[0]) is None:
                         continue
 
             # initialize the node properties
-            node = treeNode.copy()
-            node["parent"] = currentNode
-            node["move"] = m
-            node["potential_state"] = self.processMove(currentState, m)
-            node["state_value"] = self.evaluateState(node["potential_state"])
+            node = self.pool.new()
+            node.parent = currentNode
+            node.move = m
+            node.moveKey = moveKey(m)
+            node.historyKey = historyKey(currentState, m)
+            undo = applyMove(currentState, m)
+            node.whoseTurn = currentState.whoseTurn
+            node.stateValue = self.evaluateForPlayer(currentState)
+            undoMove(currentState, undo)
             possibleNodes.append(node)
 
-        # intelligently select a subset of nodes to expand
-        nodesToIterate = heapq.nlargest(SET_POOL, possibleNodes, key=lambda x: x["state_value"])
+        # best first for the player making the move
+        if isMax:
+            possibleNodes.sort(key=lambda x: x.stateValue, reverse=True)
+        else:
+            possibleNodes.sort(key=lambda x: x.stateValue)
+        if self.useTreeReuse:
+            currentNode.children = possibleNodes
+        return self.selectChildren(possibleNodes, currentDepth, tableMove, isMax)
 
-        # expand and evaluate the subnodes for this node
-        for newNode in nodesToIterate:
-
-            # BASE STEP (leaf node)
-            if currentDepth == MAX_DEPTH:
-                # evaluate subnodes and set alpha/beta to the score
-                if isMax:
-                    newNode["alpha"] = self.evaluateState(newNode["potential_state"])
-                else:
-                    newNode["alpha"] = 0 - self.evaluateState(newNode["potential_state"])
-                newNode["beta"] = newNode["alpha"]
-
-                # flip whoseTurn if this an END move and reset the ants so that they can move
-                # (this must be done after evaluateState so that evaluateState knows whose turn it is)
-                if newNode["move"].moveType == END:
-                    newNode["potential_state"].whoseTurn = 1 - newNode["potential_state"].whoseTurn
-                    for ant in newNode["potential_state"].inventories[newNode["potential_state"].whoseTurn].ants:
-                        ant.hasMoved = False
+    ##
+    # selectChildren
+    #
+    # Description: Picks the children of a node to search and the order to
+    #   search them in
+    #
+    # Parameters:
+    #   possibleNodes - Every child of the node, best first for the player
+    #       making the move
+    #   currentDepth - The depth of the node
+    #   tableMove - The node's moveKey from the transposition table
+    #   isMax - True if this player is the one moving
+    #
+    # Return: a list of child nodes
+    ##
+    def selectChildren(self, possibleNodes, currentDepth, tableMove, isMax):
+        # intelligently select a subset of nodes to expand: the ones that
+        # look best for the player making the move
+        if isMax:
+            scores = [node.stateValue for node in possibleNodes]
+        else:
+            scores = [-node.stateValue for node in possibleNodes]
+        nodesToIterate = self.beam.select(possibleNodes, scores, currentDepth)
 
-            # RECURSIVE STEP (branch node)
-            else:
-                # get a back-reference to the parent node
-                parentNode = currentNode["parent"]
-
-                # do alpha/beta pruning if we're not the root node
-                if parentNode:
-                    # parent is a MAX and current node is a MIN
-                    if parentNode["potential_state"].whoseTurn == self.playerId:
-                        if (not isMax) and parentNode["alpha"] > currentNode["beta"]:
-                            break
-                    # parent is a MIN and current node is a MAX
-                    elif isMax and parentNode["beta"] < currentNode["alpha"]:
-                            break
-
-                # recurse on the subnode
-                self.exploreTree(newNode, currentDepth + 1)
-
-            # update our alpha/beta values based on our expanded subnode's values
+        # the best move from an earlier search of this position is always
+        # searched, and searched first; killer and history moves follow
+        if tableMove != NO_MOVE:
+            for node in possibleNodes:
+                if node.moveKey == tableMove and node not in nodesToIterate:
+                    nodesToIterate.append(node)
+                    break
+        return self.orderNodes(nodesToIterate, currentDepth, tableMove, isMax)
+
+    ##
+    # orderNodes
+    #
+    # Description: Sorts child nodes into the order they should be searched:
+    #   the transposition table's move, then killer moves, then by the
+    #   history table and finally by how good the child looks to the player
+    #   making the move (see MoveOrdering)
+    #
+    # Parameters:
+    #   nodes - The child nodes
+    #   ply - The depth of their parent
+    #   tableMove - The parent's moveKey from the transposition table
+    #   isMax - True if this player is the one moving
+    #
+    # Return: a sorted list of the nodes
+    ##
+    def orderNodes(self, nodes, ply, tableMove, isMax):
+        orderer = self.orderer
+        jitter = self.orderingJitter
+        def orderKey(node):
             if isMax:
-                # current node is a MAX node
-                if newNode["potential_state"].whoseTurn != self.playerId:
-                    # subnode is a MIN node
-                    if newNode["beta"] > currentNode["alpha"]:
-                        currentNode["alpha"] = newNode["beta"]
-                else:
-                    # subnode is a MAX node
-                    if newNode["alpha"] > currentNode["alpha"]:
-                        currentNode["alpha"] = newNode["alpha"]
+                value = node.stateValue
             else:
-                # current node is a MIN node
-                if newNode["potential_state"].whoseTurn == self.playerId:
-                    # subnode is a MAX node
-                    if newNode["alpha"] < currentNode["beta"]:
-                        currentNode["beta"] = newNode["alpha"]
-                else:
-                    # subnode is a MIN node
-                    if newNode["beta"] < currentNode["beta"]:
-                        currentNode["beta"] = newNode["beta"]
-
-        # return our best subnode
-        return self.evaluateNodes(nodesToIterate)
-    
+                value = -node.stateValue
+            if jitter:
+                value += self.jitterRandom.uniform(0.0, jitter)
+            return (orderer.rank(ply, node.moveKey, node.historyKey, tableMove), value)
+        return sorted(nodes, key=orderKey, reverse=True)
+
     ##
-    # processMove
+    # isGameOver
     #
-    # Description: The processMove method looks at the current state
-    # of the game and returns a copy of the state that results from
-    # making the given Move
+    # Description: Determines whether the state reached by a node is a won or
+    #   lost game (evaluateState only returns 0.0 or 1.0 in that case)
     #
     # Parameters:
-    #   currentState - The current State of the game
-    #   move - The Move which alters the state
+    #   node - The node to check
     #
-    # Return: The resulting State after Move is applied
+    # Return: True if the game is over
     ##
-    def processMove(self, currentState, move):
-        # create a bare-bones copy of the state to modify
-        copyOfState = currentState.fastclone()
-        
-        # get references to the player inventories
-        playerInv = copyOfState.inventories[copyOfState.whoseTurn]
-        enemyInv = copyOfState.inventories[(copyOfState.whoseTurn+1) % 2]
-
-        if move.moveType == BUILD:
-        # BUILD MOVE
-            if move.buildType < 0:
-                # building a construction
-                playerInv.foodCount -= CONSTR_STATS[move.buildType][BUILD_COST]
-                playerInv.constrs.append(Construction(move.coordList[0], move.buildType))
-            else:
-                # building an ant
-                playerInv.foodCount -= UNIT_STATS[move.buildType][COST]
-                playerInv.ants.append(Ant(move.coordList[0], move.buildType, copyOfState.whoseTurn))
-
-        elif move.moveType == MOVE_ANT:
-        # MOVE AN ANT
-            # get a reference to the ant
-            ant = getAntAt(copyOfState, move.coordList[0])
-
-            # update the ant's location after the move
-            ant.coords = move.coordList[-1]
-            ant.hasMoved = True
-            
-            # get a reference to a potential construction at the destination coords
-            constr = getConstrAt(copyOfState, move.coordList[-1])
-
-            # check to see if the ant is on a food or tunnel or hill and act accordingly
-            if constr:
-                # we only care about workers
-                if ant.type == WORKER:
-                    # if destination is food and ant can carry, pick up food
-                    if constr.type == FOOD:
-                        if not ant.carrying:
-                            ant.carrying = True
-                    # if destination is dropoff structure and and is carrying, drop off food
-                    elif constr.type == TUNNEL or constr.type == ANTHILL:
-                        if ant.carrying:
-                            ant.carrying = False
-                            playerInv.foodCount += 1
-
-            # get a list of the coordinates of the enemy's ants                 
-            enemyAntCoords = [enemyAnt.coords for enemyAnt in enemyInv.ants]
-
-            # contains the coordinates of ants that the 'moving' ant can attack
-            validAttacks = []
-
-            # go through the list of enemy ant locations and check if 
-            # we can attack that spot, and if so add it to a list of
-            # valid attacks (one of which will be chosen at random)
-            for coord in enemyAntCoords:
-                if UNIT_STATS[ant.type][RANGE] ** 2 >= abs(ant.coords[0] - coord[0]) ** 2 + abs(ant.coords[1] - coord[1]) ** 2:
-                    validAttacks.append(coord)
-
-            # if we can attack, pick a random attack and do it
-            if validAttacks:
-                enemyAnt = getAntAt(copyOfState, random.choice(validAttacks))
-                attackStrength = UNIT_STATS[ant.type][ATTACK]
-
-                if enemyAnt.health <= attackStrength:
-                    # just to be safe, set the health to 0
-                    enemyAnt.health = 0
-                    # remove the enemy ant from their inventory
-                    enemyInv.ants.remove(enemyAnt)
-                else:
-                    # lower the enemy ant's health because they were attacked
-                    enemyAnt.health -= attackStrength
-        
-        # return the modified copy of the original state
-        return copyOfState
+    def isGameOver(self, node):
+        return node.stateValue == 0.0 or node.stateValue == 1.0
+
+    ##
+    # evaluateForPlayer
+    #
+    # Description: Evaluates a state from this player's point of view.
+    #   evaluateState scores a state for whoever's turn it is.
+    #
+    # Parameters:
+    #   currentState - The State to evaluate
+    #
+    # Return: The score of the state on a scale of 0.0 to 1.0
+    ##
+    def evaluateForPlayer(self, currentState):
+        if currentState.whoseTurn == self.playerId:
+            return self.evaluateState(currentState)
+        return 1.0 - self.evaluateState(currentState)
+
+    ##
+    # getSearchStats
+    #
+    # Description: Reports on the last search: how many nodes were
+    #   expanded, how many were answered by the transposition table, how
+    #   many principal variation and aspiration searches were repeated, how
+    #   many moves were reduced (and searched again) or pruned, how many
+    #   expansions were found already in the tree, the table's own counters (hit rate, memory use), how well moves were
+    #   ordered (the fraction of cutoffs made by the first child searched),
+    #   how many children the beam kept from being searched at each depth,
+    #   the nodes allocated and the memory they took and the counters of the
+    #   evaluation cache (kept over all searches)
+    #
+    # Return: a dictionary
+    ##
+    def getSearchStats(self):
+        stats = self.getSelectiveStats()
+        stats.update({ "nodes" : self.nodeCount,
+                       "table_cutoffs" : self.tableCutoffs,
+                       "planned_moves_left" : len(self.turnPlan),
+                       "ponder_hits" : self.ponderHits,
+                       "ponder_misses" : self.ponderMisses,
+                       "ponder_nodes" : self.ponderNodes,
+                       "ponder_depth" : self.ponderDepth,
+                       "max_depth" : self.maxDepth,
+                       "completed_depth" : self.completedDepth })
+        stats.update(self.transpositions.getStats())
+        stats.update(self.orderer.getStats())
+        stats.update(self.beam.getStats())
+        stats.update(self.pool.getStats())
+        stats.update(self.planner.getStats())
+        stats["eval_cache"] = self.evaluateState.cache.getStats()
+        return stats
 
     ##
     # evaluateState
@@ -285,7 +563,9 @@ class AIPlayer(Player):
     #
     # Return: The score of the state on a scale of 0.0 to 1.0
     #   where 0.0 is a loss and 1.0 is a victory and 0.5 is neutral
+    #   (cached by position, see EvaluationCache)
     ##
+    @cachedEvaluation()
     def evaluateState(self, currentState):
         # make some references to player inventories and the queen
         playerInv = currentState.inventories[currentState.whoseTurn]
@@ -304,28 +584,16 @@ class AIPlayer(Player):
         # (this will be normalized to a 0.0 - 1.0 range before being returned)
         stateScore = 0
 
-        workerList = getAntList(currentState, currentState.whoseTurn, (WORKER,))
-
         # maintain 1 worker and 1 queen whenever possible
-        if (len(workerList) == 1) and (len(playerInv.ants) == 2):
+        if (len(playerInv.getEntitiesOfType(WORKER)) == 1) and (len(playerInv.ants) == 2):
             stateScore += WORKER_COUNT_WEIGHT
 
         # encourage dropping off food
         stateScore += playerInv.foodCount * FOOD_WEIGHT
 
-        # encourage workers to go towards food or dropoff locations appropriately
-        for w in workerList:
-            # pick a destination (goal) for the ant
-            if w.carrying:
-                # encourage picking up food
-                stateScore += CARRY_WEIGHT
-                goals = getConstrList(currentState, currentState.whoseTurn, (ANTHILL, TUNNEL))
-            else:
-                goals = self.foodList
-
-            # encourage moving towards goal
-            distanceToGoal = min(abs(w.coords[0] - g.coords[0]) + abs(w.coords[1] - g.coords[1]) for g in goals)
-            stateScore += DISTANCE_WEIGHT / (distanceToGoal + 1.)
+        # encourage carrying food and moving workers towards food or dropoff
+        # locations appropriately (see WorkerScore)
+        stateScore += self.workerTotal(currentState, currentState.whoseTurn)
 
         # keep queen on edge of board
         stateScore -= (playerQueen.coords[1]) * QUEEN_EDGE_WEIGHT
@@ -333,6 +601,35 @@ class AIPlayer(Player):
         # normalization of evaluation score to 0.0 - 1.0 bounds
         return (math.atan(stateScore/10000.) + math.pi/2) / math.pi
            
+    ##
+    # setSearchState
+    #
+    # Description: Makes a state the one the search walks the tree on and
+    #   attaches a WorkerScore to it
+    #
+    # Parameters:
+    #   state - A boardless GameState (self.foodList must be filled)
+    ##
+    def setSearchState(self, state):
+        self.searchState = state
+        WorkerScore([f.coords for f in self.foodList]).attach(state)
+
+    ##
+    # workerTotal
+    #
+    # Description: Looks up a player's worker score in the WorkerScore
+    #   attached to a state (or computes it if there isn't one)
+    #
+    # Return: the score (float)
+    ##
+    def workerTotal(self, currentState, playerId):
+        score = currentState.getScore(WORKER_SCORE)
+        if score is None:
+            score = WorkerScore([f.coords for f in self.foodList])
+            score.state = currentState
+            score.refresh()
+        return fromFixed(score.total(playerId))
+
     ##
     # getPlacement
     #
@@ -397,17 +694,382 @@ class AIPlayer(Player):
     # Return: The Move to be made
     ##
     def getMove(self, currentState):        
+        # the search uses the table the ponder search writes to
+        if self.ponder is not None and self.ponder.isRunning():
+            self.recordPonder(self.ponder.stop(), None)
+
+        move = self.searchMove(currentState)
+        self.keepSubtree(currentState, move)
+
+        # think about the opponent's reply while it takes its turn
+        if self.usePondering and not self.useTurnPlanner and move.moveType == END:
+            self.startPondering(currentState, move)
+        return move
+
+    ##
+    # searchMove
+    #
+    # Description: Searches for the next move with the search the player's
+    #   settings call for
+    #
+    # Parameters:
+    #   currentState - The state of the current game (GameState)
+    #
+    # Return: The Move to be made
+    ##
+    def searchMove(self, currentState):
+        if self.useTurnPlanner:
+            return self.plannedMove(currentState)
+
+        self.startSearch(currentState)
+
+        if self.useLazySMP:
+            return self.lazySMPMove(currentState)
+
+        if not self.useTimeBudget:
+            self.completedDepth = self.maxDepth
+            return self.searchToDepth(self.maxDepth)
+
+        # search deeper and deeper (and then wider) until this move's time is
+        # used up and return the move from the deepest search that finished
+        self.deadline = self.clock.startMove(currentState)
+        try:
+            move, self.completedDepth = iterativeDeepening(self.searchToDepth, 0,
+                                                           DEPTH_LIMIT, self.deadline,
+                                                           self.widenSearch)
+        finally:
+            self.clock.endMove()
+            self.deadline = None
+        return move
+
+    ##
+    # plantRoot
+    #
+    # Description: Sets up the root of the search tree for a search of
+    #   self.searchState.  If that is the position the last move made led
+    #   to, the subtree the last search built below the move is kept as the
+    #   tree (see NodePool.retain); otherwise the tree starts again.
+    ##
+    def plantRoot(self):
+        if self.reuseNode is not None and self.searchState.getHash() == self.reuseKey:
+            self.rootNode = self.pool.retain(self.reuseNode)
+        else:
+            self.pool.recycle()
+            self.rootNode = self.pool.new()
+            self.rootNode.whoseTurn = self.searchState.whoseTurn
+        self.rootKey = self.searchState.getHash()
+        self.reuseNode = None
+
+    ##
+    # keepSubtree
+    #
+    # Description: Remembers the child of the root a move leads to, and the
+    #   hash of the position the game will be in after the move, so that the
+    #   next search can keep its subtree (see plantRoot)
+    #
+    # Parameters:
+    #   currentState - The state the move is made from (GameState)
+    #   move - The Move the player is about to make
+    ##
+    def keepSubtree(self, currentState, move):
+        self.reuseNode = None
+        # a move from a turn plan wasn't searched for (see plannedMove), so
+        # the tree may be of another position
+        if not self.useTreeReuse or self.rootNode is None \
+           or currentState.getHash() != self.rootKey:
+            return
+        children = self.rootNode.children
+        if children is None:
+            return
+        key = moveKey(move)
+        for node in children:
+            if node.moveKey == key:
+                nextState = currentState.fastclone()
+                applyMove(nextState, move)
+                self.reuseKey = nextState.getHash()
+                self.reuseNode = node
+                return
+
+    ##
+    # startPondering
+    #
+    # Description: Starts the ponder search on the position the opponent is
+    #   left in by this player's END
+    #
+    # Parameters:
+    #   currentState - The state the END is made in (GameState)
+    #   move - The END Move
+    ##
+    def startPondering(self, currentState, move):
+        if self.ponder is None:
+            self.ponder = PonderSearch(TRANSPOSITION_BYTES)
+            self.transpositions = self.ponder.table
+        state = currentState.fastclone()
+        applyMove(state, move)
+        self.ponder.start(self, state, DEPTH_LIMIT)
+
+    ##
+    # recordPonder
+    #
+    # Description: Counts what a ponder search that was stopped found
+    #
+    # Parameters:
+    #   result - What PonderSearch.stop returned
+    #   move - The move the opponent made from the position searched (None
+    #       if it isn't known)
+    ##
+    def recordPonder(self, result, move):
+        key, predicted, depth, nodes = result
+        self.ponderNodes += nodes
+        self.ponderDepth = depth
+        if move is not None:
+            if predicted is not None and moveKey(predicted) == moveKey(move):
+                self.ponderHits += 1
+            else:
+                self.ponderMisses += 1
+
+    ##
+    # plannedMove
+    #
+    # Description: Gets the next move from a plan for the whole turn (see
+    #   TurnPlanner).  The plan is made by searching over turns at the start
+    #   of the turn, and again whenever the game isn't where the plan
+    #   expected it to be.
+    #
+    # Parameters:
+    #   currentState - The state of the current game (GameState)
+    #
+    # Return: The Move to be made
+    ##
+    def plannedMove(self, currentState):
+        if self.turnPlan and self.turnPlan[0][0] == currentState.getHash():
+            return self.turnPlan.pop(0)[1]
+
+        self.startSearch(currentState)
+        self.planner.playerId = self.playerId
+        self.planner.resetStats()
+        if not self.useTimeBudget:
+            self.completedDepth = self.turnDepth
+            plan = self.searchTurns(self.turnDepth)
+        else:
+            self.deadline = self.clock.startMove(currentState)
+            try:
+                plan, self.completedDepth = iterativeDeepening(self.searchTurns, 1, TURN_LIMIT,
+                                                               self.deadline)
+            finally:
+                self.clock.endMove()
+                self.deadline = None
+
+        # note the state each of the plan's moves will be made from
+        state = currentState.fastclone()
+        self.turnPlan = []
+        for move in plan.moves:
+            self.turnPlan.append((state.getHash(), move))
+            applyMove(state, move)
+        return self.turnPlan.pop(0)[1]
+
+    ##
+    # searchTurns
+    #
+    # Description: Searches over whole turns from self.searchState
+    #
+    # Parameters:
+    #   turns - How many turns to look ahead
+    #
+    # Return: The best TurnPlan found
+    ##
+    def searchTurns(self, turns):
+        self.planner.deadline = self.deadline
+        self.rootValue, plan = self.planner.search(self.searchState, turns,
+                                                   -INFINITY, INFINITY)
+        return plan
+
+    ##
+    # startSearch
+    #
+    # Description: Prepares to search for a move: sets up the search state
+    #   and starts the counters of the search again
+    #
+    # Parameters:
+    #   currentState - The state of the current game (GameState)
+    ##
+    def startSearch(self, currentState):
         #fill the food locations list
         if not self.foodList:
             for f in getConstrList(currentState, NEUTRAL, (FOOD,)):
                 self.foodList.append(f)
 
-        # create a root node to build our search tree from
-        rootNode = treeNode.copy()
-        rootNode["potential_state"] = currentState
+        # the search applies and undoes moves on its own boardless copy of
+        # the state
+        self.setSearchState(currentState.fastclone())
+        self.plantRoot()
+
+        self.nodeCount = 0
+        self.tableCutoffs = 0
+        self.resetSearchStats()
+        self.transpositions.newSearch()
+        self.transpositions.resetStats()
+        self.orderer.newSearch()
+        self.orderer.resetStats()
+        self.beam.newSearch()
+        self.pool.resetStats()
+
+    ##
+    # lazySMPMove
+    #
+    # Description: Finds a move with a Lazy SMP search (see ParallelSearch)
+    #   under the same time control as a search by this process alone
+    #
+    # Parameters:
+    #   currentState - The current state of the game (GameState)
+    #
+    # Return: The best Move found
+    ##
+    def lazySMPMove(self, currentState):
+        if self.smp is None:
+            self.smp = LazySMPSearch(SMP_WORKERS, TRANSPOSITION_BYTES)
+
+        if not self.useTimeBudget:
+            move, self.completedDepth = self.smp.search(self, currentState,
+                                                        self.maxDepth, self.maxDepth)
+        else:
+            self.deadline = self.clock.startMove(currentState)
+            try:
+                move, self.completedDepth = self.smp.search(self, currentState, 0,
+                                                            DEPTH_LIMIT, self.deadline)
+            finally:
+                self.clock.endMove()
+                self.deadline = None
+        self.nodeCount = self.smp.nodeCount
+        return move
+
+    ##
+    # lazySearch
+    #
+    # Description: One worker's part of a Lazy SMP search: an iterative
+    #   deepening search of the state.  Helpers (every worker but 0) add a
+    #   little random jitter to the move order so that they don't all search
+    #   the tree in the same order.
+    #
+    # Parameters:
+    #   state - The state to search (a boardless GameState)
+    #   workerIndex - The worker's number (0 is the main worker)
+    #   firstDepth, lastDepth - The range of depths to search
+    #   deadline - A SearchDeadline
+    #
+    # Return: (the best Move found, the depth of the deepest completed search)
+    ##
+    def lazySearch(self, state, workerIndex, firstDepth, lastDepth, deadline):
+        self.foodList = getConstrList(state, NEUTRAL, (FOOD,))
+        self.setSearchState(state)
+        self.plantRoot()
+        self.useTranspositions = True
+        self.nodeCount = 0
+        self.tableCutoffs = 0
+        self.resetSearchStats()
+        self.transpositions.resetStats()
+        self.orderer.newSearch()
+        self.orderer.resetStats()
+        self.beam.newSearch()
+        self.pool.resetStats()
+
+        if workerIndex > 0:
+            self.orderingJitter = ORDER_JITTER
+            self.jitterRandom.seed(workerIndex)
+        else:
+            self.orderingJitter = 0.0
+        self.deadline = deadline
+        try:
+            return iterativeDeepening(self.searchToDepth, firstDepth, lastDepth, deadline)
+        finally:
+            self.deadline = None
+
+    ##
+    # searchToDepth
+    #
+    # Description: Searches from self.searchState to the given depth.  The
+    #   value found is kept for the aspiration window of the next depth.
+    #
+    # Parameters:
+    #   depth - The depth of the deepest nodes to expand (see MAX_DEPTH)
+    #
+    # Return: The best Move found
+    ##
+    def searchToDepth(self, depth):
+        self.maxDepth = depth
+        rootNode = self.rootNode
+
+        # the root moves can be shared out among worker processes, each of
+        # which searches below its moves (see searchRootMove)
+        if self.useParallelRoot and depth > 0:
+            tableMove = NO_MOVE
+            if self.useTranspositions:
+                entry = self.transpositions.probe(self.searchState.getHash())
+                if entry is not None:
+                    tableMove = entry[ENTRY_MOVE]
+            nodes = self.expandNode(rootNode, 0, tableMove, True)
+            if self.rootPool is None:
+                self.rootPool = RootSearchPool(ROOT_PROCESSES)
+            return self.rootPool.search(self, self.searchState, [n.move for n in nodes],
+                                        depth, -INFINITY, self.deadline)
 
         # return the best move, found by recursively searching potential moves
-        return self.exploreTree(rootNode, 0)["move"]
+        # (in an aspiration window, see SelectiveSearch)
+        self.aspirationSearch(lambda alpha, beta: self.exploreTree(rootNode, 0, alpha, beta),
+                              lambda value: value, INFINITY)
+        return rootNode.bestChild.move
+
+    ##
+    # widenSearch
+    #
+    # Description: Widens the beam for another search to the same depth
+    #   (see SearchTimer.iterativeDeepening).  Results stored in the
+    #   transposition table by narrower searches are then only used to order
+    #   moves.
+    #
+    # Return: False if the beam can't be widened any more
+    ##
+    def widenSearch(self):
+        if not self.beam.widen():
+            return False
+        self.transpositions.newSearch()
+        return True
+
+    ##
+    # searchRootMove
+    #
+    # Description: Makes one of the moves at the root and searches below it.
+    #   Called by the worker processes of a parallel root search.
+    #
+    # Parameters:
+    #   state - The root state (a boardless GameState the search may modify)
+    #   move - The root Move to search
+    #   depth - The depth of the deepest nodes to expand (see MAX_DEPTH)
+    #   alpha - The best value already found for another root move
+    #
+    # Return: The value of the move (no better than alpha if it can't beat it)
+    ##
+    def searchRootMove(self, state, move, depth, alpha):
+        self.maxDepth = depth
+        self.foodList = getConstrList(state, NEUTRAL, (FOOD,))
+        self.setSearchState(state)
+        self.pool.recycle()
+        self.pool.resetStats()
+
+        rootNode = self.pool.new()
+        rootNode.whoseTurn = state.whoseTurn
+        node = self.pool.new()
+        node.parent = rootNode
+        node.move = move
+        undo = applyMove(state, move)
+        try:
+            node.whoseTurn = state.whoseTurn
+            node.stateValue = self.evaluateForPlayer(state)
+            if depth == 0 or self.isGameOver(node):
+                return node.stateValue
+            return self.exploreTree(node, 1, alpha, INFINITY)
+        finally:
+            undoMove(state, undo)
 
     ##
     # getAttack
@@ -432,4 +1094,37 @@ class AIPlayer(Player):
     #   hasWon - True if the player won the game. False if they lost (Boolean)
     #
     def registerWin(self, hasWon):
-        pass
+        # the next game gets a fresh time budget
+        self.clock.reset()
+        if self.ponder is not None and self.ponder.isRunning():
+            self.ponder.stop()
+
+    ##
+    # wantsOpponentState
+    #
+    # Description: The state after an opponent's move is only needed while
+    #   pondering (see registerOpponentMove)
+    #
+    # Return: True if a ponder search is running
+    ##
+    def wantsOpponentState(self):
+        return self.ponder is not None and self.ponder.isRunning()
+
+    ##
+    # registerOpponentMove
+    #
+    # Description: Checks the ponder search's prediction against the move
+    #   the opponent made and, while the opponent's turn goes on, ponders
+    #   the position the move reached instead.  The table keeps what was
+    #   searched below the old position.
+    #
+    # Parameters:
+    #   currentState - A clone of the state after the move (GameState)
+    #   move - The Move the opponent made
+    ##
+    def registerOpponentMove(self, currentState, move):
+        if not self.wantsOpponentState():
+            return
+        self.recordPonder(self.ponder.stop(), move)
+        if move.moveType != END:
+            self.ponder.start(self, currentState, DEPTH_LIMIT)
@@ -16,9 +16,9 @@ from Ant import Ant
 from Move import Move
 from GameState import addCoords
 from AIPlayerUtils import *
+from EvaluationCache import cachedEvaluation
+from SelectiveSearch import *
 
-# representation of inf
-INFINITY = 9999
                 
 # establishing weights for the weighted linear equation
 queenSafetyWeight = 0.3
@@ -32,19 +32,6 @@ INPUT_COUNT = 8
 CELL_COUNT = 9
 LEARNING_RATE = 1.5
 
-# a representation of a 'node' in the search tree
-treeNode = {
-    # the Move that would be taken in the given state from the parent node
-    "move"              : None,
-    # the state that would be reached by taking the above move
-    "potential_state"   : None,
-    # an evaluation of the potential_state
-    "state_value"       : 0.0,
-    # a reference to the parent node
-    "parent_node"       : None
-}
-
-
 ##
 #AIPlayer
 #Description: The responsbility of this class is to interact with the game by
@@ -54,7 +41,7 @@ treeNode = {
 #Variables:
 #   playerId - The id of the player.
 ##
-class AIPlayer(Player):
+class AIPlayer(CloneSearch, Player):
 
     #__init__
     #Description: Creates a new Player
@@ -63,8 +50,8 @@ class AIPlayer(Player):
     #   inputPlayerId - The id to give the new player (int)
     ##
     def __init__(self, inputPlayerId):
-        # a depth limit for the search algorithm
-        self.maxDepth = 1
+        # the search (see SelectiveSearch)
+        self.initCloneSearch()
 
         # keeps track of whether the first move has yet to be made
         self.firstMove = True
@@ -135,328 +122,6 @@ class AIPlayer(Player):
         return closestAntDist
     
     
-    ##
-    # evaluateNodes
-    # Description: The evaluateNodes method evaluates a list of nodes
-    # and determines their overall evaluation score.
-    #
-    # Parameters:
-    #   self - The object pointer
-    #   nodes - The list of nodes to evaluate
-    #
-    # Return: An overall evaluation score of the list of nodes
-    #
-    def evaluateNodes(self, nodes):
-        # holds the greatest state_value in the list of nodes
-        bestValue = 0.0
-        # look through the nodes and find the greatest state_value
-        for node in nodes:
-            if node["state_value"] > bestValue:
-                bestValue = node["state_value"]
-        # return the greatest state_value
-        return bestValue
-
-        
-    ##
-    # alpha_beta_search
-    # Description: use minimax with alpha beta pruning to determine what move to make
-    #
-    # Parameters:
-    #   self - the object pointer
-    #   node - the initial node, before any moves are explored
-    #
-    # Returns: the move which benefits the opposing player the least.
-    #
-    ##
-    def alpha_beta_search(self, node):
-        bestNode = self.max_value(node, -INFINITY, INFINITY, 0)
-        while bestNode["parent_node"]["parent_node"] is not None:
-            bestNode = bestNode["parent_node"]
-        return bestNode["move"]
-
-    
-    ##
-    # createNode
-    # Description: Creates a node with values set based on parameters
-    #
-    # Parameters:
-    #   self - The object pointer
-    #   move - The move that leads to the resultingState
-    #   resultingState - The state that results from making the move
-    #   parent - The parent node of the node being created
-    #
-    # Returns: A new node with the values initialized using the parameters
-    #
-    def createNode(self, move, resultingState, parent):
-        # Create a new node using treeNode as a model
-        newNode = treeNode.copy()
-        # set the move
-        newNode["move"] = move
-        # set the state that results from making the move
-        newNode["potential_state"] = resultingState
-        # set the value of the resulting state
-        neural = self.neuralEval(self.mapStateToArray(resultingState))
-        evalfn = self.evaluateState(resultingState)
-
-        print "Error: " + `(evalfn - neural)`
-
-        newNode["state_value"] = evalfn
-
-        #update weights for neural net
-        # self.neuralBacktrack(neural, evalfn)
-
-        # store a reference to the parent of this node
-        newNode["parent_node"] = parent
-        return newNode
-
-    ##
-    # max_value
-    # Description: returns the best move our player can make from the current state
-    #
-    # Parameters:
-    #   self - the object pointer
-    #   node - the current node, before any moves are explored
-    #   alpha - the alpha value, the value of our best move
-    #   beta - the value of the opponent's best move
-    #   currentDepth - the current depth of the node from the initial node
-    #
-    # Returns: the move which benefits the opposing player the least (alpha).
-    #
-    def max_value(self, node, alpha, beta, currentDepth):
-        # base case, maxDepth reached, return the value of the currentState
-        if currentDepth == self.maxDepth:
-            return node
-        state = node["potential_state"]
-        v = -INFINITY
-
-        # holds a list of nodes reachable from the currentState
-        nodeList = []
-        # loop through all legal moves for the currentState
-        for move in listAllLegalMoves(state):
-            # don't bother doing any move evaluations for the queen
-            # unless we need to build a worker (she is in the way!)
-            if move.moveType == MOVE_ANT:
-                initialCoords = move.coordList[0]
-                if ((getAntAt(state, initialCoords).type == QUEEN) and 
-                    len(state.inventories[state.whoseTurn].ants) >= 2):
-                        continue
-            if move.moveType == BUILD:
-                # hacky way to speed up the code by forcing building workers
-                # over any other ant
-                if move.buildType != WORKER:
-                    continue
-            # get the state that would result if the move is made
-            resultingState = self.processMove(state, move)
-            #create a newNode for the resulting state
-            newNode = self.createNode(move, resultingState, node)
-            # if a goal state has been found, stop evaluating other branches
-            if newNode["state_value"] == 1.0:
-                #we have a goal state, no alpha_beta evaluation is needed
-                return newNode
-            nodeList.append(newNode)
-
-        #sort nodes from greatest to least
-        sortedNodeList = sorted(nodeList, key=lambda k: k['state_value'], reverse=True)
-        
-        # throw away the last half of the list to minimize the number of nodes
-        sortedNodeList = sortedNodeList[:(len(sortedNodeList)+1)/2]
-        
-        #holds a reference to the current best node to move to
-        bestValNode = None
-                
-        #if it is our players turn
-        if (self.playerId == state.whoseTurn):
-            for tempNode in sortedNodeList:
-                maxValNode = self.max_value(tempNode, alpha, beta, currentDepth+1)
-                #if it's our turn and we're in max_value, stay in max_value
-                if v < maxValNode["state_value"]:
-                        bestValNode = maxValNode
-                        v = maxValNode["state_value"]
-                if v >= beta:
-                    return maxValNode
-                alpha = max(alpha, v)
-        #else it is the opponents player turn
-        else:
-            sortedNodeList = sorted(nodeList, key=lambda k: k['state_value'])
-            for tempNode in sortedNodeList:
-                maxValNode = self.min_value(tempNode, alpha, beta, currentDepth+1)
-                #if it's opponent's turn and they're in max_value, to toggle to min_value
-                if v < maxValNode["state_value"]:
-                       bestValNode = maxValNode
-                       v = maxValNode["state_value"]
-                if v >= beta:
-                    return maxValNode
-                alpha = max(alpha, v)
-
-        return bestValNode
-
-
-    ##
-    # min_value
-    # Description: returns the best move our opponent can make from the current state
-    #
-    # Parameters:
-    #   self - the object pointer
-    #   node - the current node, before any moves are explored
-    #   alpha - the alpha value, the value of our best move
-    #   beta - the value of the opponent's best move
-    #   currentDepth - the current depth of the node from the initial node
-    #
-    # Returns: the move which benefits the opposing player the least (alpha).
-    #
-    def min_value(self, node, alpha, beta, currentDepth):
-        # base case, maxDepth reached, return the value of the currentState
-        if currentDepth == self.maxDepth:
-            return node
-        state = node["potential_state"]
-        v = INFINITY
-
-        # holds a list of nodes reachable from the currentState
-        nodeList = []
-        # loop through all legal moves for the currentState
-        for move in listAllLegalMoves(state):
-            # don't bother doing any move evaluations for the queen
-            # unless we need to build a worker (she is in the way!)
-            if move.moveType == MOVE_ANT:
-                initialCoords = move.coordList[0]
-                if ((getAntAt(state, initialCoords).type == QUEEN) and 
-                    len(state.inventories[state.whoseTurn].ants) >= 2):
-                        continue
-            if move.moveType == BUILD:
-                # hacky way to speed up the code by forcing building workers
-                # over any other ant
-                if move.buildType != WORKER:
-                    continue
-            # get the state that would result if the move is made
-            resultingState = self.processMove(state, move)
-            #create a newNode for the resulting state
-            newNode = self.createNode(move, resultingState, node)
-            # if a goal state has been found, stop evaluating other branches
-            if newNode["state_value"] == 0.0:
-                #we have a goal state, no alpha_beta evaluation is needed
-                return newNode
-            nodeList.append(newNode)
-            
-        #sort nodes from least to greatest
-        sortedNodeList = sorted(nodeList, key=lambda k: k['state_value'])
-        
-        # throw away the last half of the list to minimize the number of nodes
-        sortedNodeList = sortedNodeList[:(len(sortedNodeList)+1)/2]
-        
-        #holds a reference to the current best node to move to
-        bestValNode = None
-        
-        #if it is our players turn
-        if (self.playerId == state.whoseTurn):
-            for tempNode in sortedNodeList:
-                minValNode = self.max_value(tempNode, alpha, beta, currentDepth+1)
-                #if it's our turn and we're in max_value, stay in max_value
-                if v > minValNode["state_value"]:
-                        bestValNode = minValNode
-                        v = minValNode["state_value"]
-                if v <= alpha:
-                    return minValNode
-                beta = min(beta, v)
-        #else it is the opponents player turn
-        else:
-            for tempNode in sortedNodeList:
-                minValNode = self.min_value(tempNode, alpha, beta, currentDepth+1)
-                #if it's opponent's turn and they're in max_value, to toggle to min_value
-                if v > minValNode["state_value"]:
-                       bestValNode = minValNode
-                       v = minValNode["state_value"]
-                if v <= alpha:
-                    return minValNode
-                beta = min(beta, v)
-
-        return bestValNode
-   
-    ##
-    # processMove
-    # Description: The processMove method looks at the current state
-    # of the game and returns a copy of the state that results from
-    # making the move
-    #
-    # Parameters:
-    #   self - The object pointer
-    #   currentState - The current state of the game
-    #   move - The move which alters the state
-    #
-    # Return: The resulting state after move is made
-    #
-    def processMove(self, currentState, move):
-        # create a copy of the state (this will be returned
-        # after being modified to reflect the move)
-        copyOfState = currentState.fastclone()
-        
-        # get a reference to the player's inventory
-        playerInv = copyOfState.inventories[copyOfState.whoseTurn]
-        # get a reference to the enemy player's inventory
-        enemyInv = copyOfState.inventories[(copyOfState.whoseTurn+1) % 2]
-        
-        # player is building a constr or ant
-        if move.moveType == BUILD:
-            # building a constr
-            if move.buildType < 0:  
-                playerInv.foodCount -= CONSTR_STATS[move.buildType][BUILD_COST]
-                playerInv.constrs.append(Construction(move.coordList[0], move.buildType))
-            # building an ant
-            else: 
-                playerInv.foodCount -= UNIT_STATS[move.buildType][COST]
-                playerInv.ants.append(Ant(move.coordList[0], move.buildType, copyOfState.whoseTurn))                
-        # player is moving an ant
-        elif move.moveType == MOVE_ANT:
-            # get a reference to the ant
-            ant = getAntAt(copyOfState, move.coordList[0])
-            # update the ant's location after the move
-            ant.coords = move.coordList[-1]
-            
-            # get a reference to a potential constr at the destination coords
-            constr = getConstrAt(copyOfState, move.coordList[-1])
-            # check to see if the ant is on a food or tunnel or hill and act accordingly
-            if constr:
-                # we only care about workers
-                if ant.type == WORKER:
-                    # if dest is food and can carry, pick up food
-                    if constr.type == FOOD:
-                        if not ant.carrying:
-                            ant.carrying = True
-                    # if dest is tunnel or hill and ant is carrying food, ditch it
-                    elif constr.type == TUNNEL or constr.type == ANTHILL:
-                        if ant.carrying:
-                            ant.carrying = False
-                            playerInv.foodCount += 1
-            # get a list of the coordinates of the enemy's ants                 
-            enemyAntCoords = [enemyAnt.coords for enemyAnt in enemyInv.ants]
-            # contains the coordinates of ants that the 'moving' ant can attack
-            validAttacks = []
-            # go through the list of enemy ant locations and check if 
-            # we can attack that spot and if so add it to a list of
-            # valid attacks (one of which will be chosen at random)
-            for coord in enemyAntCoords:
-                #pythagoras would be proud
-                if UNIT_STATS[ant.type][RANGE] ** 2 >= abs(ant.coords[0] - coord[0]) ** 2 + abs(ant.coords[1] - coord[1]) ** 2:
-                    validAttacks.append(coord)
-            # if we can attack, pick a random attack and do it
-            if validAttacks:
-                enemyAnt = getAntAt(copyOfState, random.choice(validAttacks))
-                attackStrength = UNIT_STATS[ant.type][ATTACK]
-                if enemyAnt.health <= attackStrength:
-                    # just to be safe, set the health to 0
-                    enemyAnt.health = 0
-                    # remove the enemy ant from their inventory (He's dead Jim!)
-                    enemyInv.ants.remove(enemyAnt)
-                else:
-                    # lower the enemy ant's health because they were attacked
-                    enemyAnt.health -= attackStrength
-        # move ends the player's turn
-        elif move.moveType == END:
-            # toggle between PLAYER_ONE (0) and PLAYER_TWO (1)
-            copyOfState.whoseTurn += 1
-            copyOfState.whoseTurn %= 2
-        
-        # return a copy of the original state, but reflects the move
-        return copyOfState 
 
 
     ##
@@ -609,6 +274,22 @@ class AIPlayer(Player):
         #return the result
         return result
 
+    ##
+    # neuralStateValue
+    # Description: Runs the neural network on a state.  Values are cached by
+    #   position (see EvaluationCache); neuralBacktrack empties the cache as
+    #   it changes the weights.
+    #
+    # Parameters:
+    #   self - The object pointer
+    #   state - The state to evaluate
+    #
+    # Returns: the output of the network
+    #
+    @cachedEvaluation()
+    def neuralStateValue(self, state):
+        return self.neuralEval(self.mapStateToArray(state))
+
     ##
     # neuralBacktrack()
     # Description: Backtracking method that modifies the weights in the neural network to 
@@ -619,6 +300,9 @@ class AIPlayer(Player):
     #   expected - the output that the network should have outputted
     #
     def neuralBacktrack(self, output, expected):
+        # values computed with the old weights are no longer right
+        self.neuralStateValue.cache.clear()
+
         # error term for output cell
         outCellDelta = output * (1.0-output) * (expected - output)
 
@@ -638,7 +322,33 @@ class AIPlayer(Player):
         for i in range(len(self.weights)-1):
             for j in range(len(self.weights[i])):
                 self.weights[i][j] = self.weights[i][j] + LEARNING_RATE * hiddenCellsDelta[i] * self.inputs[j]
-        
+
+
+
+    ##
+    # nodeValue
+    # Description: The value of a search node's state (see
+    #   SelectiveSearch.CloneSearch).  The search uses evaluateState, and
+    #   prints how far the neural network's value is from it.
+    #
+    # Parameters:
+    #   self - The object pointer
+    #   state - The state of the node
+    #
+    # Returns: The value of the state on a scale of 0.0 to 1.0
+    #
+    def nodeValue(self, state):
+        neural = self.neuralStateValue(state)
+        evalfn = self.evaluateState(state)
+
+        print "Error: " + `(evalfn - neural)`
+
+        #update weights for neural net (training needs the inputs and
+        #outputs neuralEval saves, so call it directly rather than the
+        #cached neuralStateValue)
+        # self.neuralBacktrack(neural, evalfn)
+
+        return evalfn
 
 
     ##
@@ -656,7 +366,9 @@ class AIPlayer(Player):
     # (neither winning nor losing)
     #
     # Direct win/losses are either a technical victory or regicide
+    # Values are cached by position (see EvaluationCache)
     #
+    @cachedEvaluation()
     def evaluateState(self, currentState):        
         # get a reference to the player's inventory
         playerInv = currentState.inventories[currentState.whoseTurn]
@@ -779,11 +491,7 @@ class AIPlayer(Player):
         if self.firstMove:            
             #asciiPrintState(currentState)
             self.firstMove = False
-        # save our id
-        self.playerId = currentState.whoseTurn
-        #create the initial node to analyze
-        initNode = self.createNode(None, currentState, None)
-        return self.alpha_beta_search(initNode)
+        return self.searchMove(currentState)
     
     
     ##
@@ -820,5 +528,6 @@ class AIPlayer(Player):
     #   hasWon - True if the player has won the game, False if the player lost. (Boolean)
     #
     def registerWin(self, hasWon):        
-        pass
+        # the next game gets a fresh time budget
+        self.clock.reset()
         # print self.weights
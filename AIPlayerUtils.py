@@ -1,8 +1,10 @@
-import random
+import random, heapq
 from Constants import *
 from Ant import UNIT_STATS
 from Construction import CONSTR_STATS
 from Move import *
+from BoardTables import LEGAL_COORDS, NEIGHBORS, QUEEN_FORBIDDEN
+from DistanceFields import getDistanceGrid
 
 #
 # AIPlayerUtils.py
@@ -15,6 +17,11 @@ from Move import *
 # these routines safe for a GameState that has been generated via the
 # GameState.fastclone method.
 #
+# getAntAt and getConstrAt use the coordinate maps that a GameState keeps of
+# its ants and constructions (see GameState.getAntMap), so they are constant
+# time lookups.  Objects without those maps are searched linearly.  Cell
+# neighbors and territories come from the precomputed tables in BoardTables.
+#
 
 ##
 # legalCoord
@@ -26,6 +33,12 @@ from Move import *
 #
 # Return: true (legal) or false (illegal)
 def legalCoord(coord):
+    #the common case: a tuple naming a cell on the board
+    try:
+        if coord in LEGAL_COORDS:
+            return True
+    except TypeError:
+        pass  #lists can't be looked up in the table
 
     #make sure we have a tuple or list with two elements in it
     try:
@@ -40,10 +53,14 @@ def legalCoord(coord):
     return ( (x >= 0) and (x <= 9) and (y >= 0) and (y <= 9))
 
 
+ALL_ANT_TYPES = (QUEEN, WORKER, DRONE, SOLDIER, R_SOLDIER)
+ALL_CONSTR_TYPES = (ANTHILL, TUNNEL, GRASS, FOOD)
+
 ##
 # getAntList()
 #
-# builds a list of all ants that meet a given specification
+# builds a list of all ants that meet a given specification.  When specific
+# types are requested the result is grouped by type.
 #
 # Parameters:
 #     currentState - a GameState or Node
@@ -53,19 +70,17 @@ def legalCoord(coord):
 #
 def getAntList(currentState,
                pid = None,
-               types = (QUEEN, WORKER, DRONE, SOLDIER, R_SOLDIER) ):
+               types = ALL_ANT_TYPES ):
 
-    #start with a list of all ants that belong to the indicated player(s)
-    allAnts = []
+    #collect the ants of each wanted type from the inventories' type indexes
+    result = []
     for inv in currentState.inventories:
         if (pid == None) or (pid == inv.player):
-            allAnts += inv.ants
-
-    #fill the result with ants that are of the right type
-    result = []
-    for ant in allAnts:
-        if ant.type in types:
-            result.append(ant)
+            if types == ALL_ANT_TYPES:
+                result.extend(inv.ants)
+            else:
+                for antType in types:
+                    result.extend(inv.getEntitiesOfType(antType))
 
     return result
         
@@ -86,19 +101,17 @@ def getAntList(currentState,
 #
 def getConstrList(currentState,
                   pid = None,
-                  types = (ANTHILL, TUNNEL, GRASS, FOOD) ):
+                  types = ALL_CONSTR_TYPES ):
 
-    #start with a list of all constrs that belong to the indicated player(s)
-    allConstrs = []
+    #collect the constrs of each wanted type from the inventories' type indexes
+    result = []
     for inv in currentState.inventories:
         if (pid == None) or (pid == inv.player):
-            allConstrs += inv.constrs
-
-    #fill the result with constrs that are of the right type
-    result = []
-    for constr in allConstrs:
-        if constr.type in types:
-            result.append(constr)
+            if types == ALL_CONSTR_TYPES:
+                result.extend(inv.constrs)
+            else:
+                for constrType in types:
+                    result.extend(inv.getEntitiesOfType(constrType))
 
     return result
         
@@ -114,6 +127,13 @@ def getConstrList(currentState,
 #
 # Return:  the construct at the coordinate or None if there is none
 def getConstrAt(state, coords):
+    #use the state's coordinate map if it has one
+    getConstrMap = getattr(state, "getConstrMap", None)
+    if getConstrMap is not None:
+        if type(coords) is list:
+            coords = tuple(coords)
+        return getConstrMap().get(coords)
+
     #get a list of all constructs
     allConstrs = getConstrList(state)
 
@@ -135,7 +155,14 @@ def getConstrAt(state, coords):
 #
 # Return:  the ant at the coordinate or None if there is none
 def getAntAt(state, coords):
-    #get a list of all constructs
+    #use the state's coordinate map if it has one
+    getAntMap = getattr(state, "getAntMap", None)
+    if getAntMap is not None:
+        if type(coords) is list:
+            coords = tuple(coords)
+        return getAntMap().get(coords)
+
+    #get a list of all ants
     allAnts = getAntList(state)
 
     #search for one at the given coord
@@ -155,6 +182,12 @@ def getAntAt(state, coords):
 # Return: a list of all legal coords that are adjacent to the given space
 #
 def listAdjacent(coord):
+    #look the neighbors of on-board tuples up in the table
+    try:
+        return list(NEIGHBORS[coord])
+    except (KeyError, TypeError):
+        pass
+
     #catch invalid inputs
     if (not legalCoord(coord)):
         return [];
@@ -260,11 +293,69 @@ def listAllMovementPaths(currentState, coords, movement):
     return validMoves
 
 
+##
+# listAllMovementDestinations
+#
+# calculates one cheapest path to each cell that a single ant can reach from
+# a given position.  listAllMovementPaths lists every path, so cells that can
+# be reached more than one way appear many times; this method finds the same
+# set of destinations with a bounded Dijkstra search and returns just one
+# path to each.  As with listAllMovementPaths, the ant doesn't actually have
+# to be there.
+#
+# Parameters:
+#    currentState - current game state
+#    coords       - where the ant is
+#    movement     - movement points ant has remaining
+#    forQueen     - if True the path may not enter the queen's forbidden rows
+#                   (see isPathOkForQueen)
+#
+# Return: a list of lists of coords (tuples), one for each destination, with
+# the zero-step move last (the same format as listAllMovementPaths)
+def listAllMovementDestinations(currentState, coords, movement, forQueen=False):
+    #base case: ant can't move at all
+    if (movement <= 0): return []
+    if forQueen and coords in QUEEN_FORBIDDEN: return []
+
+    costs = { coords : 0 }
+    paths = { coords : [coords] }
+    heap = [ (0, coords) ]
+    validMoves = []
+    while (len(heap) > 0):
+        cost, cell = heapq.heappop(heap)
+        #skip stale entries for cells that were since reached more cheaply
+        if (cost > costs[cell]): continue
+        if (cell != coords):
+            validMoves.append(paths[cell])
+
+        remaining = movement - cost
+        for newCell in NEIGHBORS[cell]:
+            if forQueen and newCell in QUEEN_FORBIDDEN: continue
+            if (getAntAt(currentState, newCell) != None): continue
+            constr = getConstrAt(currentState, newCell)
+            stepCost = 1  #default cost
+            if (constr != None):
+                stepCost = CONSTR_STATS[constr.type][MOVE_COST]
+            if (stepCost > remaining): continue
+
+            newCost = cost + stepCost
+            if (newCell not in costs) or (newCost < costs[newCell]):
+                costs[newCell] = newCost
+                paths[newCell] = paths[cell] + [newCell]
+                heapq.heappush(heap, (newCost, newCell))
+
+    #Append the zero-step move (used to activate attack on adjacent foe)
+    validMoves.append([coords])
+
+    return validMoves
+
 ##
 # stepsToReach
 #
 # estimates the shortest distance between two cells taking
-# movement costs into account.
+# movement costs into account.  The distances to each target are worked out
+# once for the terrain of the game and cached (see DistanceFields), so this
+# is a table lookup.
 #
 #Parameters:
 #   currentState   - The state of the game (GameState)
@@ -277,41 +368,97 @@ def stepsToReach(currentState, src, dst):
     if (not legalCoord(src)): return -1
     if (not legalCoord(dst)): return -1
 
-    #a dictionary of already visted cells and the corresponding cost to reach
-    visited = { src : 0 }
-    #a list of to be processed cells
-    queue = [ src ]
-
-    #this loops processes cells in the queue until it is empty
-    while(len(queue) > 0):
-        cell = queue.pop(0)
-
-        #if this cell is our destination we are done
-        if (cell == dst):
-            return visited[cell]
-
-        #calc distance to all cells adj to this one assuming we reach them
-        #from this one
-        nextSteps = listAdjacent(cell)
-        for newCell in nextSteps:
-            constrAtDest = getConstrAt(currentState, newCell)
-            cost = 1  #default
-            if constrAtDest != None:
-                cost = CONSTR_STATS[constrAtDest.type][MOVE_COST]
-            dist = visited[cell] + cost
-
-            #if the new distance is best so far, update the visited dict
-            if (visited.has_key(newCell)):
-                if (dist < visited[newCell]):
-                    visited[newCell] = dist
-            #if we've never seen this cell before also update dict and
-            #enqueue this new cell to be processed at a future loop iteration
-            else:
-                visited[newCell] = dist
-                queue.append(newCell)
+    return getDistanceGrid(currentState, dst)[src[0]][src[1]]
 
-    #we should never reach this point
-    return -1
+##
+# stepsToReachAll
+#
+# estimates the shortest distance from every cell on the board to a target
+# cell, the same way stepsToReach does
+#
+#Parameters:
+#   currentState   - The state of the game (GameState)
+#   dst            - destination position (an x,y coord)
+#
+# Return: a grid of costs indexed [x][y] (shared; do not modify it) or None
+# on invalid input
+def stepsToReachAll(currentState, dst):
+    if (not legalCoord(dst)): return None
+
+    return getDistanceGrid(currentState, dst)
+
+##
+# bestMoveToward
+#
+# finds the move that takes a single ant as close as it can get to a target
+# cell this turn.  One A* search (with the distance grid from stepsToReachAll
+# as its estimate) runs from every cell the ant can reach this turn at once,
+# stepping around the other ants and keeping a queen in her territory.  The
+# first route to reach the target starts from the reachable cell with the
+# cheapest way on to it, and the ant moves to that cell.  If other ants block
+# every route, the ant instead moves to the reachable cell that stepsToReach
+# says is closest to the target.
+#
+# Parameters:
+#    currentState - current game state
+#    ant          - the Ant to move
+#    target       - the cell to head for (an x,y coord).  Another ant may be
+#                   standing on it, in which case the ant stops next to it.
+#    movement     - the movement points to use (defaults to the ant's own)
+#
+# Return: a MOVE_ANT Move (the zero-step move if the ant can't get closer)
+def bestMoveToward(currentState, ant, target, movement=None):
+    start = tuple(ant.coords)
+    if (movement == None):
+        movement = UNIT_STATS[ant.type][MOVEMENT]
+    forQueen = (ant.type == QUEEN)
+    if (not legalCoord(target)) or (start == tuple(target)):
+        return Move(MOVE_ANT, [start], None)
+    target = tuple(target)
+    estimate = getDistanceGrid(currentState, target)
+
+    #every cell the ant can reach this turn is a starting point of the search
+    reachable = listAllMovementDestinations(currentState, start, movement, forQueen)
+    if (len(reachable) == 0):
+        return Move(MOVE_ANT, [start], None)
+    costs = {}
+    origins = {}
+    heap = []
+    for path in reachable:
+        cell = path[-1]
+        costs[cell] = 0
+        origins[cell] = path
+        heapq.heappush(heap, (estimate[cell[0]][cell[1]], 0, len(path), cell))
+
+    #A* search for the cheapest way on from any of them to the target
+    while (len(heap) > 0):
+        guess, cost, length, cell = heapq.heappop(heap)
+        if (cost > costs[cell]): continue
+        if (cell == target):
+            return Move(MOVE_ANT, origins[cell], None)
+
+        for newCell in NEIGHBORS[cell]:
+            if forQueen and newCell in QUEEN_FORBIDDEN: continue
+            if (newCell != target) and (getAntAt(currentState, newCell) != None): continue
+            constr = getConstrAt(currentState, newCell)
+            stepCost = 1  #default cost
+            if (constr != None):
+                stepCost = CONSTR_STATS[constr.type][MOVE_COST]
+
+            newCost = cost + stepCost
+            if (newCell not in costs) or (newCost < costs[newCell]):
+                costs[newCell] = newCost
+                origins[newCell] = origins[cell]
+                heapq.heappush(heap, (newCost + estimate[newCell[0]][newCell[1]],
+                                      newCost, length, newCell))
+
+    #no route: settle for the reachable cell that looks closest
+    bestPath = [start]
+    for path in reachable:
+        end = path[-1]
+        if (estimate[end[0]][end[1]] < estimate[bestPath[-1][0]][bestPath[-1][1]]):
+            bestPath = path
+    return Move(MOVE_ANT, bestPath, None)
 
 ##
 # listAllBuildMoves
@@ -391,9 +538,11 @@ def isPathOkForQueen(path):
 #
 # Parameters:
 #   currentState - the current state
+#   uniqueDestinations - if True only one (cheapest) path is listed for each
+#                        destination (see listAllMovementDestinations)
 #
 # Returns:  a list of Move objects
-def listAllMovementMoves(currentState):
+def listAllMovementMoves(currentState, uniqueDestinations=False):
     result = []
 
     #first get all MOVE_ANT moves for each ant in the inventory
@@ -402,6 +551,15 @@ def listAllMovementMoves(currentState):
         #skip ants that have already moved
         if (ant.hasMoved): continue
 
+        #the destination search keeps the queen in her territory itself
+        if uniqueDestinations:
+            for path in listAllMovementDestinations(currentState,
+                                                    ant.coords,
+                                                    UNIT_STATS[ant.type][MOVEMENT],
+                                                    ant.type == QUEEN):
+                result.append(Move(MOVE_ANT, path, None))
+            continue
+
         #create a Move object for each valid movement path
         allPaths = listAllMovementPaths(currentState,
                                         ant.coords,
@@ -430,11 +588,13 @@ def listAllMovementMoves(currentState):
 #
 # Parameters:
 #   currentState - the current state
+#   uniqueDestinations - if True only one movement path is listed for each
+#                        cell an ant can reach (see listAllMovementMoves)
 #
 # Returns:  a list of Move objects
-def listAllLegalMoves(currentState):
+def listAllLegalMoves(currentState, uniqueDestinations=False):
     result = []
-    result.extend(listAllMovementMoves(currentState))
+    result.extend(listAllMovementMoves(currentState, uniqueDestinations))
     result.extend(listAllBuildMoves(currentState))
     result.append(Move(END, None, None))
     return result
@@ -1,4 +1,5 @@
 from Constants import *
+from Zobrist import antKey
 
 #Unit stats array [ant type][stat]
 #(movement, health, attack, range, cost)
@@ -25,8 +26,12 @@ UNIT_STATS.append((1, 2, 1, 3, 2)) #Ranged soldier
 #   hasMoved - A boolean representing if the ant has moved yet this turn
 #   carrying - A boolean representing if the Ant's carrying food or not.
 #   player - The id of the player that owns the Ant
+#   owner - The GameState the Ant is part of.  The GameState is notified of
+#       every change to the attributes above so it can keep its hash current.
 ##
 class Ant(object):
+
+    owner = None
     
     ##
     #__init__
@@ -38,16 +43,38 @@ class Ant(object):
     #   inputPlayer - The id of the player that owns the Ant (int)
     ##
     def __init__(self, inputCoords, inputType, inputPlayer):
-        self.coords = inputCoords
-        self.type = inputType
-        self.hasMoved = False
-        self.carrying = False
-        self.player = inputPlayer
-        self.health = UNIT_STATS[self.type][HEALTH]
+        #a new Ant has no owner yet so there is nobody to notify
+        self.__dict__.update(coords = inputCoords,
+                             type = inputType,
+                             hasMoved = False,
+                             carrying = False,
+                             player = inputPlayer,
+                             health = UNIT_STATS[inputType][HEALTH])
+
+    ##
+    # notify the owning GameState before and after an attribute changes
+    def __setattr__(self, name, value):
+        owner = self.owner
+        if owner is None or name == "owner":
+            self.__dict__[name] = value
+        else:
+            owner.entityChanging(self)
+            self.__dict__[name] = value
+            owner.entityChanged(self)
+
+    ##
+    # make the given GameState (or None) the one that is notified of changes
+    def setOwner(self, state):
+        self.__dict__["owner"] = state
+
+    ##
+    # the key this Ant contributes to its GameState's hash
+    def hashKey(self):
+        return antKey(self)
 
     def clone(self):
         rtnAnt = Ant(self.coords, self.type, self.player)
-        rtnAnt.hasMoved = self.hasMoved
-        rtnAnt.carrying = self.carrying
-        rtnAnt.health = self.health
+        rtnAnt.__dict__.update(hasMoved = self.hasMoved,
+                               carrying = self.carrying,
+                               health = self.health)
         return rtnAnt
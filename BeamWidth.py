@@ -0,0 +1,170 @@
+#
+# BeamWidth.py
+#
+# Decides how many of a node's children a selective search goes on to
+# search.  The searchers evaluate every child of a node but only search below
+# the ones that look best for the player moving (the "beam").
+#
+# A FixedBeam keeps the same number (or fraction) of children everywhere.
+# An AdaptiveBeam instead looks at the children's scores:
+#
+#   - when one or two children are clearly better than the rest, only they
+#     are kept (down to minWidth)
+#   - when many children score about the same (within margin of the best,
+#     measured as a fraction of the spread between the best and the worst),
+#     more are kept, since the evaluation can't tell them apart
+#   - the most it keeps shrinks with depth, from maxWidth at the root by
+#     depthStep per ply, as deep nodes are many and each matters less
+#
+# Both can be widened as a search goes on (progressive widening): a searcher
+# that has finished its deepest affordable search and still has time left
+# calls widen and searches the same depth again with every beam a little
+# wider (see SearchTimer.iterativeDeepening).
+#
+# Every beam counts, for each ply, the children it was offered and the ones
+# it kept, so getStats shows how many nodes it saved the search.
+#
+
+#the default limits of an AdaptiveBeam
+MIN_WIDTH = 2
+MAX_WIDTH = 8
+DEPTH_STEP = 1
+MARGIN = 0.1
+#the most times a beam can be widened in one search
+MAX_WIDENING = 4
+
+##
+#FixedBeam
+#Description: Keeps a fixed number of children, or a fixed fraction of them
+#
+#Variables:
+#   width - The number of children kept (None to use fraction)
+#   fraction - The fraction of children kept (rounded up)
+#   widening - How many extra children are kept (see widen)
+#   plyStats - { ply : [nodes, children offered, children kept] }
+##
+class FixedBeam(object):
+
+    def __init__(self, width=None, fraction=None):
+        self.width = width
+        self.fraction = fraction
+        self.widening = 0
+        self.plyStats = {}
+
+    ##
+    #newSearch
+    #Description: Narrows the beam back down and resets the counters for
+    #   the search of a new move
+    ##
+    def newSearch(self):
+        self.widening = 0
+        self.resetStats()
+
+    def resetStats(self):
+        self.plyStats = {}
+
+    ##
+    #widen
+    #Description: Lets every node keep one more child
+    #
+    #Return: False (and does nothing) if the beam is already as wide as it
+    #   is allowed to get
+    ##
+    def widen(self):
+        if self.widening >= MAX_WIDENING:
+            return False
+        self.widening += 1
+        return True
+
+    ##
+    #limit
+    #
+    #Return: the number of children to keep at a ply, given the scores of
+    #   the children (best first)
+    ##
+    def limit(self, scores, ply):
+        if self.width is not None:
+            return self.width + self.widening
+        return int(len(scores) * self.fraction + 0.5) + self.widening
+
+    ##
+    #select
+    #Description: Picks the children to search
+    #
+    #Parameters:
+    #   nodes - The children, best first for the player moving
+    #   scores - Their scores, in the same order, higher being better for
+    #       the player moving
+    #   ply - The depth of their parent
+    #
+    #Return: the first nodes, as many as the beam keeps
+    ##
+    def select(self, nodes, scores, ply):
+        width = min(len(nodes), max(1, self.limit(scores, ply)))
+        stats = self.plyStats.get(ply)
+        if stats is None:
+            stats = self.plyStats[ply] = [0, 0, 0]
+        stats[0] += 1
+        stats[1] += len(nodes)
+        stats[2] += width
+        return nodes[:width]
+
+    ##
+    #getStats
+    #
+    #Return: a dictionary with, for each ply, the number of nodes expanded,
+    #   the children they had, how many were searched and how many the beam
+    #   saved (never searched), and the totals of those
+    ##
+    def getStats(self):
+        plies = []
+        for ply in sorted(self.plyStats):
+            nodes, offered, kept = self.plyStats[ply]
+            plies.append({ "ply" : ply,
+                           "nodes" : nodes,
+                           "children" : offered,
+                           "searched" : kept,
+                           "saved" : offered - kept,
+                           "average_width" : float(kept) / nodes })
+        return { "beam_widening" : self.widening,
+                 "beam_children" : sum([stats["children"] for stats in plies]),
+                 "beam_saved" : sum([stats["saved"] for stats in plies]),
+                 "beam_plies" : plies }
+
+##
+#AdaptiveBeam
+#Description: A beam whose width depends on the depth and on how far apart
+#   the children's scores are (see the top of this file)
+#
+#Variables:
+#   minWidth - The fewest children kept
+#   maxWidth - The most children kept at the root
+#   depthStep - How much the most kept shrinks with each ply
+#   margin - How close (as a fraction of the spread of the scores) a child
+#       has to be to the best to be kept
+##
+class AdaptiveBeam(FixedBeam):
+
+    def __init__(self, minWidth=MIN_WIDTH, maxWidth=MAX_WIDTH, depthStep=DEPTH_STEP,
+                 margin=MARGIN):
+        FixedBeam.__init__(self)
+        self.minWidth = minWidth
+        self.maxWidth = maxWidth
+        self.depthStep = depthStep
+        self.margin = margin
+
+    def limit(self, scores, ply):
+        lowest = self.minWidth + self.widening
+        highest = max(lowest, self.maxWidth - self.depthStep * ply + self.widening)
+        if not scores:
+            return lowest
+
+        #count the children that are close to the best one
+        best = scores[0]
+        cutoff = best - (best - scores[-1]) * self.margin
+        close = 0
+        for score in scores:
+            if score < cutoff:
+                break
+            close += 1
+        return min(highest, max(lowest, close))
@@ -0,0 +1,41 @@
+from Constants import *
+
+#
+# BoardTables.py
+#
+# Lookup tables for the cells of the board.  The board never changes size, so
+# everything that can be worked out from a coordinate alone (its neighbors,
+# which territory it is in, where it ends up when the board is flipped) is
+# computed once here when the module is imported.  Every table is keyed by an
+# (x, y) tuple.
+#
+
+#every cell on the board
+ALL_COORDS = tuple([(x, y) for x in xrange(BOARD_LENGTH) for y in xrange(BOARD_LENGTH)])
+LEGAL_COORDS = frozenset(ALL_COORDS)
+
+#the order that listAdjacent has always returned neighbors in
+ADJACENT_DELTAS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
+#{ coord : tuple of the cells next to it }
+NEIGHBORS = {}
+for coord in ALL_COORDS:
+    NEIGHBORS[coord] = tuple([(coord[0] + dx, coord[1] + dy) for dx, dy in ADJACENT_DELTAS
+                              if (coord[0] + dx, coord[1] + dy) in LEGAL_COORDS])
+
+#{ coord : the same cell as seen by the other player }
+FLIPPED = {}
+for coord in ALL_COORDS:
+    FLIPPED[coord] = (BOARD_LENGTH - 1 - coord[0], BOARD_LENGTH - 1 - coord[1])
+
+#the rows a player places their anthill, tunnel and grass on
+HOME_TERRITORY = frozenset([coord for coord in ALL_COORDS
+                            if coord[1] < BOARD_LENGTH / 2 - 1])
+#the rows a player places food on
+ENEMY_TERRITORY = frozenset([coord for coord in ALL_COORDS
+                             if coord[1] >= BOARD_LENGTH / 2 + 1])
+#the two middle rows that a queen may not enter
+QUEEN_FORBIDDEN = frozenset([coord for coord in ALL_COORDS
+                             if coord[1] == BOARD_LENGTH / 2 - 1 or coord[1] == BOARD_LENGTH / 2])
+
+del coord, dx, dy, x, y
@@ -24,8 +24,10 @@ class Building(Construction):
     ##
     def __init__(self,inputCoords, inputType, inputPlayer):
         super(Building,self).__init__(inputCoords, inputType)
-        self.player = inputPlayer
-        self.captureHealth = CONSTR_STATS[inputType][CAP_HEALTH]
+        self.__dict__.update(player = inputPlayer,
+                             captureHealth = CONSTR_STATS[inputType][CAP_HEALTH])
     
     def clone(self):
-        return Building(self.coords, self.type, self.player)
+        rtnBuilding = Building(self.coords, self.type, self.player)
+        rtnBuilding.__dict__.update(captureHealth = self.captureHealth)
+        return rtnBuilding
@@ -0,0 +1,390 @@
+from Constants import *
+from Ant import Ant, UNIT_STATS
+from Building import Building
+from Construction import CONSTR_STATS, getTerrain
+from Inventory import Inventory
+
+#Layout of the byte buffer backing a CompactState.  All of the state lives in
+#one bytearray so that cloning is a single buffer copy:
+#
+#   [ header | constr layer | capture layer | ant layer | ant records ... ]
+#
+#   header        - phase, whoseTurn, player one food, player two food, ant count
+#   constr layer  - one byte per cell holding an encoded (type, owner) pair or 0
+#   capture layer - one byte per cell holding a Building's capture health
+#   ant layer     - one byte per cell holding (ant record index + 1) or 0
+#   ant records   - ANT_RECORD_SIZE bytes per ant: cell, type, player, health, flags
+#
+#Cells are numbered x * BOARD_LENGTH + y.
+CELL_COUNT = BOARD_LENGTH * BOARD_LENGTH
+
+PHASE_OFFSET = 0
+TURN_OFFSET = 1
+FOOD_OFFSET = 2
+ANT_COUNT_OFFSET = 4
+HEADER_SIZE = 5
+
+CONSTR_LAYER = HEADER_SIZE
+CAPTURE_LAYER = CONSTR_LAYER + CELL_COUNT
+ANT_LAYER = CAPTURE_LAYER + CELL_COUNT
+ANT_RECORDS = ANT_LAYER + CELL_COUNT
+
+#Offsets within a single ant record
+ANT_CELL = 0
+ANT_TYPE = 1
+ANT_PLAYER = 2
+ANT_HEALTH = 3
+ANT_FLAGS = 4
+ANT_RECORD_SIZE = 5
+
+#Bits of the ant flags byte
+FLAG_HAS_MOVED = 1
+FLAG_CARRYING = 2
+
+##
+#encodeConstr / decodeConstr
+#Description: Packs a construction type and owner into a single nonzero byte
+#   (and back).  Construction types run from ANTHILL (-4) to FOOD (-1).
+##
+def encodeConstr(constrType, owner):
+    return 1 + (constrType - ANTHILL) + 4 * owner
+
+def decodeConstr(code):
+    code -= 1
+    return (code % 4 + ANTHILL, code / 4)
+
+def cellOf(coords):
+    return coords[0] * BOARD_LENGTH + coords[1]
+
+def coordsOf(cell):
+    return (cell / BOARD_LENGTH, cell % BOARD_LENGTH)
+
+##
+#CompactState
+#Description: An array-backed representation of a GameState.  Everything
+#   (cell occupancy, ant type/health/flags, food counts, phase and turn) is
+#   packed into one bytearray, so clone() is a single buffer copy instead of
+#   hundreds of object allocations.
+#
+#   For compatibility with code written against GameState the object exposes
+#   phase, whoseTurn, board (always None, like a fastclone) and an inventories
+#   view.  The inventories view is a read-only snapshot that is rebuilt after
+#   any mutation; use the mutator methods below (or toGameState) to change the
+#   state.
+#
+#Variables:
+#   data - the bytearray holding the packed state
+##
+class CompactState(object):
+
+    ##
+    #__init__
+    #Description: Creates a new CompactState
+    #
+    #Parameters:
+    #   inputData - a bytearray in the layout described above.  If None, an
+    #       empty board in the MENU_PHASE is created.
+    ##
+    def __init__(self, inputData=None):
+        if inputData is None:
+            inputData = bytearray(ANT_RECORDS)
+        self.data = inputData
+        self.board = None
+        self._view = None
+        self._maps = None
+
+    ##
+    #fromGameState
+    #Description: Packs an existing GameState (with or without a board)
+    #
+    #Return: an equivalent CompactState
+    ##
+    @staticmethod
+    def fromGameState(state):
+        compact = CompactState()
+        data = compact.data
+        data[PHASE_OFFSET] = state.phase
+        data[TURN_OFFSET] = state.whoseTurn
+        for inv in state.inventories:
+            if inv.player != NEUTRAL:
+                data[FOOD_OFFSET + inv.player] = max(0, inv.foodCount)
+            for constr in inv.constrs:
+                cell = cellOf(constr.coords)
+                owner = getattr(constr, "player", NEUTRAL)
+                data[CONSTR_LAYER + cell] = encodeConstr(constr.type, owner)
+                captureHealth = getattr(constr, "captureHealth", None)
+                if captureHealth is not None:
+                    data[CAPTURE_LAYER + cell] = max(0, captureHealth)
+        for inv in state.inventories:
+            for ant in inv.ants:
+                compact._appendAnt(ant.coords, ant.type, ant.player,
+                                   ant.health, ant.hasMoved, ant.carrying)
+        return compact
+
+    ##
+    #toGameState
+    #Description: Unpacks this state into a regular, mutable GameState
+    #
+    #Parameters:
+    #   withBoard - if True a full board of Locations is built, otherwise the
+    #       board is None as it would be for GameState.fastclone
+    #
+    #Return: an equivalent GameState
+    ##
+    def toGameState(self, withBoard=False):
+        from GameState import GameState
+        from Location import Location
+        inventories = self._buildInventories()
+        board = None
+        if withBoard:
+            board = [[Location((col, row)) for row in xrange(BOARD_LENGTH)]
+                     for col in xrange(BOARD_LENGTH)]
+            for inv in inventories:
+                for constr in inv.constrs:
+                    board[constr.coords[0]][constr.coords[1]].constr = constr
+                for ant in inv.ants:
+                    board[ant.coords[0]][ant.coords[1]].ant = ant
+        return GameState(board, inventories, self.phase, self.whoseTurn)
+
+    ##
+    #clone
+    #Description: Returns a copy of this state.  This is a single buffer copy.
+    ##
+    def clone(self):
+        return CompactState(bytearray(self.data))
+
+    ##
+    #fastclone
+    #Description: Returns a mutable, boardless GameState equivalent to this
+    #   state so that AI code written against GameState.fastclone keeps working.
+    ##
+    def fastclone(self):
+        return self.toGameState()
+
+    ##
+    #serialize / deserialize
+    #Description: Converts the state to and from a byte string (e.g. for
+    #   handing a state to another process).
+    ##
+    def serialize(self):
+        return str(self.data)
+
+    @staticmethod
+    def deserialize(inputString):
+        return CompactState(bytearray(inputString))
+
+    def __eq__(self, other):
+        return isinstance(other, CompactState) and self.data == other.data
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    ##
+    # phase and whoseTurn are stored in the header
+    @property
+    def phase(self):
+        return self.data[PHASE_OFFSET]
+
+    @phase.setter
+    def phase(self, value):
+        self.data[PHASE_OFFSET] = value
+        self._view = None
+
+    @property
+    def whoseTurn(self):
+        return self.data[TURN_OFFSET]
+
+    @whoseTurn.setter
+    def whoseTurn(self, value):
+        self.data[TURN_OFFSET] = value
+        self._view = None
+
+    ##
+    #inventories
+    #Description: A read-only view of the state as a list of three Inventory
+    #   objects, built on first access and cached until the next mutation.
+    ##
+    @property
+    def inventories(self):
+        if self._view is None:
+            self._view = self._buildInventories()
+            self._maps = None
+        return self._view
+
+    ##
+    #getAntMap / getConstrMap
+    #Description: Coordinate maps over the inventories view, matching
+    #   GameState.getAntMap and GameState.getConstrMap
+    ##
+    def getAntMap(self):
+        return self._getMaps()[0]
+
+    def getConstrMap(self):
+        return self._getMaps()[1]
+
+    def _getMaps(self):
+        inventories = self.inventories
+        if self._maps is None:
+            antMap = {}
+            constrMap = {}
+            for inv in inventories:
+                for ant in inv.ants:
+                    antMap[ant.coords] = ant
+                for constr in inv.constrs:
+                    constrMap[constr.coords] = constr
+            self._maps = (antMap, constrMap)
+        return self._maps
+
+    def _buildInventories(self):
+        data = self.data
+        ants = ([], [])
+        constrs = ([], [], [])
+        #the anthill is listed first in each player's constructions
+        for cell in xrange(CELL_COUNT):
+            code = data[CONSTR_LAYER + cell]
+            if code == 0:
+                continue
+            constrType, owner = decodeConstr(code)
+            coords = coordsOf(cell)
+            if owner == NEUTRAL:
+                constrs[NEUTRAL].append(getTerrain(coords, constrType))
+            else:
+                building = Building(coords, constrType, owner)
+                building.captureHealth = data[CAPTURE_LAYER + cell]
+                if constrType == ANTHILL:
+                    constrs[owner].insert(0, building)
+                else:
+                    constrs[owner].append(building)
+        for index in xrange(self.antCount()):
+            base = ANT_RECORDS + index * ANT_RECORD_SIZE
+            ant = Ant(coordsOf(data[base + ANT_CELL]), data[base + ANT_TYPE],
+                      data[base + ANT_PLAYER])
+            ant.health = data[base + ANT_HEALTH]
+            ant.hasMoved = bool(data[base + ANT_FLAGS] & FLAG_HAS_MOVED)
+            ant.carrying = bool(data[base + ANT_FLAGS] & FLAG_CARRYING)
+            ants[ant.player].append(ant)
+        return [Inventory(PLAYER_ONE, ants[PLAYER_ONE], constrs[PLAYER_ONE], self.getFood(PLAYER_ONE)),
+                Inventory(PLAYER_TWO, ants[PLAYER_TWO], constrs[PLAYER_TWO], self.getFood(PLAYER_TWO)),
+                Inventory(NEUTRAL, [], constrs[NEUTRAL], 0)]
+
+    ##
+    # accessors
+    ##
+    def antCount(self):
+        return self.data[ANT_COUNT_OFFSET]
+
+    def getFood(self, playerId):
+        return self.data[FOOD_OFFSET + playerId]
+
+    ##
+    #antIndexAt
+    #Return: the index of the ant record at the given coords or -1 if empty
+    ##
+    def antIndexAt(self, coords):
+        return self.data[ANT_LAYER + cellOf(coords)] - 1
+
+    ##
+    #antAt
+    #Return: a (type, player, health, hasMoved, carrying) tuple for the ant at
+    #   the given coords or None if there is no ant there
+    ##
+    def antAt(self, coords):
+        index = self.antIndexAt(coords)
+        if index < 0:
+            return None
+        data = self.data
+        base = ANT_RECORDS + index * ANT_RECORD_SIZE
+        flags = data[base + ANT_FLAGS]
+        return (data[base + ANT_TYPE], data[base + ANT_PLAYER], data[base + ANT_HEALTH],
+                bool(flags & FLAG_HAS_MOVED), bool(flags & FLAG_CARRYING))
+
+    ##
+    #constrAt
+    #Return: a (type, owner) tuple for the construction at the given coords or
+    #   None if there is no construction there
+    ##
+    def constrAt(self, coords):
+        code = self.data[CONSTR_LAYER + cellOf(coords)]
+        if code == 0:
+            return None
+        return decodeConstr(code)
+
+    ##
+    # mutators
+    ##
+    def setFood(self, playerId, amount):
+        self.data[FOOD_OFFSET + playerId] = max(0, amount)
+        self._view = None
+
+    def setConstr(self, coords, constrType, owner, captureHealth=0):
+        cell = cellOf(coords)
+        if constrType is None:
+            self.data[CONSTR_LAYER + cell] = 0
+            self.data[CAPTURE_LAYER + cell] = 0
+        else:
+            self.data[CONSTR_LAYER + cell] = encodeConstr(constrType, owner)
+            self.data[CAPTURE_LAYER + cell] = captureHealth or 0
+        self._view = None
+
+    ##
+    #addAnt
+    #Description: Places a new, full-health ant at the given coords
+    ##
+    def addAnt(self, coords, antType, playerId, hasMoved=False):
+        self._appendAnt(coords, antType, playerId, UNIT_STATS[antType][HEALTH], hasMoved, False)
+        self._view = None
+
+    ##
+    #moveAnt
+    #Description: Moves the ant at fromCoords to toCoords and marks it as moved
+    ##
+    def moveAnt(self, fromCoords, toCoords):
+        data = self.data
+        fromCell = cellOf(fromCoords)
+        toCell = cellOf(toCoords)
+        slot = data[ANT_LAYER + fromCell]
+        data[ANT_LAYER + fromCell] = 0
+        data[ANT_LAYER + toCell] = slot
+        base = ANT_RECORDS + (slot - 1) * ANT_RECORD_SIZE
+        data[base + ANT_CELL] = toCell
+        data[base + ANT_FLAGS] |= FLAG_HAS_MOVED
+        self._view = None
+
+    def setAntHealth(self, coords, health):
+        base = ANT_RECORDS + self.antIndexAt(coords) * ANT_RECORD_SIZE
+        self.data[base + ANT_HEALTH] = max(0, health)
+        self._view = None
+
+    def setAntFlags(self, coords, hasMoved, carrying):
+        base = ANT_RECORDS + self.antIndexAt(coords) * ANT_RECORD_SIZE
+        self.data[base + ANT_FLAGS] = (hasMoved and FLAG_HAS_MOVED) | (carrying and FLAG_CARRYING)
+        self._view = None
+
+    ##
+    #removeAnt
+    #Description: Removes the ant at the given coords.  The last ant record is
+    #   moved into the freed slot so the records stay contiguous.
+    ##
+    def removeAnt(self, coords):
+        data = self.data
+        cell = cellOf(coords)
+        index = data[ANT_LAYER + cell] - 1
+        last = self.antCount() - 1
+        base = ANT_RECORDS + index * ANT_RECORD_SIZE
+        lastBase = ANT_RECORDS + last * ANT_RECORD_SIZE
+        if index != last:
+            data[base:base + ANT_RECORD_SIZE] = data[lastBase:lastBase + ANT_RECORD_SIZE]
+            data[ANT_LAYER + data[base + ANT_CELL]] = index + 1
+        data[ANT_LAYER + cell] = 0
+        del data[lastBase:]
+        data[ANT_COUNT_OFFSET] = last
+        self._view = None
+
+    def _appendAnt(self, coords, antType, playerId, health, hasMoved, carrying):
+        data = self.data
+        index = data[ANT_COUNT_OFFSET]
+        cell = cellOf(coords)
+        flags = (hasMoved and FLAG_HAS_MOVED) | (carrying and FLAG_CARRYING)
+        data.extend((cell, antType, playerId, max(0, health), flags))
+        data[ANT_LAYER + cell] = index + 1
+        data[ANT_COUNT_OFFSET] = index + 1
@@ -1,4 +1,5 @@
 from Constants import *
+from Zobrist import constrKey
 
 #Contruction stats array
 #(movement cost, capture health, build cost)[type]
@@ -19,9 +20,14 @@ CONSTR_STATS.append((1,None,None)) #Food
 #   coords - An int[] of length 2, representing the Construction's position on
 #       the board.  Positions start at (0, 0) in the upper left and increase
 #       down and to the right.
+#   owner - The GameState the Construction is part of.  The GameState is
+#       notified of every change to the Construction so it can keep its hash
+#       current.
 ##
 class Construction(object):
 
+    owner = None
+
     ##
     #__init__
     #Description: Creates a new Construction. Only ever called by subclasses.
@@ -31,9 +37,72 @@ class Construction(object):
     #   inputType - The type of the Construction
     ##
     def __init__(self, inputCoords, inputType):
-        self.coords = inputCoords
-        self.type = inputType
-        self.movementCost = CONSTR_STATS[inputType][MOVE_COST]
+        self.__dict__.update(coords = inputCoords,
+                             type = inputType,
+                             movementCost = CONSTR_STATS[inputType][MOVE_COST])
+
+    ##
+    # notify the owning GameState before and after an attribute changes
+    def __setattr__(self, name, value):
+        owner = self.owner
+        if owner is None or name == "owner":
+            self.__dict__[name] = value
+        else:
+            owner.entityChanging(self)
+            self.__dict__[name] = value
+            owner.entityChanged(self)
+
+    ##
+    # make the given GameState (or None) the one that is notified of changes
+    def setOwner(self, state):
+        self.__dict__["owner"] = state
+
+    ##
+    # the key this Construction contributes to its GameState's hash
+    def hashKey(self):
+        return constrKey(self)
     
     def clone(self):
-        return Construction(self.coords, self.type)
\ No newline at end of file
+        return Construction(self.coords, self.type)
+
+##
+#Terrain
+#Description: A grass or food Construction that can't be changed.  Grass and
+#   food never move or change once they are placed, so one Terrain object for
+#   each (coords, type) is shared by every GameState (and every clone) that
+#   has that piece of terrain.  Use getTerrain to get one.
+#
+#   Since a Terrain is shared it has no owner and cloning it returns itself.
+##
+class Terrain(Construction):
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Terrain is shared between states and can't be changed")
+
+    def setOwner(self, state):
+        pass
+
+    def clone(self):
+        return self
+
+#the shared Terrain objects, keyed by (coords, type)
+_terrainCache = {}
+
+##
+#getTerrain
+#Description: Returns the shared Terrain object for a piece of grass or food
+#
+#Parameters:
+#   coords - The position of the terrain ((int, int))
+#   constrType - GRASS or FOOD
+#
+#Return: a Terrain
+##
+def getTerrain(coords, constrType):
+    coords = tuple(coords)
+    key = (coords, constrType)
+    terrain = _terrainCache.get(key)
+    if terrain is None:
+        terrain = Terrain(coords, constrType)
+        _terrainCache[key] = terrain
+    return terrain
\ No newline at end of file
@@ -0,0 +1,118 @@
+import heapq
+from collections import OrderedDict
+from Constants import *
+from BoardTables import ALL_COORDS, NEIGHBORS
+
+#
+# DistanceFields.py
+#
+# Caches the movement cost from every cell of the board to a target cell.
+# Only constructions that cost more than one movement point to enter (grass)
+# change those costs and they are fixed once the game has been set up, so a
+# distance grid depends on nothing but the target and the layout of that
+# terrain.  Each grid is computed once, with Dijkstra's algorithm, and shared
+# by every state with the same layout for the rest of the game.
+#
+# Ants are ignored (as in stepsToReach) so a grid is an estimate of how far
+# apart two cells are rather than a guaranteed path.
+#
+
+#how many terrain layouts to keep grids for (each game sees two: one per
+#player's view of the board)
+MAX_LAYOUTS = 8
+
+#{ terrain key : { target : grid } }, least recently added layout first
+_layouts = OrderedDict()
+
+##
+# terrainKey
+#
+# describes the terrain of a state that affects movement costs
+#
+# Parameters:
+#    state - a GameState (a board is not required)
+#
+# Return: a tuple of (coords, movement cost) for every cell that doesn't cost
+#   one movement point to enter, in sorted order
+def terrainKey(state):
+    costs = {}
+    for inv in state.inventories:
+        for constr in inv.constrs:
+            #the first construction at a cell is the one getConstrAt finds
+            if constr.coords is not None and not tuple(constr.coords) in costs:
+                costs[tuple(constr.coords)] = constr.movementCost
+    return tuple(sorted([(coords, cost) for coords, cost in costs.items() if cost != 1]))
+
+##
+# getTerrainKey
+#
+# Return: the terrainKey of a state, using the copy a GameState keeps when it
+#   has one
+def getTerrainKey(state):
+    getter = getattr(state, "getTerrainKey", None)
+    if getter is not None:
+        return getter()
+    return terrainKey(state)
+
+##
+# computeDistanceGrid
+#
+# runs Dijkstra's algorithm outward from the target.  The cost of a step is
+# the cost of the cell being entered, so the distance from a cell is the
+# total cost of the cells entered on the way to the target.
+#
+# Parameters:
+#    key - a terrainKey
+#    dst - the target cell (a tuple)
+#
+# Return: a grid of distances indexed [x][y]
+def computeDistanceGrid(key, dst):
+    costs = dict(key)
+    dist = dict([(coord, -1) for coord in ALL_COORDS])
+    dist[dst] = 0
+    heap = [ (0, dst) ]
+    while (len(heap) > 0):
+        steps, cell = heapq.heappop(heap)
+        if (steps > dist[cell]): continue
+        #walking from a neighbor into this cell costs this cell's cost
+        newSteps = steps + costs.get(cell, 1)
+        for newCell in NEIGHBORS[cell]:
+            if (dist[newCell] == -1) or (newSteps < dist[newCell]):
+                dist[newCell] = newSteps
+                heapq.heappush(heap, (newSteps, newCell))
+
+    return [[dist[(x, y)] for y in xrange(BOARD_LENGTH)] for x in xrange(BOARD_LENGTH)]
+
+##
+# getDistanceGrid
+#
+# looks up (computing if necessary) the distance from every cell to a target
+#
+# Parameters:
+#    state - a GameState (a board is not required)
+#    dst   - the target cell (must be on the board)
+#
+# Return: a grid of distances indexed [x][y].  The grid is shared, so
+#   callers must not modify it.
+def getDistanceGrid(state, dst):
+    key = getTerrainKey(state)
+    grids = _layouts.get(key)
+    if grids is None:
+        grids = {}
+        _layouts[key] = grids
+        if len(_layouts) > MAX_LAYOUTS:
+            _layouts.popitem(last=False)
+
+    dst = tuple(dst)
+    grid = grids.get(dst)
+    if grid is None:
+        grid = computeDistanceGrid(key, dst)
+        grids[dst] = grid
+    return grid
+
+##
+# clearCache
+#
+# throws away every cached grid
+def clearCache():
+    _layouts.clear()
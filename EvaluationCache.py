@@ -0,0 +1,183 @@
+import functools
+
+#
+# EvaluationCache.py
+#
+# Remembers the values a player's evaluation function gave to positions.  A
+# search evaluates the same position many times: once when a node is created
+# and again as a leaf, and again whenever the position is reached by another
+# order of moves (a transposition) or in the next move's search.  A cached
+# value is found by the position's hash (see GameState.getHash) and the id of
+# the player evaluating it.
+#
+# A cache holds a fixed number of values and makes room with the clock
+# algorithm: a hand sweeps round the entries, clearing the "recently used"
+# mark of each one it passes and replacing the first unmarked entry.  This
+# keeps roughly the least recently used values without the bookkeeping of a
+# true LRU list.
+#
+# Evaluation methods are cached with the cachedEvaluation decorator:
+#
+#   @cachedEvaluation()
+#   def evaluateState(self, currentState):
+#       ...
+#
+# The decorated method must depend on nothing but the state and the player
+# (self.playerId).  Its cache is available as evaluateState.cache.
+#
+
+#the default number of values each cache holds
+DEFAULT_MAX_ENTRIES = 100000
+
+#every cache created by cachedEvaluation, in the order they were created
+_caches = []
+
+#marks a key that isn't in the cache (None is a valid value)
+_MISSING = object()
+
+##
+#EvaluationCache
+#Description: A bounded table of evaluations with clock replacement
+#
+#Variables:
+#   name - A name for the cache (for reports)
+#   maxEntries - The most values the cache holds
+#   enabled - cachedEvaluation bypasses the cache while this is False
+#   hits, misses, evictions - Counters (see getStats)
+##
+class EvaluationCache(object):
+
+    def __init__(self, maxEntries=DEFAULT_MAX_ENTRIES, name=None):
+        self.name = name
+        self.maxEntries = maxEntries
+        self.enabled = True
+        self.clear()
+
+    ##
+    #clear
+    #Description: Empties the cache and resets the counters
+    ##
+    def clear(self):
+        #{ key : index } into the keys, values and referenced lists
+        self.slots = {}
+        self.keys = []
+        self.values = []
+        self.referenced = []
+        self.hand = 0
+        self.resetStats()
+
+    def resetStats(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    ##
+    #get
+    #
+    #Return: the value stored for a key, or default if there is none
+    ##
+    def get(self, key, default=None):
+        index = self.slots.get(key)
+        if index is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self.referenced[index] = True
+        return self.values[index]
+
+    ##
+    #put
+    #Description: Stores the value for a key, replacing an entry that hasn't
+    #   been used recently if the cache is full
+    ##
+    def put(self, key, value):
+        index = self.slots.get(key)
+        if index is not None:
+            self.values[index] = value
+            self.referenced[index] = True
+            return
+        if len(self.keys) < self.maxEntries:
+            self.slots[key] = len(self.keys)
+            self.keys.append(key)
+            self.values.append(value)
+            self.referenced.append(True)
+            return
+
+        #move the hand on to the first entry that hasn't been used since the
+        #hand last passed it
+        referenced = self.referenced
+        hand = self.hand
+        while referenced[hand]:
+            referenced[hand] = False
+            hand = (hand + 1) % self.maxEntries
+        del self.slots[self.keys[hand]]
+        self.evictions += 1
+
+        self.slots[key] = hand
+        self.keys[hand] = key
+        self.values[hand] = value
+        referenced[hand] = True
+        self.hand = (hand + 1) % self.maxEntries
+
+    ##
+    #hitRate
+    #
+    #Return: the fraction of lookups that found a value (float)
+    ##
+    def hitRate(self):
+        lookups = self.hits + self.misses
+        if lookups == 0:
+            return 0.0
+        return float(self.hits) / lookups
+
+    ##
+    #getStats
+    #
+    #Return: a dictionary of the cache's counters, hit rate and size
+    ##
+    def getStats(self):
+        return { "name" : self.name,
+                 "hits" : self.hits,
+                 "misses" : self.misses,
+                 "hit_rate" : self.hitRate(),
+                 "evictions" : self.evictions,
+                 "entries" : len(self.keys),
+                 "max_entries" : self.maxEntries }
+
+##
+# cachedEvaluation
+#
+# a decorator for an evaluation method(self, currentState) of an AI player.
+# Values are cached by (currentState.getHash(), self.playerId) in an
+# EvaluationCache of their own, which is set as the .cache of the method.
+#
+# Parameters:
+#    maxEntries - the size of the cache
+#
+# Return: the decorator
+def cachedEvaluation(maxEntries=DEFAULT_MAX_ENTRIES):
+    def decorate(evaluate):
+        cache = EvaluationCache(maxEntries, evaluate.__module__ + "." + evaluate.__name__)
+        _caches.append(cache)
+
+        @functools.wraps(evaluate)
+        def cachedEvaluate(self, currentState):
+            if not cache.enabled:
+                return evaluate(self, currentState)
+            key = (currentState.getHash(), self.playerId)
+            value = cache.get(key, _MISSING)
+            if value is _MISSING:
+                value = evaluate(self, currentState)
+                cache.put(key, value)
+            return value
+
+        cachedEvaluate.cache = cache
+        return cachedEvaluate
+    return decorate
+
+##
+# getCacheStats
+#
+# Return: the getStats of every cache made by cachedEvaluation
+def getCacheStats():
+    return [cache.getStats() for cache in _caches]
@@ -9,6 +9,7 @@ from Building import *
 from Location import *
 from Ant import *
 from Move import *
+from BoardTables import LEGAL_COORDS, HOME_TERRITORY, ENEMY_TERRITORY
 
 ##
 #Game
@@ -175,8 +176,12 @@ class Game(object):
                         target = self.state.coordLookup(target, self.state.whoseTurn)
                         #get construction to place
                         constr = constrsToPlace.pop(0)
-                        #give constr its coords
-                        constr.coords = target
+                        if constr.type == GRASS or constr.type == FOOD:
+                            #grass and food are shared, unchangeable Terrain
+                            constr = getTerrain(target, constr.type)
+                        else:
+                            #give constr its coords
+                            constr.coords = target
                         #put constr on board
                         self.state.board[target[0]][target[1]].constr = constr
                         if constr.type == ANTHILL or constr.type == TUNNEL:
@@ -282,6 +287,7 @@ class Game(object):
                 
                 #complete the move if valid
                 if validMove:
+                    moverId = self.state.whoseTurn
                     #check move type
                     if move.moveType == MOVE_ANT:
                         startCoord = move.coordList[0]
@@ -380,6 +386,9 @@ class Game(object):
                         if self.state.phase == MENU_PHASE:
                             #if we are in menu phase at this point, a reset was requested so we need to break the game loop.
                             break
+
+                    #let the other player know what was played
+                    self.notifyOpponent(moverId, move)
                 else:     
                     #human can give None move, AI can't
                     if not type(currentPlayer) is HumanPlayer.HumanPlayer:
@@ -468,6 +477,30 @@ class Game(object):
                     self.currentPlayers.append(self.players[playerOneId][0])
                     self.currentPlayers.append(self.players[playerTwoId][0]) 
     
+    ##
+    #notifyOpponent
+    #Description: Tells the player waiting for its turn about a move the other
+    #   player has made (see Player.registerOpponentMove).  The move and the
+    #   state are given as the waiting player sees them; the state is only
+    #   cloned for a player that wants it (see Player.wantsOpponentState).
+    #
+    #Parameters:
+    #   moverId - The current player ID (0 or 1) of the player who moved (int)
+    #   move - The Move that was made, in the game's coordinates (Move)
+    ##
+    def notifyOpponent(self, moverId, move):
+        opponentId = (moverId + 1) % 2
+        player = self.currentPlayers[opponentId]
+        coordList = move.coordList
+        if coordList != None:
+            coordList = [self.state.coordLookup(coord, opponentId) for coord in coordList]
+        theState = None
+        if player.wantsOpponentState():
+            theState = self.state.clone()
+            if opponentId == PLAYER_TWO:
+                theState.flipBoard()
+        player.registerOpponentMove(theState, Move(move.moveType, coordList, move.buildType))
+
     ##
     #setWinner
     #Description: Given a current player ID (0 or 1), sets that player to be the winner of the current game.
@@ -960,10 +993,7 @@ class Game(object):
             return False
         
         #check boundaries
-        if coord[0] < 0 or coord[1] < 0 or coord[0] >= BOARD_LENGTH or coord[1] >= BOARD_LENGTH:
-            return False
-            
-        return True
+        return coord in LEGAL_COORDS
    
     ##
     # isInHomeTerritory
@@ -980,9 +1010,7 @@ class Game(object):
     def isInHomeTerritory(self, coord):
         if not self.isValidCoord(coord):
             return False
-        if not (coord[1] >= 0 and coord[1] < BOARD_LENGTH / 2 - 1):
-            return False
-        return True
+        return coord in HOME_TERRITORY
 
     ##
     # isInEnemyTerritory
@@ -999,9 +1027,7 @@ class Game(object):
     def isInEnemyTerritory(self, coord):
         if not self.isValidCoord(coord):
             return False
-        if not (coord[1] < BOARD_LENGTH and coord[1] >= BOARD_LENGTH / 2 + 1):
-            return False
-        return True
+        return coord in ENEMY_TERRITORY
 
     ##
     #checkMoveStart 
@@ -1,18 +1,28 @@
-import copy
+import copy, time
 from Constants import *
 from Inventory import Inventory
 from Building import Building
+from Construction import getTerrain
+from Ant import Ant
 from Location import *
+from CompactState import CompactState
+from Zobrist import computeHash, foodKey, turnKey
+from BoardTables import FLIPPED
+from DistanceFields import terrainKey
 
 def addCoords(tuple1, tuple2):
     if len(tuple1) != len(tuple2):
         return None
+    elif len(tuple1) == 2:
+        return (tuple1[0] + tuple2[0], tuple1[1] + tuple2[1])
     else:
         return tuple([tuple1[i] + tuple2[i] for i in range(0, len(tuple1))])
 
 def subtractCoords(tuple1, tuple2):
     if len(tuple1) != len(tuple2):
         return None
+    elif len(tuple1) == 2:
+        return (tuple1[0] - tuple2[0], tuple1[1] - tuple2[1])
     else:
         return tuple([tuple1[i] - tuple2[i] for i in range(0, len(tuple1))])
 
@@ -26,6 +36,17 @@ def subtractCoords(tuple1, tuple2):
 #   inventories - A tuple containing the Inventory for each player.
 #   phase - The current phase of the game.
 #    whoseTurn - The ID of the Player who's turn it currently is.
+#
+#The state also keeps a 64-bit Zobrist hash of itself (see getHash) and maps
+#from coordinates to the Ant and Construction at each location (see getAntMap
+#and getConstrMap).  All of these are built on first use and then updated
+#incrementally: the Ants, Constructions and Inventories in the state notify it
+#whenever they change.  The layout of its movement-cost terrain (see
+#getTerrainKey) is cached the same way.
+#
+#Running evaluation scores (see IncrementalEval) can be attached to a state
+#with addScore.  They receive the same change notifications and are carried
+#over to the state's fastclones.
 ##
 class GameState(object):
 
@@ -41,10 +62,168 @@ class GameState(object):
     #   inputTurn - The ID of the Player who's turn it is (int)
     ##
     def __init__(self, inputBoard, inputInventories, inputPhase, inputTurn):
-        self.board = inputBoard
-        self.inventories = inputInventories
-        self.phase = inputPhase
-        self.whoseTurn = inputTurn
+        self.__dict__.update(board = inputBoard,
+                             inventories = inputInventories,
+                             phase = inputPhase,
+                             whoseTurn = inputTurn,
+                             _hash = None,
+                             _antMap = None,
+                             _constrMap = None,
+                             _terrainKey = None,
+                             _scores = ())
+        for inv in inputInventories:
+            #a shared (terrain) inventory stays with the state it came from
+            if not inv.shared:
+                inv.attach(self)
+
+    ##
+    #__setattr__
+    #Description: Keeps the hash current when whose turn it is changes
+    ##
+    def __setattr__(self, name, value):
+        if name == "whoseTurn" and self._hash is not None:
+            self._hash ^= turnKey(self.whoseTurn) ^ turnKey(value)
+        self.__dict__[name] = value
+
+    ##
+    #getHash
+    #Description: Returns a 64-bit Zobrist hash of this state.  The hash is
+    #   computed on first use and maintained incrementally after that.  Two
+    #   states with the same ants, constructions, food counts and turn have the
+    #   same hash.
+    #
+    #Return: the hash (long)
+    ##
+    def getHash(self):
+        if self._hash is None:
+            self._hash = computeHash(self)
+        return self._hash
+
+    ##
+    #getAntMap
+    #Description: Returns a dictionary from coordinates to the Ant at those
+    #   coordinates.  Works without a board.  The map is built on first use
+    #   and kept current as ants move, are built or die.
+    #
+    #Return: a dictionary {(x, y) : Ant}
+    ##
+    def getAntMap(self):
+        if self._antMap is None:
+            antMap = {}
+            #walk the inventories backwards so the first entry wins
+            for inv in reversed(self.inventories):
+                for ant in reversed(inv.ants):
+                    antMap[ant.coords] = ant
+            self._antMap = antMap
+        return self._antMap
+
+    ##
+    #getConstrMap
+    #Description: Returns a dictionary from coordinates to the Construction at
+    #   those coordinates.  Works without a board and is kept current the same
+    #   way as getAntMap.
+    #
+    #Return: a dictionary {(x, y) : Construction}
+    ##
+    def getConstrMap(self):
+        if self._constrMap is None:
+            constrMap = {}
+            for inv in reversed(self.inventories):
+                for constr in reversed(inv.constrs):
+                    constrMap[constr.coords] = constr
+            self._constrMap = constrMap
+        return self._constrMap
+
+    ##
+    #getTerrainKey
+    #Description: Returns a description of the terrain that affects movement
+    #   costs (see DistanceFields.terrainKey).  It is worked out on first use
+    #   and only recomputed after a construction that costs more than one
+    #   movement point to enter is added, removed or changed.
+    #
+    #Return: a tuple of ((x, y), cost) pairs
+    ##
+    def getTerrainKey(self):
+        if self._terrainKey is None:
+            self._terrainKey = terrainKey(self)
+        return self._terrainKey
+
+    ##
+    #Change notifications sent by the Ants, Constructions and Inventories in
+    #this state.  Each one updates the hash (if it has been computed) by
+    #XOR-ing out the old key and XOR-ing in the new one and moves the entity
+    #within the coordinate maps (if they have been built).
+    ##
+    def entityChanging(self, entity):
+        if self._hash is not None:
+            self._hash ^= entity.hashKey()
+        self._unmapEntity(entity)
+        for score in self._scores:
+            score.entityChanging(entity)
+
+    def entityChanged(self, entity):
+        if self._hash is not None:
+            self._hash ^= entity.hashKey()
+        self._mapEntity(entity)
+        for score in self._scores:
+            score.entityChanged(entity)
+
+    def entityAdded(self, entity):
+        if self._hash is not None:
+            self._hash ^= entity.hashKey()
+        self._mapEntity(entity)
+        for score in self._scores:
+            score.entityAdded(entity)
+
+    def entityRemoved(self, entity):
+        if self._hash is not None:
+            self._hash ^= entity.hashKey()
+        self._unmapEntity(entity)
+        for score in self._scores:
+            score.entityRemoved(entity)
+
+    def _mapEntity(self, entity):
+        if type(entity) is Ant:
+            if self._antMap is not None:
+                self._antMap[entity.coords] = entity
+            return
+        if entity.movementCost != 1:
+            self._terrainKey = None
+        if self._constrMap is not None:
+            self._constrMap[entity.coords] = entity
+
+    def _unmapEntity(self, entity):
+        if type(entity) is Ant:
+            coordMap = self._antMap
+        else:
+            if entity.movementCost != 1:
+                self._terrainKey = None
+            coordMap = self._constrMap
+        if coordMap is not None and coordMap.get(entity.coords) is entity:
+            del coordMap[entity.coords]
+
+    def foodChanged(self, playerId, oldFood, newFood):
+        if self._hash is not None:
+            self._hash ^= foodKey(playerId, oldFood) ^ foodKey(playerId, newFood)
+
+    ##
+    #addScore
+    #Description: Attaches a running score (see IncrementalEval) that is
+    #   kept current as the state changes
+    ##
+    def addScore(self, score):
+        self._scores = self._scores + (score,)
+
+    ##
+    #getScore
+    #
+    #Return: the attached score with the given name, or None
+    ##
+    def getScore(self, name):
+        for score in self._scores:
+            if score.name == name:
+                return score
+        return None
 
     ##
     #coordLookup
@@ -59,7 +238,10 @@ class GameState(object):
     
         if playerId == PLAYER_ONE:
             return coords
-        else:
+        try:
+            return FLIPPED[coords]
+        except (KeyError, TypeError):
+            #off the board or not a tuple
             return (BOARD_LENGTH - 1 - coords[0], BOARD_LENGTH - 1 - coords[1])
     
     ##
@@ -68,16 +250,45 @@ class GameState(object):
     #
     ##
     def flipBoard(self):
+        #every coordinate changes so the hash, maps and terrain key are
+        #rebuilt on next use (and running scores dropped)
+        self._hash = None
+        self._antMap = None
+        self._constrMap = None
+        self._terrainKey = None
+        self._scores = ()
+
         for col in self.board:
             col.reverse()
             
         self.board.reverse()
         
-        for inv in self.inventories:
+        for inv in self.inventories[:NEUTRAL]:
             for ant in inv.ants:
                 ant.coords = self.coordLookup(ant.coords, PLAYER_TWO)
             for constr in inv.constrs:
                 constr.coords = self.coordLookup(constr.coords, PLAYER_TWO)
+
+        #grass and food can't be moved (and may be shared with other states)
+        #so they are swapped for the Terrain at the flipped coordinates
+        terrain = []
+        for constr in self.inventories[NEUTRAL].constrs:
+            terrain.append(self.flipTerrain(constr))
+        newNeutral = Inventory(NEUTRAL, [], terrain, 0)
+        newNeutral.attach(self)
+        self.inventories[NEUTRAL] = newNeutral
+        for col in self.board:
+            for loc in col:
+                if loc.constr is not None and type(loc.constr) is not Building:
+                    loc.constr = self.flipTerrain(loc.constr)
+
+    ##
+    #flipTerrain
+    #Description: Returns the Terrain that a grass or food Construction
+    #   becomes when the board is flipped
+    ##
+    def flipTerrain(self, constr):
+        return getTerrain(self.coordLookup(constr.coords, PLAYER_TWO), constr.type)
       
     ##
     #clearConstrs
@@ -101,7 +312,6 @@ class GameState(object):
         ants2 = []
         cons1 = []
         cons2 = []
-        cons3 = []
         food1 = self.inventories[PLAYER_ONE].foodCount
         food2 = self.inventories[PLAYER_TWO].foodCount
         for col in xrange(0,len(self.board)):
@@ -119,11 +329,10 @@ class GameState(object):
                     ants1.append(newLoc.ant)
                 elif newLoc.ant != None and newLoc.ant.player == PLAYER_TWO:
                     ants2.append(newLoc.ant)
-        for constr in self.inventories[NEUTRAL].constrs:
-            cons3.append(constr.clone())
         newInventories = [Inventory(PLAYER_ONE, ants1, cons1, food1),
                           Inventory(PLAYER_TWO, ants2, cons2, food2),
-                          Inventory(NEUTRAL, [], cons3, 0) ]
+                          self.cloneTerrain() ]
+        #the hash is recomputed from the new inventories on next use
         return GameState(newBoard, newInventories, self.phase, self.whoseTurn)
 
 
@@ -143,12 +352,10 @@ class GameState(object):
         ants2 = [ None ] * len(self.inventories[PLAYER_TWO].ants)
         cons1 = [ None ] * len(self.inventories[PLAYER_ONE].constrs)
         cons2 = [ None ] * len(self.inventories[PLAYER_TWO].constrs)
-        cons3 = [ None ] * len(self.inventories[NEUTRAL].constrs)
         antIndex1 = 0
         antIndex2 = 0
         conIndex1 = 0
         conIndex2 = 0
-        conIndex3 = 0
 
         #clone all the entries in the inventories
         for ant in self.inventories[PLAYER_ONE].ants:
@@ -163,15 +370,80 @@ class GameState(object):
         for constr in self.inventories[PLAYER_TWO].constrs:
             cons2[conIndex2] = constr.clone()
             conIndex2 += 1
-        for constr in self.inventories[NEUTRAL].constrs:
-            cons3[conIndex3] = constr.clone()
-            conIndex3 += 1
 
         #clone the list of inventory objects
         food1 = self.inventories[PLAYER_ONE].foodCount
         food2 = self.inventories[PLAYER_TWO].foodCount
         newInventories = [ Inventory(PLAYER_ONE, ants1, cons1, food1),
                            Inventory(PLAYER_TWO, ants2, cons2, food2),
-                           Inventory(NEUTRAL, [], cons3, 0) ]
+                           self.cloneTerrain() ]
         
-        return GameState(newBoard, newInventories, self.phase, self.whoseTurn)
+        newState = GameState(newBoard, newInventories, self.phase, self.whoseTurn)
+        newState._hash = self._hash
+        newState._terrainKey = self._terrainKey
+        for score in self._scores:
+            score.clone(newState)
+        return newState
+
+    ##
+    #cloneTerrain
+    #
+    #Description: Returns the neutral (grass and food) Inventory for a clone of
+    # this state.  Grass and food can't change once the game reaches the play
+    # phase, so from then on every clone shares this state's neutral Inventory
+    # (and its Terrain) rather than copying it.  During setup, while terrain
+    # is still being placed, each clone gets its own list.
+    #
+    #Return: an Inventory
+    ##
+    def cloneTerrain(self):
+        neutralInv = self.inventories[NEUTRAL]
+        if self.phase == PLAY_PHASE:
+            return neutralInv.share()
+        return Inventory(NEUTRAL, [], [constr.clone() for constr in neutralInv.constrs], 0)
+
+    ##
+    #compact
+    #
+    #Description: Returns an array-backed copy of this state.  Cloning the
+    # result is a single buffer copy (see CompactState).
+    #
+    #Return: a CompactState equivalent to this GameState
+    ##
+    def compact(self):
+        return CompactState.fromGameState(self)
+
+##
+#benchmarkClones
+#Description: Times fastclone on the given state and counts how many of the
+#   clone's Ants and Constructions are new objects and how many are shared
+#   with the original (the grass and food Terrain once play has begun)
+#
+#Parameters:
+#   state - the GameState to clone
+#   iterations - how many clones to make
+#
+#Return: a dictionary of the total seconds and the per-clone entity counts
+##
+def benchmarkClones(state, iterations=1000):
+    start = time.time()
+    for i in xrange(iterations):
+        copyOfState = state.fastclone()
+    seconds = time.time() - start
+
+    originals = set()
+    for inv in state.inventories:
+        originals.update([id(entity) for entity in inv.ants + inv.constrs])
+    allocated = 0
+    shared = 0
+    for inv in copyOfState.inventories:
+        for entity in inv.ants + inv.constrs:
+            if id(entity) in originals:
+                shared += 1
+            else:
+                allocated += 1
+
+    return { "clones" : iterations,
+             "seconds" : seconds,
+             "entities_allocated" : allocated,
+             "entities_shared" : shared }
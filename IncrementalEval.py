@@ -0,0 +1,187 @@
+from abc import ABCMeta, abstractmethod
+from collections import OrderedDict
+from Constants import *
+
+#
+# IncrementalEval.py
+#
+# Support for evaluation functions that don't rescan the whole state for
+# every node of a search.
+#
+# Most of a heuristic's work is a sum over the ants of something that depends
+# only on the ant and where it stands: how close a worker is to food, how far
+# the queen is from the edge of the board.  Those per-ant terms are looked up
+# in per-cell tables that are built once per game (the food and the anthills
+# don't move) and cached here.
+#
+# An IncrementalScore keeps the running total of such a sum for each player.
+# It is attached to a GameState (see GameState.addScore) and receives the
+# state's change notifications, so when an ant moves, is built or dies only
+# that ant's term is taken out of the total and put back in.  Reading the
+# total at a leaf is then O(1), and the state's fastclones carry the totals
+# with them.
+#
+# Terms are stored as fixed point integers (see toFixed) so that adding and
+# removing them leaves no rounding error behind: a total is always exactly
+# the sum it would have been if computed from scratch.
+#
+
+#fixed point scale of table entries and totals
+SCALE = 1 << 20
+
+#how many tables to keep (a game needs a few per player)
+MAX_TABLES = 32
+
+#{ key : table }, least recently added first
+_tables = OrderedDict()
+
+def toFixed(value):
+    return int(round(value * SCALE))
+
+def fromFixed(total):
+    return float(total) / SCALE
+
+##
+# cellTable
+#
+# looks up (building if necessary) a table with a value for every cell
+#
+# Parameters:
+#    key   - identifies the table (must include everything score depends on)
+#    score - a function(coords) giving the value for a cell
+#
+# Return: a grid of fixed point values indexed [x][y].  The grid is shared,
+#   so callers must not modify it.
+def cellTable(key, score):
+    table = _tables.get(key)
+    if table is None:
+        table = [[toFixed(score((x, y))) for y in xrange(BOARD_LENGTH)]
+                 for x in xrange(BOARD_LENGTH)]
+        _tables[key] = table
+        if len(_tables) > MAX_TABLES:
+            _tables.popitem(last=False)
+    return table
+
+##
+# closenessTable
+#
+# Return: a cellTable of weight / (the Manhattan distance to the nearest of
+#   the targets + 1), or all zeros if there are no targets
+def closenessTable(targets, weight):
+    targets = tuple(sorted([tuple(target) for target in targets]))
+    def score(coords):
+        if not targets:
+            return 0.0
+        distance = min([abs(coords[0] - target[0]) + abs(coords[1] - target[1])
+                        for target in targets])
+        return weight / (distance + 1.0)
+    return cellTable(("closeness", targets, weight), score)
+
+##
+# clearCache
+#
+# throws away every cached table
+def clearCache():
+    _tables.clear()
+
+##
+#IncrementalScore
+#Description: A running per-player sum of antTerm over the ants of a state.
+#   Subclasses provide antTerm and, if their tables depend on constructions
+#   that can change during a game (tunnels are built and captured),
+#   refresh and refreshTypes.
+#
+#Variables:
+#   name - Identifies the score on a state (see GameState.getScore)
+#   state - The GameState the score is attached to
+#   totals - The running total for each player (fixed point)
+##
+class IncrementalScore(object):
+    __metaclass__ = ABCMeta
+
+    #construction types whose changes call refresh
+    refreshTypes = ()
+
+    def __init__(self, name):
+        self.name = name
+        self.state = None
+        self.totals = [0, 0]
+
+    ##
+    #attach
+    #Description: Attaches the score to a state and computes its totals
+    ##
+    def attach(self, state):
+        self.state = state
+        self.refresh()
+        state.addScore(self)
+
+    ##
+    #antTerm
+    #
+    #Return: an ant's contribution to its player's total (fixed point)
+    ##
+    @abstractmethod
+    def antTerm(self, ant):
+        pass
+
+    ##
+    #refresh
+    #Description: Rebuilds the tables the terms depend on and recomputes the
+    #   totals from scratch
+    ##
+    def refresh(self):
+        self.totals = [self.computeTotal(self.state, playerId)
+                       for playerId in (PLAYER_ONE, PLAYER_TWO)]
+
+    ##
+    #computeTotal
+    #
+    #Return: the total for a player computed from scratch (for states that
+    #   have no score attached)
+    ##
+    def computeTotal(self, state, playerId):
+        antTerm = self.antTerm
+        return sum([antTerm(ant) for ant in state.inventories[playerId].ants])
+
+    def total(self, playerId):
+        return self.totals[playerId]
+
+    ##
+    #clone
+    #Description: Attaches a copy of the score to a fastclone of its state
+    #   (the tables are shared)
+    ##
+    def clone(self, state):
+        copy = object.__new__(type(self))
+        copy.__dict__.update(self.__dict__)
+        copy.state = state
+        copy.totals = list(self.totals)
+        state.addScore(copy)
+        return copy
+
+    ##
+    #Change notifications forwarded by the GameState.  Ants have types >= 0
+    #and constructions types < 0.
+    ##
+    def entityChanging(self, entity):
+        if entity.type >= 0:
+            self.totals[entity.player] -= self.antTerm(entity)
+
+    def entityChanged(self, entity):
+        if entity.type >= 0:
+            self.totals[entity.player] += self.antTerm(entity)
+        elif entity.type in self.refreshTypes:
+            self.refresh()
+
+    def entityAdded(self, entity):
+        if entity.type >= 0:
+            self.totals[entity.player] += self.antTerm(entity)
+        elif entity.type in self.refreshTypes:
+            self.refresh()
+
+    def entityRemoved(self, entity):
+        if entity.type >= 0:
+            self.totals[entity.player] -= self.antTerm(entity)
+        elif entity.type in self.refreshTypes:
+            self.refresh()
@@ -1,5 +1,61 @@
 from Constants import *
 
+#every ant and construction type, used as the keys of the by-type index
+ALL_ENTITY_TYPES = (QUEEN, WORKER, DRONE, SOLDIER, R_SOLDIER,
+                    ANTHILL, TUNNEL, GRASS, FOOD)
+NO_ENTITIES = ()
+
+##
+#EntityList
+#Description: A list of the Ants or Constructions held by an Inventory.  It
+#   behaves like a regular list but tells its Inventory whenever an entity is
+#   added or removed so that the Inventory's type index and the owning
+#   GameState's hash and coordinate maps stay up to date.
+#
+#Variables
+#   inventory - The Inventory this list belongs to
+##
+class EntityList(list):
+
+    def __init__(self, inventory, entities=()):
+        list.__init__(self, entities)
+        self.inventory = inventory
+
+    def append(self, entity):
+        super(EntityList, self).append(entity)
+        self.inventory.entityAdded(entity)
+
+    def extend(self, entities):
+        for entity in entities:
+            self.append(entity)
+
+    def insert(self, index, entity):
+        super(EntityList, self).insert(index, entity)
+        self.inventory.entityAdded(entity)
+
+    def remove(self, entity):
+        super(EntityList, self).remove(entity)
+        self.inventory.entityRemoved(entity)
+
+    def pop(self, index=-1):
+        entity = super(EntityList, self).pop(index)
+        self.inventory.entityRemoved(entity)
+        return entity
+
+    def __setitem__(self, index, entity):
+        old = self[index]
+        super(EntityList, self).__setitem__(index, entity)
+        self.inventory.entityRemoved(old)
+        self.inventory.entityAdded(entity)
+
+    def __delitem__(self, index):
+        entity = self[index]
+        super(EntityList, self).__delitem__(index)
+        self.inventory.entityRemoved(entity)
+
+    def __reduce__(self):
+        return (EntityList, (None, list(self)), {"inventory" : self.inventory})
+
 ##
 #Inventory
 #Description: This class keeps track of the resources at a player's disposal
@@ -11,9 +67,20 @@ from Constants import *
 #    anthill - The player's anthill
 #    constrs - An array of all the Player's Constructions
 #   foodCount - The amount of food that the player has to use
+#   owner - The GameState this inventory is part of (None until attached)
+#   shared - True once the inventory is shared by several GameStates (see
+#       GameState.cloneTerrain).  A shared inventory keeps its first owner.
+#
+#The inventory also indexes its ants and constructions by type (ant types and
+#construction types don't overlap) so the queen, anthill, tunnels and the ants
+#of a given type can be looked up without scanning.  The index is kept in
+#sync as entities are added to or removed from the lists.
 ##
 class Inventory(object):
 
+    owner = None
+    shared = False
+
     ##
     #__init__
     #Description: Creates a new Inventory
@@ -24,47 +91,108 @@ class Inventory(object):
     #   inputConstructions - An array containing all of the Player's Constructions (Construction[])
     ##
     def __init__(self, playerId, antArray, inputConstructions, inputFood):
-        self.player = playerId
-        self.ants = antArray
-        self.constrs = inputConstructions      
-        self.foodCount = inputFood
+        #a new Inventory has no owner yet so there is nobody to notify
+        self.__dict__.update(player = playerId,
+                             ants = antArray,
+                             constrs = inputConstructions,
+                             foodCount = inputFood)
+        if antArray is not None:
+            self.__dict__["ants"] = EntityList(self, antArray)
+        if inputConstructions is not None:
+            self.__dict__["constrs"] = EntityList(self, inputConstructions)
+        self.indexEntities()
+
+    ##
+    # wrap entity lists so that changes to them can be tracked and report
+    # food count changes to the owning GameState
+    def __setattr__(self, name, value):
+        if (name == "ants" or name == "constrs") and value is not None:
+            value = EntityList(self, value)
+        elif name == "foodCount" and self.owner is not None:
+            self.owner.foodChanged(self.player, self.__dict__["foodCount"], value)
+        self.__dict__[name] = value
+        if name == "ants" or name == "constrs":
+            self.indexEntities()
+
+    ##
+    # rebuild the by-type index from the ant and construction lists
+    def indexEntities(self):
+        byType = dict([(entityType, []) for entityType in ALL_ENTITY_TYPES])
+        for entities in (self.ants, self.constrs):
+            if entities is not None:
+                for entity in entities:
+                    byType[entity.type].append(entity)
+        self.__dict__["byType"] = byType
+
+    ##
+    # make this inventory part of the given GameState
+    def attach(self, state):
+        self.__dict__["owner"] = state
+        for ant in self.ants:
+            ant.setOwner(state)
+        for constr in self.constrs:
+            constr.setOwner(state)
+
+    ##
+    # mark this inventory as shared between GameStates and return it
+    def share(self):
+        self.__dict__["shared"] = True
+        return self
+
+    ##
+    # called by EntityList when an Ant or Construction is added or removed
+    def entityAdded(self, entity):
+        entities = self.byType[entity.type]
+        if entity.type >= 0:
+            allEntities = self.ants
+        else:
+            allEntities = self.constrs
+        if allEntities[-1] is entity:
+            entities.append(entity)
+        else:
+            #inserted mid-list: rebuild this type so it keeps the list's order
+            entities[:] = [e for e in allEntities if e.type == entity.type]
+        if self.owner is not None:
+            entity.setOwner(self.owner)
+            self.owner.entityAdded(entity)
+
+    def entityRemoved(self, entity):
+        self.byType[entity.type].remove(entity)
+        if self.owner is not None:
+            self.owner.entityRemoved(entity)
+            entity.setOwner(None)
         
     ##
     # return the queen in this inventory
     def getQueen(self):
-        if self.ants == None:
-            return None
-        for checkAnt in self.ants:
-            if checkAnt.type == QUEEN: return checkAnt
-            
+        queens = self.byType[QUEEN]
+        if queens:
+            return queens[0]
         return None
 
     ##
     # return the anthill in this inventory
     def getAnthill(self):
-        if self.constrs == None:
-            return None
-        
-        for checkConstruction in self.constrs:
-            if checkConstruction.type == ANTHILL: return checkConstruction
-        
+        anthills = self.byType[ANTHILL]
+        if anthills:
+            return anthills[0]
         return None
 
     ## 
-    # construct a list of all the tunnels in this inventory
+    # return a list of all the tunnels in this inventory.  The list is the
+    # inventory's own index, so callers must not modify it.
     def getTunnels(self):
-        if self.constrs == None:
-            return []
+        return self.byType[TUNNEL]
 
-        result = []
-        for checkConstruction in self.constrs:
-            if checkConstruction.type == TUNNEL:
-                result.append(checkConstruction)
-        
-        return result
+    ##
+    # return a list of the entities (ants or constructions) of the given type.
+    # The list is the inventory's own index, so callers must not modify it.
+    def getEntitiesOfType(self, entityType):
+        return self.byType.get(entityType, NO_ENTITIES)
         
 
     ##
-    # duplicate this inventory
+    # duplicate this inventory (the new inventory has its own lists holding
+    # the same Ants and Constructions)
     def clone(self):
         return Inventory(self.player,self.ants,self.constrs,self.foodCount)
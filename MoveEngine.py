@@ -0,0 +1,310 @@
+import time
+from Constants import *
+from Ant import Ant, UNIT_STATS
+from Building import Building
+from Construction import CONSTR_STATS
+from AIPlayerUtils import *
+
+#
+# MoveEngine.py
+#
+# Applies Moves to a GameState *in place* and records what was changed so
+# that the move can be taken back again.  Search code can then walk the game
+# tree on a single state (apply, search the child, undo) instead of cloning a
+# new state for every node.
+#
+# The rules follow Game.runGame: ants are marked as moved, attacks are
+# resolved right after a MOVE_ANT, and food pickup, food drop off and building
+# capture happen at the END of the turn.  Works on boardless (fastclone)
+# states as well as states that have a board.
+#
+
+#Opcodes for the entries of an undo record
+OP_COORDS = 0
+OP_HEALTH = 1
+OP_MOVED = 2
+OP_CARRYING = 3
+OP_FOOD = 4
+OP_ADD_ANT = 5
+OP_REMOVE_ANT = 6
+OP_ADD_CONSTR = 7
+OP_CAPTURE = 8
+OP_TURN = 9
+
+##
+# defaultAttackChooser
+#
+# picks the target of an attack deterministically so that search results are
+# reproducible: the weakest enemy in range (first one found on ties)
+#
+# Parameters:
+#    state  - the GameState
+#    ant    - the attacking Ant
+#    targets - list of enemy Ants in range
+#
+# Return: one of the targets
+def defaultAttackChooser(state, ant, targets):
+    best = targets[0]
+    for target in targets[1:]:
+        if target.health < best.health:
+            best = target
+    return best
+
+##
+# attackTargets
+#
+# Parameters:
+#    state    - the GameState
+#    playerId - the owner of the attacking ant
+#    antType  - the type of the attacking ant
+#    coords   - where the attacking ant stands
+#
+# Return: the enemy Ants in range of the attacker
+def attackTargets(state, playerId, antType, coords):
+    attackRange = UNIT_STATS[antType][RANGE] ** 2
+    targets = []
+    for enemy in state.inventories[1 - playerId].ants:
+        diffX = coords[0] - enemy.coords[0]
+        diffY = coords[1] - enemy.coords[1]
+        if attackRange >= diffX ** 2 + diffY ** 2:
+            targets.append(enemy)
+    return targets
+
+##
+# isQuietMove
+#
+# a quiet move only moves an ant: it attacks nothing, builds nothing and
+# doesn't end the turn (which is when food is picked up and dropped off and
+# buildings are captured).  Searches can afford to look at quiet moves less
+# closely.  Must be called before the move is made.
+#
+# Return: True if the move is quiet
+def isQuietMove(state, move):
+    if move.moveType != MOVE_ANT:
+        return False
+    ant = getAntAt(state, move.coordList[0])
+    return not attackTargets(state, ant.player, ant.type, move.coordList[-1])
+
+##
+# applyMove
+#
+# applies a move to the given state in place
+#
+# Parameters:
+#    state          - the GameState to modify
+#    move           - a legal Move for the player whose turn it is
+#    attackChooser  - optional function(state, ant, targets) that selects the
+#                     enemy to attack (see defaultAttackChooser)
+#
+# Return: an undo record (a list) that can be passed to undoMove
+def applyMove(state, move, attackChooser=defaultAttackChooser):
+    undo = []
+    playerId = state.whoseTurn
+    playerInv = state.inventories[playerId]
+
+    if move.moveType == MOVE_ANT:
+        startCoord = move.coordList[0]
+        endCoord = move.coordList[-1]
+        ant = getAntAt(state, startCoord)
+
+        #move the ant
+        undo.append((OP_COORDS, ant, ant.coords))
+        undo.append((OP_MOVED, ant, ant.hasMoved))
+        ant.coords = endCoord
+        ant.hasMoved = True
+        if state.board is not None:
+            state.board[startCoord[0]][startCoord[1]].ant = None
+            state.board[endCoord[0]][endCoord[1]].ant = ant
+
+        #resolve an attack if there is an enemy in range
+        enemyInv = state.inventories[1 - playerId]
+        targets = attackTargets(state, playerId, ant.type, endCoord)
+        if targets:
+            target = attackChooser(state, ant, targets)
+            undo.append((OP_HEALTH, target, target.health))
+            target.health -= UNIT_STATS[ant.type][ATTACK]
+            if target.health <= 0:
+                undo.append((OP_REMOVE_ANT, enemyInv, target, enemyInv.ants.index(target)))
+                enemyInv.ants.remove(target)
+                if state.board is not None:
+                    state.board[target.coords[0]][target.coords[1]].ant = None
+
+    elif move.moveType == BUILD:
+        coord = move.coordList[0]
+        undo.append((OP_FOOD, playerInv, playerInv.foodCount))
+        if move.buildType == TUNNEL:
+            playerInv.foodCount -= CONSTR_STATS[TUNNEL][BUILD_COST]
+            tunnel = Building(coord, TUNNEL, playerId)
+            playerInv.constrs.append(tunnel)
+            undo.append((OP_ADD_CONSTR, playerInv, tunnel))
+            if state.board is not None:
+                state.board[coord[0]][coord[1]].constr = tunnel
+        else:
+            playerInv.foodCount -= UNIT_STATS[move.buildType][COST]
+            ant = Ant(coord, move.buildType, playerId)
+            ant.hasMoved = True
+            playerInv.ants.append(ant)
+            undo.append((OP_ADD_ANT, playerInv, ant))
+            if state.board is not None:
+                state.board[coord[0]][coord[1]].ant = ant
+
+    elif move.moveType == END:
+        for ant in playerInv.ants:
+            constr = getConstrAt(state, ant.coords)
+            if constr is not None:
+                #enemy buildings lose capture health to ants that stay put
+                if type(constr) is Building and not ant.hasMoved and constr.player != playerId:
+                    undo.append((OP_CAPTURE, constr, constr.captureHealth, constr.player))
+                    constr.captureHealth -= 1
+                    if constr.captureHealth == 0 and constr.type != ANTHILL:
+                        constr.player = playerId
+                        constr.captureHealth = CONSTR_STATS[constr.type][CAP_HEALTH]
+                #workers on food pick it up
+                elif constr.type == FOOD and ant.type == WORKER:
+                    undo.append((OP_CARRYING, ant, ant.carrying))
+                    ant.carrying = True
+                #carried food is dropped off at the anthill or a tunnel
+                elif (constr.type == ANTHILL or constr.type == TUNNEL) and ant.carrying:
+                    undo.append((OP_FOOD, playerInv, playerInv.foodCount))
+                    undo.append((OP_CARRYING, ant, ant.carrying))
+                    playerInv.foodCount += 1
+                    ant.carrying = False
+            if ant.hasMoved:
+                undo.append((OP_MOVED, ant, True))
+                ant.hasMoved = False
+        undo.append((OP_TURN, playerId))
+        state.whoseTurn = 1 - playerId
+
+    return undo
+
+##
+# undoMove
+#
+# takes back a move previously made with applyMove.  Moves must be undone in
+# the reverse order that they were applied.
+#
+# Parameters:
+#    state - the GameState that was passed to applyMove
+#    undo  - the undo record that applyMove returned
+#
+def undoMove(state, undo):
+    board = state.board
+    for entry in reversed(undo):
+        op = entry[0]
+        if op == OP_COORDS:
+            ant = entry[1]
+            if board is not None:
+                board[ant.coords[0]][ant.coords[1]].ant = None
+                board[entry[2][0]][entry[2][1]].ant = ant
+            ant.coords = entry[2]
+        elif op == OP_HEALTH:
+            entry[1].health = entry[2]
+        elif op == OP_MOVED:
+            entry[1].hasMoved = entry[2]
+        elif op == OP_CARRYING:
+            entry[1].carrying = entry[2]
+        elif op == OP_FOOD:
+            entry[1].foodCount = entry[2]
+        elif op == OP_ADD_ANT:
+            ant = entry[2]
+            entry[1].ants.remove(ant)
+            if board is not None:
+                board[ant.coords[0]][ant.coords[1]].ant = None
+        elif op == OP_REMOVE_ANT:
+            ant = entry[2]
+            entry[1].ants.insert(entry[3], ant)
+            if board is not None:
+                board[ant.coords[0]][ant.coords[1]].ant = ant
+        elif op == OP_ADD_CONSTR:
+            constr = entry[2]
+            entry[1].constrs.remove(constr)
+            if board is not None:
+                board[constr.coords[0]][constr.coords[1]].constr = None
+        elif op == OP_CAPTURE:
+            entry[1].captureHealth = entry[2]
+            entry[1].player = entry[3]
+        elif op == OP_TURN:
+            state.whoseTurn = entry[1]
+
+##
+# projectMove
+#
+# convenience wrapper for code that wants a separate copy of the state that
+# results from a move (the clone-per-child approach)
+#
+# Return: a new boardless GameState with the move applied
+def projectMove(state, move, attackChooser=defaultAttackChooser):
+    copyOfState = state.fastclone()
+    applyMove(copyOfState, move, attackChooser)
+    return copyOfState
+
+##
+# stateSignature
+#
+# builds a hashable summary of everything applyMove can change.  Two states
+# with the same signature are identical for the purposes of the game.
+#
+# Return: a tuple
+def stateSignature(state):
+    invSigs = []
+    for inv in state.inventories:
+        antSig = tuple([(ant.coords, ant.type, ant.player, ant.health,
+                         ant.hasMoved, ant.carrying) for ant in inv.ants])
+        constrSig = tuple([(constr.coords, constr.type, getattr(constr, "player", None),
+                            getattr(constr, "captureHealth", None)) for constr in inv.constrs])
+        invSigs.append((inv.player, inv.foodCount, antSig, constrSig))
+    return (state.phase, state.whoseTurn, tuple(invSigs))
+
+##
+# verifyRoundTrip
+#
+# applies and undoes every given move on the state and checks that each
+# undo leaves the state identical to how it started
+#
+# Parameters:
+#    state - the GameState to check (it is restored before returning)
+#    moves - the moves to try (defaults to every legal move)
+#
+# Return: a list of the moves that failed the round trip (empty on success)
+def verifyRoundTrip(state, moves=None):
+    if moves is None:
+        moves = listAllLegalMoves(state)
+    original = stateSignature(state)
+    failures = []
+    for move in moves:
+        undo = applyMove(state, move)
+        undoMove(state, undo)
+        if stateSignature(state) != original:
+            failures.append(move)
+    return failures
+
+##
+# benchmark
+#
+# compares the cost of generating every child of a state by cloning
+# (fastclone + apply) against applying and undoing on the one state
+#
+# Parameters:
+#    state      - the GameState to expand
+#    iterations - how many times to expand every child
+#
+# Return: a dictionary of total seconds for each approach and the speedup
+def benchmark(state, iterations=100):
+    moves = listAllLegalMoves(state)
+
+    start = time.time()
+    for i in xrange(iterations):
+        for move in moves:
+            projectMove(state, move)
+    cloneTime = time.time() - start
+
+    start = time.time()
+    for i in xrange(iterations):
+        for move in moves:
+            undoMove(state, applyMove(state, move))
+    undoTime = time.time() - start
+
+    return { "children" : len(moves) * iterations,
+             "clone_seconds" : cloneTime,
+             "make_unmake_seconds" : undoTime,
+             "speedup" : cloneTime / max(undoTime, 1e-9) }
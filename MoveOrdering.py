@@ -0,0 +1,145 @@
+from Constants import *
+from AIPlayerUtils import getAntAt
+from TranspositionTable import NO_MOVE
+
+#
+# MoveOrdering.py
+#
+# Decides which children an alpha/beta search should try first.  The sooner
+# the best move is searched the more of its siblings are cut off, so moves
+# are ranked by what earlier parts of the search learned about them:
+#
+#   1. the best move stored in the transposition table for the position
+#   2. killer moves - moves that caused a cutoff at the same ply elsewhere in
+#      the tree (they are often just as good in sibling positions)
+#   3. the history table - how often (and how deep) a kind of move has
+#      caused cutoffs anywhere in the search
+#
+# Whatever is left is ordered by the searcher's own static evaluation.
+#
+
+#how many killer moves are remembered per ply
+KILLER_SLOTS = 2
+
+#ranks of the kinds of move (higher is tried first)
+RANK_TABLE_MOVE = 2 + KILLER_SLOTS
+RANK_OTHER = 0
+
+##
+# historyKey
+#
+# identifies the kind of a move for the history table: which type of ant
+# moved from where to where, or what was built.  Must be called before the
+# move is made.
+#
+# Parameters:
+#    state - the GameState the move is made from
+#    move  - the Move
+#
+# Return: a tuple
+def historyKey(state, move):
+    if move.moveType == MOVE_ANT:
+        ant = getAntAt(state, move.coordList[0])
+        return (MOVE_ANT, ant.type, move.coordList[0], move.coordList[-1])
+    elif move.moveType == BUILD:
+        return (BUILD, move.buildType)
+    return (END,)
+
+##
+#MoveOrderer
+#Description: The killer move lists and history table for a searcher, and
+#   statistics on how well they order moves
+#
+#Variables:
+#   killers - { ply : [moveKey, ...] }, most recent first
+#   history - { historyKey : score }
+#   cutoffs - Nodes whose search was cut off
+#   firstChildCutoffs - Cutoffs caused by the first child searched
+##
+class MoveOrderer(object):
+
+    def __init__(self):
+        self.killers = {}
+        self.history = {}
+        self.resetStats()
+
+    ##
+    #newSearch
+    #Description: Prepares for the search of a new move.  Killers belong to
+    #   the old tree and are dropped; the history is kept but aged so recent
+    #   cutoffs count for more.
+    ##
+    def newSearch(self):
+        self.killers = {}
+        for key in self.history.keys():
+            self.history[key] /= 2
+            if self.history[key] == 0:
+                del self.history[key]
+
+    def resetStats(self):
+        self.cutoffs = 0
+        self.firstChildCutoffs = 0
+
+    ##
+    #rank
+    #Description: Scores a move for ordering
+    #
+    #Parameters:
+    #   ply - The depth of the node the move is made from (int)
+    #   moveKey - The move's TranspositionTable.moveKey
+    #   hKey - The move's historyKey
+    #   tableMove - The moveKey stored in the transposition table for the
+    #       node (NO_MOVE if there is none)
+    #
+    #Return: a tuple that sorts higher for moves that should be tried first
+    ##
+    def rank(self, ply, moveKey, hKey, tableMove=NO_MOVE):
+        if moveKey == tableMove and tableMove != NO_MOVE:
+            kind = RANK_TABLE_MOVE
+        else:
+            kind = RANK_OTHER
+            killers = self.killers.get(ply)
+            if killers is not None and moveKey in killers:
+                kind = RANK_TABLE_MOVE - 1 - killers.index(moveKey)
+        return (kind, self.history.get(hKey, 0))
+
+    ##
+    #recordCutoff
+    #Description: Learns from a move that caused a cutoff
+    #
+    #Parameters:
+    #   ply - The depth of the node that was cut off (int)
+    #   moveKey - The move that caused the cutoff
+    #   hKey - The move's historyKey
+    #   depthLeft - How many plies were searched below the node (int)
+    #   childIndex - The position of the move in the order searched (int)
+    ##
+    def recordCutoff(self, ply, moveKey, hKey, depthLeft, childIndex):
+        self.cutoffs += 1
+        if childIndex == 0:
+            self.firstChildCutoffs += 1
+
+        killers = self.killers.setdefault(ply, [])
+        if moveKey in killers:
+            killers.remove(moveKey)
+        killers.insert(0, moveKey)
+        del killers[KILLER_SLOTS:]
+
+        #deep cutoffs save more work so they count for more
+        self.history[hKey] = self.history.get(hKey, 0) + depthLeft * depthLeft
+
+    ##
+    #getStats
+    #
+    #Return: a dictionary with the number of cutoffs and the fraction that
+    #   came from the first child searched
+    ##
+    def getStats(self):
+        if self.cutoffs == 0:
+            rate = 0.0
+        else:
+            rate = float(self.firstChildCutoffs) / self.cutoffs
+        return { "cutoffs" : self.cutoffs,
+                 "first_child_cutoffs" : self.firstChildCutoffs,
+                 "first_child_cutoff_rate" : rate,
+                 "history_entries" : len(self.history) }
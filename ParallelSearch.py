@@ -0,0 +1,443 @@
+import sys, time, multiprocessing
+from CompactState import CompactState
+from SearchTimer import SearchDeadline, SearchTimeout
+from TranspositionTable import SharedTranspositionTable, DEFAULT_MAX_BYTES
+
+#
+# ParallelSearch.py
+#
+# Searches the moves at the root of a game tree in parallel.  Each root move
+# is handed to a pool of worker processes along with the position packed into
+# a CompactState byte string.  A worker rebuilds the position, makes the move
+# and searches below it with its own copy of the AI player.
+#
+# The best root value found so far (alpha) is kept in shared memory.  Every
+# worker reads it before starting on a move and raises it when it finds
+# something better, so later moves are searched with a narrower window just
+# as they would be in a serial search.
+#
+# A LazySMPSearch instead runs the same iterative deepening search from the
+# root in every worker.  The workers share one transposition table held in
+# shared memory (see SharedTranspositionTable) and order their moves slightly
+# differently, so each finds positions the others have already searched and
+# the main worker (worker 0) goes deeper than it would alone.
+#
+# An AI player that wants to use a RootSearchPool must provide:
+#
+#   searchRootMove(state, move, depth, alpha) - makes the move on the given
+#       boardless GameState, searches below it to the given depth and returns
+#       the value (from the player's point of view) or raises SearchTimeout.
+#       It must check self.deadline (a SearchDeadline or None) as it goes.
+#
+# An AI player that wants to use a LazySMPSearch must provide:
+#
+#   transpositions - the player's TranspositionTable (replaced by the shared
+#       table in the workers)
+#   nodeCount - the number of nodes its last search expanded
+#   lazySearch(state, workerIndex, firstDepth, lastDepth, deadline) - searches
+#       the boardless GameState with iterativeDeepening and returns (move,
+#       completed depth).  Workers other than 0 should vary their move order.
+#
+# A PonderSearch keeps searching in a worker process while the opponent takes
+# its turn (pondering).  The worker runs lazySearch on the position the
+# player's last move left the opponent in until it is stopped, storing what
+# it finds in a SharedTranspositionTable that the player also searches with.
+# The player's next search then finds the positions the opponent actually
+# played into already searched.  The best move the worker found is its
+# prediction of the opponent's reply.  A worker process is used rather than a
+# thread so that pondering doesn't take the interpreter away from the
+# opponent (or the user interface) in this process.
+#
+
+#the shared root alpha of this worker process (set by _initWorker)
+_sharedAlpha = None
+#the shared table and stop flag of this Lazy SMP or pondering worker (set by
+#_initSMPWorker)
+_sharedTable = None
+_stopFlag = None
+#the AI players created in this worker process, keyed by (module, player id)
+_players = {}
+
+def _initWorker(sharedAlpha):
+    global _sharedAlpha
+    _sharedAlpha = sharedAlpha
+
+def _getPlayer(moduleName, playerId):
+    key = (moduleName, playerId)
+    if key not in _players:
+        module = sys.modules.get(moduleName)
+        if module is None:
+            module = __import__(moduleName)
+        _players[key] = module.AIPlayer(playerId)
+    return _players[key]
+
+##
+# _searchRootMove
+#
+# runs in a worker process: searches below one root move
+#
+# Parameters:
+#    task - (index, module name, player id, packed state, move, depth,
+#            deadline time or None)
+#
+# Return: (index, value or None if time ran out, the alpha it searched with)
+def _searchRootMove(task):
+    index, moduleName, playerId, stateData, move, depth, deadlineTime = task
+    player = _getPlayer(moduleName, playerId)
+    state = CompactState.deserialize(stateData).toGameState()
+
+    if deadlineTime is not None:
+        player.deadline = SearchDeadline(deadlineTime - time.time())
+    alpha = _sharedAlpha.value
+    try:
+        value = player.searchRootMove(state, move, depth, alpha)
+    except SearchTimeout:
+        return (index, None, alpha)
+    finally:
+        player.deadline = None
+
+    #let the other workers search against the improved bound
+    with _sharedAlpha.get_lock():
+        if value > _sharedAlpha.value:
+            _sharedAlpha.value = value
+    return (index, value, alpha)
+
+##
+#RootSearchPool
+#Description: A pool of worker processes that search root moves
+#
+#Variables:
+#   processes - The number of worker processes
+##
+class RootSearchPool(object):
+
+    ##
+    #__init__
+    #Description: Creates the pool.  The processes are started on first use.
+    #
+    #Parameters:
+    #   processes - How many workers to use (defaults to the number of CPUs)
+    ##
+    def __init__(self, processes=None):
+        if processes is None:
+            processes = multiprocessing.cpu_count()
+        self.processes = processes
+        self.sharedAlpha = multiprocessing.Value('d', 0.0)
+        self.pool = None
+
+    ##
+    #search
+    #Description: Searches every given root move below a state
+    #
+    #Parameters:
+    #   player - The AI player searching (its module and playerId are used
+    #       to create the players in the workers)
+    #   state - The position to search from (GameState)
+    #   moves - The root Moves to search
+    #   depth - The depth to pass to searchRootMove
+    #   initialAlpha - The player's "minus infinity"
+    #   deadline - A SearchDeadline or None
+    #
+    #Return: the best Move (the first one searched on ties).  Raises
+    #   SearchTimeout if any move couldn't be searched in time.
+    ##
+    def search(self, player, state, moves, depth, initialAlpha, deadline=None):
+        if self.pool is None:
+            self.pool = multiprocessing.Pool(self.processes, _initWorker, (self.sharedAlpha,))
+        self.sharedAlpha.value = initialAlpha
+
+        stateData = CompactState.fromGameState(state).serialize()
+        deadlineTime = None
+        if deadline is not None:
+            deadlineTime = deadline.deadline
+        moduleName = type(player).__module__
+        tasks = [(index, moduleName, player.playerId, stateData, move, depth, deadlineTime)
+                 for index, move in enumerate(moves)]
+
+        results = [None] * len(moves)
+        for index, value, alpha in self.pool.imap_unordered(_searchRootMove, tasks):
+            if value is None:
+                raise SearchTimeout()
+            results[index] = (value, alpha)
+
+        #a value no better than the alpha it was searched with is only a bound,
+        #so on ties prefer a move whose value is exact
+        bestIndex = 0
+        for index in xrange(1, len(moves)):
+            value, alpha = results[index]
+            bestValue, bestAlpha = results[bestIndex]
+            if value > bestValue or (value == bestValue and bestValue <= bestAlpha and value > alpha):
+                bestIndex = index
+        return moves[bestIndex]
+
+    ##
+    #close
+    #Description: Stops the worker processes
+    ##
+    def close(self):
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
+
+def _initSMPWorker(table, stopFlag):
+    global _sharedTable, _stopFlag
+    _sharedTable = table
+    _stopFlag = stopFlag
+
+##
+#WorkerDeadline
+#Description: The deadline of a Lazy SMP helper.  It also runs out as soon as
+#   the main worker has finished, even during the first depth searched.
+##
+class WorkerDeadline(SearchDeadline):
+
+    def __init__(self, seconds, stopFlag):
+        SearchDeadline.__init__(self, seconds)
+        self.stopFlag = stopFlag
+
+    def check(self):
+        if self.stopFlag.value:
+            raise SearchTimeout()
+        SearchDeadline.check(self)
+
+##
+# _lazySearch
+#
+# runs in a worker process: one worker's share of a Lazy SMP search
+#
+# Parameters:
+#    task - (worker index, module name, player id, packed state, first depth,
+#            last depth, deadline time or None, table generation)
+#
+# Return: (worker index, move, completed depth, nodes, seconds)
+def _lazySearch(task):
+    index, moduleName, playerId, stateData, firstDepth, lastDepth, deadlineTime, generation = task
+    player = _getPlayer(moduleName, playerId)
+    state = CompactState.deserialize(stateData).toGameState()
+    player.transpositions = _sharedTable
+    _sharedTable.generation = generation
+
+    seconds = float("inf")
+    if deadlineTime is not None:
+        seconds = deadlineTime - time.time()
+    if index == 0:
+        deadline = SearchDeadline(seconds)
+    else:
+        deadline = WorkerDeadline(seconds, _stopFlag)
+
+    started = time.time()
+    move, depth = player.lazySearch(state, index, firstDepth, lastDepth, deadline)
+    return (index, move, depth, player.nodeCount, time.time() - started)
+
+##
+#LazySMPSearch
+#Description: A pool of worker processes that all search the same position,
+#   sharing a transposition table
+#
+#Variables:
+#   processes - The number of workers
+#   table - The SharedTranspositionTable
+#   workerStats - A dictionary for each worker in the last search
+#   nodeCount - The nodes expanded by all workers in the last search
+#   elapsed - How long the last search took (seconds)
+##
+class LazySMPSearch(object):
+
+    ##
+    #__init__
+    #Description: Creates the shared table.  The processes are started on
+    #   first use.
+    #
+    #Parameters:
+    #   processes - How many workers to use (defaults to the number of CPUs)
+    #   maxBytes - The size of the shared table in bytes
+    ##
+    def __init__(self, processes=None, maxBytes=DEFAULT_MAX_BYTES):
+        if processes is None:
+            processes = multiprocessing.cpu_count()
+        self.processes = processes
+        self.table = SharedTranspositionTable(maxBytes)
+        self.stopFlag = multiprocessing.RawValue('b', 0)
+        self.pool = None
+        self.workerStats = []
+        self.nodeCount = 0
+        self.elapsed = 0.0
+
+    ##
+    #search
+    #Description: Searches a position in every worker.  Odd numbered helpers
+    #   start a depth deeper than the main worker.  The helpers are stopped
+    #   once the main worker finishes.
+    #
+    #Parameters:
+    #   player - The AI player searching (its module and playerId are used
+    #       to create the players in the workers)
+    #   state - The position to search from (GameState)
+    #   firstDepth, lastDepth - The range of depths to search
+    #   deadline - A SearchDeadline, or None to search until lastDepth
+    #
+    #Return: (the move from the deepest search completed by any worker, its
+    #   depth).  The main worker's move is preferred on ties.
+    ##
+    def search(self, player, state, firstDepth, lastDepth, deadline=None):
+        if self.pool is None:
+            self.pool = multiprocessing.Pool(self.processes, _initSMPWorker,
+                                             (self.table, self.stopFlag))
+        self.stopFlag.value = 0
+        self.table.newSearch()
+        started = time.time()
+
+        stateData = CompactState.fromGameState(state).serialize()
+        deadlineTime = None
+        if deadline is not None:
+            deadlineTime = deadline.deadline
+        moduleName = type(player).__module__
+        tasks = [(index, moduleName, player.playerId, stateData,
+                  min(lastDepth, firstDepth + index % 2), lastDepth, deadlineTime,
+                  self.table.generation)
+                 for index in xrange(self.processes)]
+
+        results = [None] * self.processes
+        for result in self.pool.imap_unordered(_lazySearch, tasks):
+            results[result[0]] = result
+            if result[0] == 0:
+                self.stopFlag.value = 1
+        self.elapsed = time.time() - started
+
+        self.workerStats = []
+        for index, move, depth, nodes, seconds in results:
+            self.workerStats.append({ "worker" : index,
+                                      "nodes" : nodes,
+                                      "seconds" : seconds,
+                                      "nodes_per_second" : nodes / max(seconds, 1e-6),
+                                      "completed_depth" : depth })
+        self.nodeCount = sum([stats["nodes"] for stats in self.workerStats])
+
+        best = results[0]
+        for result in results[1:]:
+            if result[2] is not None and (best[2] is None or result[2] > best[2]):
+                best = result
+        return best[1], best[2]
+
+    ##
+    #getStats
+    #
+    #Return: a dictionary with the statistics of each worker in the last
+    #   search and the nodes per second of all of them together
+    ##
+    def getStats(self):
+        return { "workers" : self.workerStats,
+                 "nodes" : self.nodeCount,
+                 "seconds" : self.elapsed,
+                 "nodes_per_second" : self.nodeCount / max(self.elapsed, 1e-6) }
+
+    ##
+    #close
+    #Description: Stops the worker processes
+    ##
+    def close(self):
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
+
+##
+# _ponder
+#
+# runs in a worker process: searches a position until told to stop
+#
+# Parameters:
+#    task - (module name, player id, packed state, last depth, table
+#            generation)
+#
+# Return: (the position's hash, the best move found or None, the depth of
+#   the deepest completed search or None, nodes)
+def _ponder(task):
+    moduleName, playerId, stateData, lastDepth, generation = task
+    player = _getPlayer(moduleName, playerId)
+    state = CompactState.deserialize(stateData).toGameState()
+    player.transpositions = _sharedTable
+    _sharedTable.generation = generation
+
+    deadline = WorkerDeadline(float("inf"), _stopFlag)
+    move, depth = player.lazySearch(state, 0, 0, lastDepth, deadline)
+    return (state.getHash(), move, depth, player.nodeCount)
+
+##
+#PonderSearch
+#Description: A worker process that searches while the opponent moves
+#
+#Variables:
+#   table - The SharedTranspositionTable the worker stores its results in
+#   pending - The result of the search in progress (or None)
+#   result - What the last search that was stopped returned (see _ponder)
+##
+class PonderSearch(object):
+
+    ##
+    #__init__
+    #Description: Creates the shared table.  The process is started on first
+    #   use.
+    #
+    #Parameters:
+    #   maxBytes - The size of the shared table in bytes
+    ##
+    def __init__(self, maxBytes=DEFAULT_MAX_BYTES):
+        self.table = SharedTranspositionTable(maxBytes)
+        self.stopFlag = multiprocessing.RawValue('b', 0)
+        self.pool = None
+        self.pending = None
+        self.result = None
+
+    ##
+    #start
+    #Description: Starts searching a position in the worker, stopping the
+    #   search already in progress
+    #
+    #Parameters:
+    #   player - The AI player pondering (its module and playerId are used to
+    #       create the player in the worker)
+    #   state - The position to search (GameState)
+    #   lastDepth - The deepest search to make
+    ##
+    def start(self, player, state, lastDepth):
+        self.stop()
+        if self.pool is None:
+            self.pool = multiprocessing.Pool(1, _initSMPWorker, (self.table, self.stopFlag))
+        self.stopFlag.value = 0
+        self.table.newSearch()
+        task = (type(player).__module__, player.playerId,
+                CompactState.fromGameState(state).serialize(), lastDepth,
+                self.table.generation)
+        self.pending = self.pool.apply_async(_ponder, (task,))
+
+    def isRunning(self):
+        return self.pending is not None
+
+    ##
+    #stop
+    #Description: Stops the search in progress and waits for the worker to
+    #   finish writing to the table
+    #
+    #Return: what the search returned (see _ponder), or None if nothing was
+    #   being searched
+    ##
+    def stop(self):
+        if self.pending is None:
+            return None
+        self.stopFlag.value = 1
+        self.result = self.pending.get()
+        self.pending = None
+        return self.result
+
+    ##
+    #close
+    #Description: Stops the worker process
+    ##
+    def close(self):
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
+        self.pending = None
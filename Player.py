@@ -60,6 +60,32 @@ class Player(object):
         #method template, not implemented
         pass
         
+    ##
+    #registerOpponentMove
+    #Description: Tells the player about a move its opponent has made.  Called
+    #   after every move of the opponent's turn, including the END.
+    #
+    #Parameters:
+    #   currentState - A clone of the state after the move, as this player sees
+    #       it (GameState), or None if wantsOpponentState returned False
+    #   move - The Move the opponent made, in this player's coordinates (Move)
+    ##
+    def registerOpponentMove(self, currentState, move):
+        #method template, not implemented
+        pass
+
+    ##
+    #wantsOpponentState
+    #Description: Asked before each call to registerOpponentMove.  The state
+    #   passed to it is a full clone of the board, so the game only makes one
+    #   for players that want it: by default those that override
+    #   registerOpponentMove.
+    #
+    #Return: True if registerOpponentMove should be given the state (Boolean)
+    ##
+    def wantsOpponentState(self):
+        return type(self).registerOpponentMove.im_func is not Player.registerOpponentMove.im_func
+
     ##
     #registerWin
     #Description: Tells the player if they won or not
@@ -0,0 +1,250 @@
+import sys
+
+#
+# SearchNode.py
+#
+# The nodes of the searching AI players' game trees and a pool to keep them
+# in.  A search creates a node for every child it evaluates, thousands for
+# each move, so nodes are small objects with fixed fields (__slots__) rather
+# than dictionaries, and the pool hands the same objects out again in the
+# next search instead of allocating new ones.
+#
+# A NodePool is an arena: new takes the next unused node, and recycle, called
+# when a search starts, makes every node unused again.  The nodes of a
+# search therefore stay valid until the next search starts, however the
+# searcher links them together.  resetStats starts the counters again, once
+# per move (a deepening search recycles its nodes at every depth).
+#
+# A searcher can also keep part of a tree for its next search: a node's
+# children list holds every child it was expanded into, and retain keeps the
+# subtree below one node (making it the root) while every other node becomes
+# unused again.  When the searcher's next move starts from the position that
+# node stands for, the expansions made below it last time are still there.
+#
+# Searchers that keep a state in their nodes set it with setState and drop
+# it with dropState once the node's subtree has been searched, so a deep
+# search only holds the states along the path it is exploring (and those of
+# the children waiting to be searched).  The pool counts the nodes and states
+# in use, and getStats reports the peaks of both along with an estimate of
+# the memory they took.
+#
+
+#the default memory a search is expected to stay within (bytes)
+DEFAULT_CEILING = 64 * 1024 * 1024
+
+##
+#SearchNode
+#Description: A node of a search tree
+#
+#Variables:
+#   parent - The parent node (None at the root)
+#   move - The Move taken from the parent's state to reach this node
+#   moveKey, historyKey - The Move's moveKey and historyKey (see
+#       MoveOrdering)
+#   whoseTurn - Whose turn it is after the move
+#   stateValue - An evaluation of the state reached by the move
+#   value - The value found by searching below the node
+#   bestChild - The child node the value came from
+#   children - Every child the node was expanded into (None until it has
+#       been expanded)
+#   state - The state reached by the move, for searchers that keep one
+##
+class SearchNode(object):
+
+    __slots__ = ("parent", "move", "moveKey", "historyKey", "whoseTurn",
+                 "stateValue", "value", "bestChild", "children", "state")
+
+    def __init__(self):
+        self.reset()
+
+    ##
+    #reset
+    #Description: Clears the node's fields for reuse
+    ##
+    def reset(self):
+        self.parent = None
+        self.move = None
+        self.moveKey = 0
+        self.historyKey = None
+        self.whoseTurn = None
+        self.stateValue = 0.0
+        self.value = 0.0
+        self.bestChild = None
+        self.children = None
+        self.state = None
+
+#the memory taken by a node
+NODE_BYTES = sys.getsizeof(SearchNode())
+
+##
+# stateBytes
+#
+# estimates the memory taken by a GameState: the state, its own inventories
+# and their ants and constructions (a shared terrain inventory and the board
+# belong to the state they were cloned from)
+#
+# Return: bytes (int)
+def stateBytes(state):
+    total = sys.getsizeof(state) + sys.getsizeof(state.__dict__) + \
+            sys.getsizeof(state.inventories)
+    for inv in state.inventories:
+        if inv.shared:
+            continue
+        total += sys.getsizeof(inv) + sys.getsizeof(inv.__dict__) + \
+                 sys.getsizeof(inv.ants) + sys.getsizeof(inv.constrs)
+        for entity in inv.ants + inv.constrs:
+            total += sys.getsizeof(entity) + sys.getsizeof(entity.__dict__)
+    return total
+
+##
+#NodePool
+#Description: The nodes of a searcher, reused from search to search
+#
+#Variables:
+#   nodes - Every node the pool has allocated
+#   used - How many of them the current search has taken
+#   liveStates - How many nodes hold a state
+#   ceiling - The memory a search is expected to stay within (bytes)
+#   stateSize - The estimated size of one state (see stateBytes)
+#   allocations - Nodes allocated (rather than reused) since resetStats
+#   reuses - Nodes reused since resetStats
+#   peakNodes, peakStates - The most nodes and states in use at once
+#   retained, discarded - How many nodes the last recycle or retain kept for
+#       the next search and how many it made unused
+##
+class NodePool(object):
+
+    def __init__(self, ceiling=DEFAULT_CEILING):
+        self.nodes = []
+        self.used = 0
+        self.liveStates = 0
+        self.ceiling = ceiling
+        self.stateSize = 0
+        self.retained = 0
+        self.discarded = 0
+        self.resetStats()
+
+    def resetStats(self):
+        self.allocations = 0
+        self.reuses = 0
+        self.peakNodes = self.used
+        self.peakStates = self.liveStates
+
+    ##
+    #recycle
+    #Description: Starts a new search: every node is free again.  The old
+    #   nodes' references are cleared so the states and moves they held can
+    #   be freed.  The counters are kept until resetStats.
+    ##
+    def recycle(self):
+        nodes = self.nodes
+        for i in xrange(self.used):
+            nodes[i].reset()
+        self.retained = 0
+        self.discarded = self.used
+        self.used = 0
+        self.liveStates = 0
+
+    ##
+    #retain
+    #Description: Starts a new search that keeps the subtree below a node
+    #   (following the nodes' children) as its tree, with the node as the
+    #   root.  Every other node is free again.
+    #
+    #Return: the root
+    ##
+    def retain(self, root):
+        kept = []
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            kept.append(node)
+            if node.children is not None:
+                stack.extend(node.children)
+
+        keptSet = set(kept)
+        dropped = [node for node in self.nodes[:self.used] if node not in keptSet]
+        for node in dropped:
+            node.reset()
+        self.nodes = kept + dropped + self.nodes[self.used:]
+        self.used = len(kept)
+        self.liveStates = len([node for node in kept if node.state is not None])
+        self.retained = len(kept)
+        self.discarded = len(dropped)
+
+        root.parent = None
+        root.move = None
+        root.moveKey = 0
+        root.historyKey = None
+        return root
+
+    ##
+    #new
+    #
+    #Return: a cleared node for the current search
+    ##
+    def new(self):
+        if self.used < len(self.nodes):
+            node = self.nodes[self.used]
+            self.reuses += 1
+        else:
+            node = SearchNode()
+            self.nodes.append(node)
+            self.allocations += 1
+        self.used += 1
+        if self.used > self.peakNodes:
+            self.peakNodes = self.used
+        return node
+
+    ##
+    #setState
+    #Description: Stores the state reached by a node in it
+    ##
+    def setState(self, node, state):
+        if node.state is None:
+            self.liveStates += 1
+            if self.liveStates > self.peakStates:
+                self.peakStates = self.liveStates
+                if not self.stateSize:
+                    self.stateSize = stateBytes(state)
+        node.state = state
+
+    ##
+    #dropState
+    #Description: Lets go of the state held by a node
+    ##
+    def dropState(self, node):
+        if node.state is not None:
+            self.liveStates -= 1
+            node.state = None
+
+    ##
+    #peakBytes
+    #
+    #Return: an estimate of the most memory the nodes and their states took
+    #   at once during the current search
+    ##
+    def peakBytes(self):
+        return self.peakNodes * NODE_BYTES + self.peakStates * self.stateSize
+
+    ##
+    #getStats
+    #
+    #Return: a dictionary with the node allocations and reuses, the peak
+    #   numbers of nodes and states in use, the estimated peak memory and
+    #   whether it stayed under the ceiling (all since resetStats), and how
+    #   many nodes of the last search's tree were kept and discarded when
+    #   this one started
+    ##
+    def getStats(self):
+        peak = self.peakBytes()
+        return { "node_allocations" : self.allocations,
+                 "nodes_reused" : self.reuses,
+                 "pool_size" : len(self.nodes),
+                 "peak_nodes" : self.peakNodes,
+                 "peak_states" : self.peakStates,
+                 "peak_bytes" : peak,
+                 "ceiling_bytes" : self.ceiling,
+                 "within_ceiling" : peak <= self.ceiling,
+                 "nodes_retained" : self.retained,
+                 "nodes_discarded" : self.discarded }
@@ -0,0 +1,209 @@
+import time
+from Constants import *
+from Ant import UNIT_STATS
+
+#
+# SearchTimer.py
+#
+# Time control for the searching AI players.  A MoveClock decides how long a
+# move may take (from what is left of the player's time for the game and how
+# far the game has progressed) and hands out a SearchDeadline for it.  The
+# search checks the deadline as it goes and is abandoned with a SearchTimeout
+# when time runs out; iterativeDeepening keeps the result of the deepest
+# search that finished.
+#
+
+#fraction of AI_MOVE_TIMEOUT held back so a move never reaches the limit
+SAFETY_MARGIN = 0.1
+#the time a player plans to spend over a whole game (seconds)
+GAME_TIME_BUDGET = 4 * AI_MOVE_TIMEOUT
+#never plan on less than this for a move (seconds)
+MIN_MOVE_TIME = 0.05
+#rough number of moves a player makes per unit of food still to be gathered
+MOVES_PER_FOOD = 12
+#never plan for fewer moves than this
+MIN_MOVES_LEFT = 10
+#how a move's share of the budget is scaled in each part of the game
+OPENING_FACTOR = 0.5
+MIDGAME_FACTOR = 1.0
+ENDGAME_FACTOR = 1.5
+#how much longer each iteration of a deepening search is expected to take
+#than the one before it
+GROWTH_FACTOR = 3.0
+#how much longer a search is expected to take after its beam is widened
+#(see BeamWidth)
+WIDEN_FACTOR = 1.5
+
+##
+#SearchTimeout
+#Description: Raised by SearchDeadline.check when a search is out of time
+##
+class SearchTimeout(Exception):
+    pass
+
+##
+#SearchDeadline
+#Description: The point in time a search has to finish by
+#
+#Variables:
+#   start - When the search began (seconds since the epoch)
+#   deadline - When it must end
+#   enabled - check only raises while this is True
+##
+class SearchDeadline(object):
+
+    ##
+    #__init__
+    #Description: Starts the clock on a search
+    #
+    #Parameters:
+    #   seconds - How long the search may take (float)
+    ##
+    def __init__(self, seconds):
+        self.start = time.time()
+        self.deadline = self.start + seconds
+        self.enabled = True
+
+    ##
+    #check
+    #Description: Called by a search at each node; abandons the search once
+    #   the time is up
+    ##
+    def check(self):
+        if self.enabled and time.time() > self.deadline:
+            raise SearchTimeout()
+
+    def remaining(self):
+        return self.deadline - time.time()
+
+    def elapsed(self):
+        return time.time() - self.start
+
+##
+#MoveClock
+#Description: Shares a player's time for the game out over its moves
+#
+#Variables:
+#   gameBudget - The seconds the player plans to spend on the whole game
+#   moveLimit - The most any single move may take (AI_MOVE_TIMEOUT)
+#   remaining - The seconds of gameBudget not yet spent
+##
+class MoveClock(object):
+
+    def __init__(self, gameBudget=GAME_TIME_BUDGET, moveLimit=AI_MOVE_TIMEOUT):
+        self.gameBudget = gameBudget
+        self.moveLimit = moveLimit
+        self.reset()
+
+    ##
+    #reset
+    #Description: Restores the full budget (call at the start of each game)
+    ##
+    def reset(self):
+        self.remaining = float(self.gameBudget)
+        self.deadline = None
+
+    ##
+    #allocate
+    #Description: Decides how long to spend on a move: the remaining budget
+    #   divided by the moves expected to be left, scaled for the part of the
+    #   game (quick in the opening, longer when the game is about to be
+    #   decided) and capped by the per-move limit
+    #
+    #Parameters:
+    #   currentState - The state the move is being made from
+    #
+    #Return: seconds (float)
+    ##
+    def allocate(self, currentState):
+        share = self.remaining / estimateMovesLeft(currentState)
+        allowed = share * phaseFactor(currentState)
+        allowed = min(allowed, self.moveLimit * (1.0 - SAFETY_MARGIN))
+        return max(allowed, MIN_MOVE_TIME)
+
+    ##
+    #startMove
+    #
+    #Return: a SearchDeadline for a move from the given state
+    ##
+    def startMove(self, currentState):
+        self.deadline = SearchDeadline(self.allocate(currentState))
+        return self.deadline
+
+    ##
+    #endMove
+    #Description: Charges the time the move took to the budget
+    ##
+    def endMove(self):
+        if self.deadline is not None:
+            self.remaining = max(0.0, self.remaining - self.deadline.elapsed())
+            self.deadline = None
+
+##
+# estimateMovesLeft
+#
+# Return: a rough count of the moves the player to move still has to make,
+#   based on how much food is still needed to win
+def estimateMovesLeft(currentState):
+    mostFood = max(inv.foodCount for inv in currentState.inventories[:NEUTRAL])
+    return max(MIN_MOVES_LEFT, (FOOD_GOAL - mostFood) * MOVES_PER_FOOD)
+
+##
+# phaseFactor
+#
+# Return: how much of its share of the budget a move in this part of the game
+#   should get: less in the opening (no food gathered, no ants built), more in
+#   the endgame (a player close to the food goal or a wounded queen)
+def phaseFactor(currentState):
+    players = currentState.inventories[:NEUTRAL]
+    for inv in players:
+        queen = inv.getQueen()
+        if inv.foodCount >= FOOD_GOAL - 3 or queen is None or \
+           queen.health <= UNIT_STATS[QUEEN][HEALTH] / 2:
+            return ENDGAME_FACTOR
+    for inv in players:
+        if inv.foodCount > 1 or len(inv.ants) > 2:
+            return MIDGAME_FACTOR
+    return OPENING_FACTOR
+
+##
+# iterativeDeepening
+#
+# runs a depth-limited search at increasing depths until the deadline passes
+# or the depth limit is reached.  The first depth is always searched to
+# completion so that there is a result to return.  A deeper search is not
+# started if it isn't expected to finish in the time that is left.
+#
+# A selective search can be given a widen function.  When there's time left
+# but not enough for the next depth, the search is widened and the same depth
+# searched again for as long as each wider search is expected to finish.
+#
+# Parameters:
+#    search   - a function(depth) that searches to the given depth, calling
+#               deadline.check() as it goes, and returns its result
+#    firstDepth, lastDepth - the range of depths to search
+#    deadline - a SearchDeadline
+#    widen    - a function() that widens the search, returning False if it
+#               can't be widened any more (or None)
+#
+# Return: (the result of the deepest completed search, that depth)
+def iterativeDeepening(search, firstDepth, lastDepth, deadline, widen=None):
+    result = None
+    completedDepth = None
+    depth = firstDepth
+    while depth <= lastDepth:
+        #only the first depth is allowed to overrun
+        deadline.enabled = completedDepth is not None
+        started = time.time()
+        try:
+            result = search(depth)
+        except SearchTimeout:
+            break
+        completedDepth = depth
+        spent = time.time() - started
+        if depth < lastDepth and deadline.remaining() >= spent * GROWTH_FACTOR:
+            depth += 1
+        elif widen is None or deadline.remaining() < spent * WIDEN_FACTOR or not widen():
+            break
+    deadline.enabled = True
+    return result, completedDepth
@@ -0,0 +1,943 @@
+import random
+from Constants import *
+from Construction import CONSTR_STATS, Construction
+from Ant import UNIT_STATS, Ant
+from AIPlayerUtils import *
+from SearchTimer import MoveClock, iterativeDeepening
+from MoveOrdering import MoveOrderer, historyKey
+from TranspositionTable import moveKey
+from ParallelSearch import RootSearchPool
+from BeamWidth import FixedBeam, AdaptiveBeam
+from SearchNode import NodePool
+from MoveEngine import isQuietMove
+
+#
+# SelectiveSearch.py
+#
+# The selective alpha/beta search techniques of the searching AI players
+# (MiniMax, NeuralNet and GeneticAlgorithm), and the whole search NeuralNet
+# and GeneticAlgorithm have in common.
+#
+# Principal variation search (PVS) searches the first child of a node (the
+# one the move ordering thinks best) with the full window and every other
+# child with a null window around alpha (or beta).  A null window search
+# only shows whether a child is better than the best so far; a child that
+# is gets searched again with the full window.
+#
+# An aspiration window searches each depth of a deepening search with a
+# window around the value the last depth found, and opens up whichever side
+# the value falls outside of.
+#
+# Late move reductions (LMR) search late quiet children (see
+# MoveEngine.isQuietMove) less deeply with a null window first and only
+# search them at full depth if that shows they may be better.  Futility
+# pruning doesn't search a quiet child next to the leaves whose evaluation
+# is too far below alpha (or above beta) for its subtree to matter.
+#
+# An adaptive beam chooses how many children to search below each node from
+# their scores and the depth (see BeamWidth).  Tree reuse keeps the search
+# tree from depth to depth so positions already expanded aren't expanded
+# again (see SearchNode).
+#
+# The selective techniques (the adaptive beam, PVS, LMR and futility
+# pruning) trade some accuracy for speed.  The constants below give their
+# defaults, and a player (or a benchmark) turns each on or off with the use*
+# variables SelectiveSearch gives it.
+#
+# A SelectiveSearch keeps a player's settings and counters for all of this.
+# A CloneSearch is a complete alpha/beta search in which every node holds
+# its own copy of the state.  It has its own move generator (processMove)
+# and its player provides evaluateState.
+#
+
+# choose how many children to search below each node from their scores and
+# the depth (see BeamWidth) rather than always using the player's fixed beam.
+# Off by default until games between the two show the adaptive beam plays
+# at least as well.
+ADAPTIVE_BEAM = False
+# keep the search tree from depth to depth and (MiniMax only), below the
+# move made, from move to move, so positions already expanded aren't
+# expanded again
+REUSE_TREE = True
+# search every child but the first with a null window (principal variation
+# search).  Off by default until games between the two show it plays at
+# least as well as a plain alpha/beta search.
+USE_PVS = False
+# the width of a null window
+NULL_WINDOW = 1e-9
+# search each depth of a deepening search with a window this far either side
+# of the value the last depth found (an aspiration window) before the full
+# window.  Off by default: the value jumps when the search first reaches the
+# opponent's turn, so the window mostly fails and the depth is searched twice.
+USE_ASPIRATION = False
+ASPIRATION_WINDOW = 0.02
+# search late quiet moves (see MoveEngine.isQuietMove) LMR_REDUCTION plies
+# less deep first (late move reductions): every child after the first
+# LMR_FULL_CHILDREN of a node with at least LMR_MIN_DEPTH plies below it.
+# Off by default until games with and without it (see measureStrength in
+# bench/MiniMaxBench.py) show it plays at least as well.
+USE_LMR = False
+LMR_FULL_CHILDREN = 2
+LMR_MIN_DEPTH = 3
+LMR_REDUCTION = 1
+# don't search quiet children one ply from the leaves whose evaluation is
+# worse than alpha (or beta) by FUTILITY_MARGIN (futility pruning).  Off by
+# default for the same reason as USE_LMR.
+USE_FUTILITY = False
+FUTILITY_MARGIN = 0.001
+
+# settings of a CloneSearch
+# representation of inf
+INFINITY = 9999
+# deepen the search until the move's time runs out (see SearchTimer) rather
+# than always searching to self.maxDepth
+USE_TIME_BUDGET = True
+# the deepest an iterative deepening search will go
+DEPTH_LIMIT = 8
+# search the root moves in a pool of worker processes (see ParallelSearch)
+PARALLEL_ROOT = False
+# how many worker processes to use (None for one per CPU)
+ROOT_PROCESSES = None
+# the memory a search's nodes and states are expected to stay within (see
+# SearchNode)
+SEARCH_MEMORY_CEILING = 64 * 1024 * 1024
+
+##
+#SelectiveSearch
+#Description: The settings and counters of a player's selective search,
+#   and the tests the search makes with them.  A player calls initSearch
+#   from its __init__.
+#
+#Variables:
+#   orderer - Killer moves and the history table (see MoveOrdering)
+#   pool - The search tree's nodes (see SearchNode)
+#   beam - Picks the children to search below each node (see BeamWidth)
+#   useTreeReuse, usePVS, useAspiration, useLMR, useFutility - The
+#       techniques in use (see the constants above)
+#   reuseNode, reuseKey - The child of the root the last move made and the
+#       hash of the position it reaches, for a player that keeps its tree
+#       from move to move
+#   rootValue - The value the last depth of a deepening search found
+##
+class SelectiveSearch(object):
+
+    ##
+    #initSearch
+    #Description: Sets up the search settings and zeroes the counters
+    #
+    #Parameters:
+    #   memoryCeiling - The memory the search's nodes are expected to stay
+    #       within (bytes)
+    #   fixedBeam - The beam to use when ADAPTIVE_BEAM is off
+    ##
+    def initSearch(self, memoryCeiling, fixedBeam):
+        self.orderer = MoveOrderer()
+        self.pool = NodePool(memoryCeiling)
+        self.useTreeReuse = REUSE_TREE
+        self.reuseNode = None
+        self.reuseKey = None
+        self.usePVS = USE_PVS
+        self.useAspiration = USE_ASPIRATION
+        self.useLMR = USE_LMR
+        self.useFutility = USE_FUTILITY
+        if ADAPTIVE_BEAM:
+            self.beam = AdaptiveBeam()
+        else:
+            self.beam = fixedBeam
+        self.resetSearchStats()
+
+    ##
+    #resetSearchStats
+    #Description: Zeroes the counters for the search of a new move
+    ##
+    def resetSearchStats(self):
+        self.reusedExpansions = 0
+        self.pvsResearches = 0
+        self.aspirationResearches = 0
+        self.lmrReductions = 0
+        self.lmrResearches = 0
+        self.futilityPrunes = 0
+        self.rootValue = None
+
+    ##
+    #getSelectiveStats
+    #
+    #Return: a dictionary of how many principal variation and aspiration
+    #   searches were repeated, how many moves were reduced (and searched
+    #   again) or pruned and how many expansions were found already in the
+    #   tree
+    ##
+    def getSelectiveStats(self):
+        return { "pvs_researches" : self.pvsResearches,
+                 "aspiration_researches" : self.aspirationResearches,
+                 "lmr_reductions" : self.lmrReductions,
+                 "lmr_researches" : self.lmrResearches,
+                 "futility_prunes" : self.futilityPrunes,
+                 "expansions_reused" : self.reusedExpansions }
+
+    ##
+    #aspirationSearch
+    #Description: Searches the root, first with an aspiration window around
+    #   the last depth's value if aspiration windows are on, and remembers
+    #   the value found
+    #
+    #Parameters:
+    #   search - a function(alpha, beta) that searches the root
+    #   valueOf - a function giving the value of what search returns
+    #   infinity - The player's largest value
+    #
+    #Return: what the last call to search returned
+    ##
+    def aspirationSearch(self, search, valueOf, infinity):
+        alpha = -infinity
+        beta = infinity
+        if self.useAspiration and self.rootValue is not None:
+            alpha = self.rootValue - ASPIRATION_WINDOW
+            beta = self.rootValue + ASPIRATION_WINDOW
+        while True:
+            found = search(alpha, beta)
+            value = valueOf(found)
+            if value <= alpha and alpha > -infinity:
+                alpha = -infinity
+            elif value >= beta and beta < infinity:
+                beta = infinity
+            else:
+                break
+            self.aspirationResearches += 1
+        self.rootValue = value
+        return found
+
+    ##
+    #isFutile
+    #
+    #Return: True if futility pruning is on and a child's value is too far
+    #   outside the window to matter (its move must be checked to be quiet)
+    ##
+    def isFutile(self, value, alpha, beta, isMax):
+        return self.useFutility and ((isMax and value + FUTILITY_MARGIN <= alpha)
+                                     or (not isMax and value - FUTILITY_MARGIN >= beta))
+
+    ##
+    #isReducible
+    #
+    #Return: True if late move reductions are on and a child is late enough,
+    #   with enough plies below it, to be reduced (its move must be checked
+    #   to be quiet)
+    ##
+    def isReducible(self, childIndex, depthLeft):
+        return self.useLMR and childIndex >= LMR_FULL_CHILDREN and depthLeft >= LMR_MIN_DEPTH
+
+##
+# nullWindow
+#
+# Return: the (alpha, beta) of a null window at alpha, when the player
+#   moving at the parent raises alpha, or else at beta
+def nullWindow(alpha, beta, isMax):
+    if isMax:
+        return alpha, alpha + NULL_WINDOW
+    return beta - NULL_WINDOW, beta
+
+##
+# failsToImprove
+#
+# Return: True if a value is no better than alpha (or beta) for the player
+#   moving at the parent
+def failsToImprove(value, alpha, beta, isMax):
+    return (isMax and value <= alpha) or (not isMax and value >= beta)
+
+##
+#CloneSearch
+#Description: An alpha/beta search in which each node holds the state it
+#   stands for (a fastclone made with processMove).  The tree is kept from
+#   depth to depth (but not from move to move, see searchMove), deepened
+#   until the move's time runs out, and optionally shared out at the root
+#   among worker processes (see ParallelSearch).
+#
+#   A player using it calls initCloneSearch from its __init__ and provides
+#   evaluateState(state).  It may override nodeValue to value nodes some
+#   other way.
+##
+class CloneSearch(SelectiveSearch):
+
+    ##
+    # initCloneSearch
+    # Description: Sets up the search
+    #
+    # Parameters:
+    #   self - The object pointer
+    #
+    def initCloneSearch(self):
+        # a depth limit for the search algorithm
+        self.maxDepth = 1
+
+        # time control for iterative deepening
+        self.useTimeBudget = USE_TIME_BUDGET
+        self.clock = MoveClock()
+        self.deadline = None
+
+        # the search settings, with the better half of the children searched
+        # below each node unless the beam is adaptive
+        self.initSearch(SEARCH_MEMORY_CEILING, FixedBeam(fraction=0.5))
+
+        # parallel root search (the pool is started on first use)
+        self.useParallelRoot = PARALLEL_ROOT
+        self.rootPool = None
+
+    ##
+    # evaluateNodes
+    # Description: The evaluateNodes method evaluates a list of nodes
+    # and determines their overall evaluation score.
+    #
+    # Parameters:
+    #   self - The object pointer
+    #   nodes - The list of nodes to evaluate
+    #
+    # Return: An overall evaluation score of the list of nodes
+    #
+    def evaluateNodes(self, nodes):
+        # holds the greatest state_value in the list of nodes
+        bestValue = 0.0
+        # look through the nodes and find the greatest state_value
+        for node in nodes:
+            if node.stateValue > bestValue:
+                bestValue = node.stateValue
+        # return the greatest state_value
+        return bestValue
+
+        
+    ##
+    # alpha_beta_search
+    # Description: use minimax with alpha beta pruning to determine what move to make
+    #
+    # Parameters:
+    #   self - the object pointer
+    #   node - the initial node, before any moves are explored
+    #
+    # Returns: the move which benefits the opposing player the least.
+    #
+    ##
+    def alpha_beta_search(self, node):
+        bestNode = self.aspirationSearch(lambda alpha, beta: self.max_value(node, alpha, beta, 0),
+                                         lambda bestNode: bestNode.stateValue, INFINITY)
+
+        while bestNode.parent.parent is not None:
+            bestNode = bestNode.parent
+        return bestNode.move
+
+    
+    ##
+    # createNode
+    # Description: Creates a node with values set based on parameters
+    #
+    # Parameters:
+    #   self - The object pointer
+    #   move - The move that leads to the resultingState
+    #   resultingState - The state that results from making the move
+    #   parent - The parent node of the node being created
+    #
+    # Returns: A new node with the values initialized using the parameters
+    #
+    def createNode(self, move, resultingState, parent):
+        # Take a new node from the pool (see SearchNode)
+        newNode = self.pool.new()
+        # set the move
+        newNode.move = move
+        # set the state that results from making the move
+        self.pool.setState(newNode, resultingState)
+        # set the value of the resulting state
+        newNode.stateValue = self.nodeValue(resultingState)
+        # store a reference to the parent of this node
+        newNode.parent = parent
+        return newNode
+
+    ##
+    # nodeValue
+    # Description: The value createNode gives a node: evaluateState unless
+    #   the player values nodes some other way
+    #
+    # Parameters:
+    #   self - The object pointer
+    #   state - The state of the node
+    #
+    # Returns: The value of the state on a scale of 0.0 to 1.0
+    #
+    def nodeValue(self, state):
+        return self.evaluateState(state)
+
+    ##
+    # expandNode
+    # Description: creates a node for each move worth considering from a
+    #   node's state
+    #
+    # Parameters:
+    #   self - the object pointer
+    #   node - the node to expand
+    #   goalValue - the state_value of a win for the player to move
+    #
+    # Returns: (a node that reaches a goal state or None, the list of nodes)
+    #
+    def expandNode(self, node, goalValue):
+        state = node.state
+        # a node that was expanded earlier keeps its children
+        if node.children is not None:
+            return self.reexpandNode(node, goalValue)
+        # holds a list of nodes reachable from the currentState
+        nodeList = []
+        # loop through all legal moves for the currentState
+        for move in listAllLegalMoves(state, True):
+            # don't bother doing any move evaluations for the queen
+            # unless we need to build a worker (she is in the way!)
+            if move.moveType == MOVE_ANT:
+                initialCoords = move.coordList[0]
+                if ((getAntAt(state, initialCoords).type == QUEEN) and 
+                    len(state.inventories[state.whoseTurn].ants) >= 2):
+                        continue
+            if move.moveType == BUILD:
+                # hacky way to speed up the code by forcing building workers
+                # over any other ant
+                if move.buildType != WORKER:
+                    continue
+            # get the state that would result if the move is made
+            resultingState = self.processMove(state, move)
+            #create a newNode for the resulting state
+            newNode = self.createNode(move, resultingState, node)
+            newNode.moveKey = moveKey(move)
+            newNode.historyKey = historyKey(state, move)
+            # if a goal state has been found, stop evaluating other branches
+            if newNode.stateValue == goalValue:
+                #we have a goal state, no alpha_beta evaluation is needed
+                #(nor are any of the states)
+                self.dropStates(nodeList + [newNode])
+                return newNode, nodeList
+            nodeList.append(newNode)
+        if self.useTreeReuse:
+            node.children = nodeList
+        return None, list(nodeList)
+
+    ##
+    # reexpandNode
+    # Description: expandNode for a node that already has its children.  The
+    #   children's states were dropped once they had been searched, so they
+    #   are made again.  An attack picks its target at random (see
+    #   processMove), so a child reached by one may not be the position it
+    #   was: it is evaluated again and its own children are forgotten.
+    #
+    # Parameters:
+    #   self - the object pointer
+    #   node - the node to expand
+    #   goalValue - the state_value of a win for the player to move
+    #
+    # Returns: (a node that reaches a goal state or None, the list of nodes)
+    #
+    def reexpandNode(self, node, goalValue):
+        self.reusedExpansions += 1
+        state = node.state
+        nodeList = []
+        for newNode in node.children:
+            attacks = newNode.move.moveType == MOVE_ANT and not isQuietMove(state, newNode.move)
+            self.pool.setState(newNode, self.processMove(state, newNode.move))
+            if attacks:
+                newNode.stateValue = self.evaluateState(newNode.state)
+                newNode.children = None
+            if newNode.stateValue == goalValue:
+                self.dropStates(nodeList + [newNode])
+                return newNode, nodeList
+            nodeList.append(newNode)
+        return None, nodeList
+
+    ##
+    # max_value
+    # Description: returns the best move our player can make from the current state
+    #
+    # Parameters:
+    #   self - the object pointer
+    #   node - the current node, before any moves are explored
+    #   alpha - the alpha value, the value of our best move
+    #   beta - the value of the opponent's best move
+    #   currentDepth - the current depth of the node from the initial node
+    #
+    # Returns: the move which benefits the opposing player the least (alpha).
+    #
+    def max_value(self, node, alpha, beta, currentDepth):
+        # give up (see SearchTimer) if this move is out of time
+        if self.deadline is not None:
+            self.deadline.check()
+        # base case, maxDepth reached, return the value of the currentState
+        if currentDepth == self.maxDepth:
+            return node
+        state = node.state
+        v = -INFINITY
+
+        # a goal state needs no further evaluation
+        goalNode, nodeList = self.expandNode(node, 1.0)
+        if goalNode is not None:
+            return goalNode
+
+        try:
+            #sort nodes from greatest to least
+            sortedNodeList = sorted(nodeList, key=lambda k: k.stateValue, reverse=True)
+
+            # throw away the nodes the beam doesn't keep to minimize the number of nodes
+            sortedNodeList = self.beamSelect(sortedNodeList, currentDepth, True)
+            # try killer and history moves first (the sort keeps ties in order)
+            sortedNodeList = self.orderNodes(sortedNodeList, currentDepth)
+
+            #holds a reference to the current best node to move to
+            bestValNode = None
+
+            #if it is our players turn
+            if (self.playerId == state.whoseTurn):
+                for childIndex, tempNode in enumerate(sortedNodeList):
+                    maxValNode = self.searchChild(self.max_value, tempNode, alpha, beta,
+                                                  currentDepth+1, childIndex, True)
+                    #if it's our turn and we're in max_value, stay in max_value
+                    if v < maxValNode.stateValue:
+                            bestValNode = maxValNode
+                            v = maxValNode.stateValue
+                    if v >= beta:
+                        self.recordCutoff(tempNode, currentDepth, childIndex)
+                        return maxValNode
+                    alpha = max(alpha, v)
+            #else it is the opponents player turn
+            else:
+                sortedNodeList = sorted(nodeList, key=lambda k: k.stateValue)
+                sortedNodeList = self.orderNodes(sortedNodeList, currentDepth)
+                for childIndex, tempNode in enumerate(sortedNodeList):
+                    maxValNode = self.searchChild(self.min_value, tempNode, alpha, beta,
+                                                  currentDepth+1, childIndex, True)
+                    #if it's opponent's turn and they're in max_value, to toggle to min_value
+                    if v < maxValNode.stateValue:
+                           bestValNode = maxValNode
+                           v = maxValNode.stateValue
+                    if v >= beta:
+                        self.recordCutoff(tempNode, currentDepth, childIndex)
+                        return maxValNode
+                    alpha = max(alpha, v)
+
+            return bestValNode
+        finally:
+            # the children's subtrees have been searched (see SearchNode)
+            self.dropStates(nodeList)
+
+
+    ##
+    # min_value
+    # Description: returns the best move our opponent can make from the current state
+    #
+    # Parameters:
+    #   self - the object pointer
+    #   node - the current node, before any moves are explored
+    #   alpha - the alpha value, the value of our best move
+    #   beta - the value of the opponent's best move
+    #   currentDepth - the current depth of the node from the initial node
+    #
+    # Returns: the move which benefits the opposing player the least (alpha).
+    #
+    def min_value(self, node, alpha, beta, currentDepth):
+        # give up (see SearchTimer) if this move is out of time
+        if self.deadline is not None:
+            self.deadline.check()
+        # base case, maxDepth reached, return the value of the currentState
+        if currentDepth == self.maxDepth:
+            return node
+        state = node.state
+        v = INFINITY
+
+        # a goal state needs no further evaluation
+        goalNode, nodeList = self.expandNode(node, 0.0)
+        if goalNode is not None:
+            return goalNode
+
+        try:
+            #sort nodes from least to greatest
+            sortedNodeList = sorted(nodeList, key=lambda k: k.stateValue)
+
+            # throw away the nodes the beam doesn't keep to minimize the number of nodes
+            sortedNodeList = self.beamSelect(sortedNodeList, currentDepth, False)
+            # try killer and history moves first (the sort keeps ties in order)
+            sortedNodeList = self.orderNodes(sortedNodeList, currentDepth)
+
+            #holds a reference to the current best node to move to
+            bestValNode = None
+
+            #if it is our players turn
+            if (self.playerId == state.whoseTurn):
+                for childIndex, tempNode in enumerate(sortedNodeList):
+                    minValNode = self.searchChild(self.max_value, tempNode, alpha, beta,
+                                                  currentDepth+1, childIndex, False)
+                    #if it's our turn and we're in max_value, stay in max_value
+                    if v > minValNode.stateValue:
+                            bestValNode = minValNode
+                            v = minValNode.stateValue
+                    if v <= alpha:
+                        self.recordCutoff(tempNode, currentDepth, childIndex)
+                        return minValNode
+                    beta = min(beta, v)
+            #else it is the opponents player turn
+            else:
+                for childIndex, tempNode in enumerate(sortedNodeList):
+                    minValNode = self.searchChild(self.min_value, tempNode, alpha, beta,
+                                                  currentDepth+1, childIndex, False)
+                    #if it's opponent's turn and they're in max_value, to toggle to min_value
+                    if v > minValNode.stateValue:
+                           bestValNode = minValNode
+                           v = minValNode.stateValue
+                    if v <= alpha:
+                        self.recordCutoff(tempNode, currentDepth, childIndex)
+                        return minValNode
+                    beta = min(beta, v)
+
+            return bestValNode
+        finally:
+            # the children's subtrees have been searched (see SearchNode)
+            self.dropStates(nodeList)
+   
+    ##
+    # searchChild
+    # Description: Searches below a child node.  A quiet child one ply from
+    #   the leaves that looks too poor to matter isn't searched at all, and a
+    #   late quiet child is first searched LMR_REDUCTION plies less deep with
+    #   a null window.  With principal variation search every child but the
+    #   first is searched with a null window, which only shows whether it is
+    #   better than the best so far, and searched again with the full window
+    #   if it is.
+    #
+    # Parameters:
+    #   self - The object pointer
+    #   search - max_value or min_value
+    #   node - The child node
+    #   alpha, beta - The window of the parent
+    #   depth - The depth of the child node
+    #   childIndex - The position of the child in the search order
+    #   isMax - True if the parent raises alpha, False if it lowers beta
+    #
+    # Returns: the node search returns
+    #
+    def searchChild(self, search, node, alpha, beta, depth, childIndex, isMax):
+        if childIndex == 0 or depth == self.maxDepth:
+            return search(node, alpha, beta, depth)
+
+        # futility pruning: the node stands for its own subtree
+        if depth == self.maxDepth - 1 and self.isFutile(node.stateValue, alpha, beta, isMax) \
+           and isQuietMove(node.parent.state, node.move):
+            self.futilityPrunes += 1
+            return node
+
+        # late move reduction: search as if the node were deeper
+        if self.isReducible(childIndex, self.maxDepth + 1 - depth) \
+           and isQuietMove(node.parent.state, node.move):
+            self.lmrReductions += 1
+            found = self.nullWindowSearch(search, node, alpha, beta,
+                                          depth + LMR_REDUCTION, isMax)
+            if found is not None and failsToImprove(found.stateValue, alpha, beta, isMax):
+                return found
+            self.lmrResearches += 1
+
+        if not self.usePVS:
+            return search(node, alpha, beta, depth)
+        found = self.nullWindowSearch(search, node, alpha, beta, depth, isMax)
+        if found is not None and alpha < found.stateValue < beta:
+            self.pvsResearches += 1
+            found = search(node, alpha, beta, depth)
+        return found
+
+    ##
+    # nullWindowSearch
+    # Description: Searches below a child node with a null window at alpha
+    #   (if the parent raises alpha) or at beta
+    #
+    # Parameters:
+    #   self - The object pointer
+    #   search - max_value or min_value
+    #   node - The child node
+    #   alpha, beta - The window of the parent
+    #   depth - The depth to search the child node at
+    #   isMax - True if the parent raises alpha, False if it lowers beta
+    #
+    # Returns: the node search returns
+    #
+    def nullWindowSearch(self, search, node, alpha, beta, depth, isMax):
+        alpha, beta = nullWindow(alpha, beta, isMax)
+        return search(node, alpha, beta, depth)
+
+    ##
+    # orderNodes
+    # Description: Moves the killer and history moves (see MoveOrdering) to
+    #   the front of a list of nodes, leaving the rest in their order
+    #
+    # Parameters:
+    #   self - The object pointer
+    #   nodes - The nodes to order
+    #   ply - The depth of their parent node
+    #
+    # Returns: a sorted list of the nodes
+    #
+    def orderNodes(self, nodes, ply):
+        return sorted(nodes, key=lambda node: self.orderer.rank(ply, node.moveKey,
+                                                                node.historyKey),
+                      reverse=True)
+
+    ##
+    # beamSelect
+    # Description: Keeps the nodes the beam searches (see BeamWidth)
+    #
+    # Parameters:
+    #   self - The object pointer
+    #   nodes - The nodes, best first for the player moving
+    #   ply - The depth of their parent node
+    #   highIsBetter - True if the player moving wants a high state_value
+    #
+    # Returns: the first of the nodes
+    #
+    def beamSelect(self, nodes, ply, highIsBetter):
+        if highIsBetter:
+            scores = [node.stateValue for node in nodes]
+        else:
+            scores = [-node.stateValue for node in nodes]
+        return self.beam.select(nodes, scores, ply)
+
+    ##
+    # dropStates
+    # Description: Lets go of the states held by nodes whose subtrees have
+    #   been searched (see SearchNode)
+    #
+    # Parameters:
+    #   self - The object pointer
+    #   nodes - The nodes
+    #
+    def dropStates(self, nodes):
+        for node in nodes:
+            self.pool.dropState(node)
+
+    ##
+    # getSearchStats
+    # Description: Reports on the last search: how many principal
+    #   variation and aspiration searches were repeated, how many moves were
+    #   reduced (and searched again) or pruned, how many expansions were
+    #   found already in the tree, how many children the beam kept from
+    #   being searched at each depth and the nodes and states allocated and
+    #   the memory they took
+    #
+    # Parameters:
+    #   self - The object pointer
+    #
+    # Returns: a dictionary
+    #
+    def getSearchStats(self):
+        stats = self.getSelectiveStats()
+        stats.update(self.beam.getStats())
+        stats.update(self.pool.getStats())
+        return stats
+
+    ##
+    # recordCutoff
+    # Description: Tells the move orderer which node caused a cutoff
+    #
+    # Parameters:
+    #   self - The object pointer
+    #   node - The node that caused the cutoff
+    #   ply - The depth of its parent node
+    #   childIndex - The position of the node in the search order
+    #
+    def recordCutoff(self, node, ply, childIndex):
+        self.orderer.recordCutoff(ply, node.moveKey, node.historyKey,
+                                  self.maxDepth - ply, childIndex)
+
+    ##
+    # processMove
+    # Description: The processMove method looks at the current state
+    # of the game and returns a copy of the state that results from
+    # making the move
+    #
+    # Parameters:
+    #   self - The object pointer
+    #   currentState - The current state of the game
+    #   move - The move which alters the state
+    #
+    # Return: The resulting state after move is made
+    #
+    def processMove(self, currentState, move):
+        # create a copy of the state (this will be returned
+        # after being modified to reflect the move)
+        copyOfState = currentState.fastclone()
+        
+        # get a reference to the player's inventory
+        playerInv = copyOfState.inventories[copyOfState.whoseTurn]
+        # get a reference to the enemy player's inventory
+        enemyInv = copyOfState.inventories[(copyOfState.whoseTurn+1) % 2]
+        
+        # player is building a constr or ant
+        if move.moveType == BUILD:
+            # building a constr
+            if move.buildType < 0:  
+                playerInv.foodCount -= CONSTR_STATS[move.buildType][BUILD_COST]
+                playerInv.constrs.append(Construction(move.coordList[0], move.buildType))
+            # building an ant
+            else: 
+                playerInv.foodCount -= UNIT_STATS[move.buildType][COST]
+                playerInv.ants.append(Ant(move.coordList[0], move.buildType, copyOfState.whoseTurn))                
+        # player is moving an ant
+        elif move.moveType == MOVE_ANT:
+            # get a reference to the ant
+            ant = getAntAt(copyOfState, move.coordList[0])
+            # update the ant's location after the move
+            ant.coords = move.coordList[-1]
+            
+            # get a reference to a potential constr at the destination coords
+            constr = getConstrAt(copyOfState, move.coordList[-1])
+            # check to see if the ant is on a food or tunnel or hill and act accordingly
+            if constr:
+                # we only care about workers
+                if ant.type == WORKER:
+                    # if dest is food and can carry, pick up food
+                    if constr.type == FOOD:
+                        if not ant.carrying:
+                            ant.carrying = True
+                    # if dest is tunnel or hill and ant is carrying food, ditch it
+                    elif constr.type == TUNNEL or constr.type == ANTHILL:
+                        if ant.carrying:
+                            ant.carrying = False
+                            playerInv.foodCount += 1
+            # get a list of the coordinates of the enemy's ants                 
+            enemyAntCoords = [enemyAnt.coords for enemyAnt in enemyInv.ants]
+            # contains the coordinates of ants that the 'moving' ant can attack
+            validAttacks = []
+            # go through the list of enemy ant locations and check if 
+            # we can attack that spot and if so add it to a list of
+            # valid attacks (one of which will be chosen at random)
+            for coord in enemyAntCoords:
+                #pythagoras would be proud
+                if UNIT_STATS[ant.type][RANGE] ** 2 >= abs(ant.coords[0] - coord[0]) ** 2 + abs(ant.coords[1] - coord[1]) ** 2:
+                    validAttacks.append(coord)
+            # if we can attack, pick a random attack and do it
+            if validAttacks:
+                enemyAnt = getAntAt(copyOfState, random.choice(validAttacks))
+                attackStrength = UNIT_STATS[ant.type][ATTACK]
+                if enemyAnt.health <= attackStrength:
+                    # just to be safe, set the health to 0
+                    enemyAnt.health = 0
+                    # remove the enemy ant from their inventory (He's dead Jim!)
+                    enemyInv.ants.remove(enemyAnt)
+                else:
+                    # lower the enemy ant's health because they were attacked
+                    enemyAnt.health -= attackStrength
+        # move ends the player's turn
+        elif move.moveType == END:
+            # toggle between PLAYER_ONE (0) and PLAYER_TWO (1)
+            copyOfState.whoseTurn += 1
+            copyOfState.whoseTurn %= 2
+        
+        # return a copy of the original state, but reflects the move
+        return copyOfState
+
+    ##
+    # searchMove
+    # Description: Searches for the best move from a state, deepening the
+    #   search until the move's time runs out unless the time budget is off
+    #
+    # Parameters:
+    #   self - The object pointer
+    #   currentState - The current state of the game
+    #
+    # Returns: the best move found
+    #
+    def searchMove(self, currentState):
+        # save our id
+        self.playerId = currentState.whoseTurn
+        #the last move's tree isn't kept: processMove doesn't mark the ant
+        #that moved as having moved and picks its own attack targets, so the
+        #subtree below the move made isn't a search of the position the
+        #game reaches
+        self.pool.recycle()
+        self.pool.resetStats()
+        self.resetSearchStats()
+        #create the initial node to analyze
+        initNode = self.createNode(None, currentState, None)
+        self.orderer.newSearch()
+        self.beam.newSearch()
+        if not self.useTimeBudget:
+            return self.searchToDepth(initNode, self.maxDepth)
+
+        # search deeper and deeper (and then wider) until this move's time is
+        # used up and return the move from the deepest search that finished
+        self.deadline = self.clock.startMove(currentState)
+        try:
+            move, depth = iterativeDeepening(lambda depth: self.searchToDepth(initNode, depth),
+                                             1, DEPTH_LIMIT, self.deadline, self.beam.widen)
+        finally:
+            self.clock.endMove()
+            self.deadline = None
+        return move
+
+    ##
+    # searchToDepth
+    # Description: runs alpha_beta_search with the given depth limit
+    #
+    # Parameters:
+    #   self - The object pointer
+    #   node - The node to search from
+    #   depth - The depth limit
+    #
+    # Returns: the best move found
+    #
+    def searchToDepth(self, node, depth):
+        self.maxDepth = depth
+        if self.useParallelRoot and depth > 1:
+            return self.parallel_search(node)
+        return self.alpha_beta_search(node)
+
+    ##
+    # parallel_search
+    # Description: alpha_beta_search with the moves at the root shared out
+    #   among worker processes, each of which searches below its moves (see
+    #   searchRootMove)
+    #
+    # Parameters:
+    #   self - the object pointer
+    #   node - the initial node, before any moves are explored
+    #
+    # Returns: the best move found
+    #
+    def parallel_search(self, node):
+        # the root is expanded here just as max_value would expand it (the
+        # workers make the moves themselves, so the states aren't needed)
+        goalNode, nodeList = self.expandNode(node, 1.0)
+        if goalNode is not None:
+            return goalNode.move
+        self.dropStates(nodeList)
+        sortedNodeList = sorted(nodeList, key=lambda k: k.stateValue, reverse=True)
+        sortedNodeList = self.beamSelect(sortedNodeList, 0, True)
+        sortedNodeList = self.orderNodes(sortedNodeList, 0)
+
+        if self.rootPool is None:
+            self.rootPool = RootSearchPool(ROOT_PROCESSES)
+        return self.rootPool.search(self, node.state,
+                                    [tempNode.move for tempNode in sortedNodeList],
+                                    self.maxDepth, -INFINITY, self.deadline)
+
+    ##
+    # searchRootMove
+    # Description: makes one of the moves at the root and searches below it.
+    #   Called by the worker processes of a parallel search.
+    #
+    # Parameters:
+    #   self - the object pointer
+    #   state - the state at the root
+    #   move - the root move to search
+    #   depth - the depth limit
+    #   alpha - the value of the best root move already found
+    #
+    # Returns: the value of the move
+    #
+    def searchRootMove(self, state, move, depth, alpha):
+        self.playerId = state.whoseTurn
+        self.maxDepth = depth
+        self.pool.recycle()
+        self.pool.resetStats()
+        rootNode = self.pool.new()
+        self.pool.setState(rootNode, state)
+        newNode = self.createNode(move, self.processMove(state, move), rootNode)
+        bestNode = self.max_value(newNode, alpha, INFINITY, 1)
+        if bestNode is None:
+            return newNode.stateValue
+        return bestNode.stateValue
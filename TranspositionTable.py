@@ -0,0 +1,338 @@
+import sys, mmap, struct
+from Constants import *
+
+#
+# TranspositionTable.py
+#
+# A fixed-size table of search results keyed by a position hash (see
+# GameState.getHash).  A game tree reaches the same position by many routes
+# (moving ant A then ant B gives the same state as B then A) so a searcher can
+# look a position up before expanding it and reuse the result of the earlier
+# search instead.
+#
+# Each entry records how deep the position was searched, the value found,
+# whether that value is exact or only a bound (the search was cut off by
+# alpha/beta) and the best move found.  Moves are stored as small integers
+# (see moveKey) so entries stay compact and can be matched against freshly
+# generated moves.
+#
+
+#kinds of value an entry can hold
+EXACT = 0
+LOWER_BOUND = 1   #the true value is at least this (a beta cutoff)
+UPPER_BOUND = 2   #the true value is at most this (no move raised alpha)
+
+#replacement policies
+DEPTH_PREFERRED = 0   #one entry per slot; keep the deeper search
+TWO_TIER = 1          #a depth-preferred entry plus an always-replace entry
+
+#default memory cap in bytes
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+#the moveKey of "no move"
+NO_MOVE = 0
+
+#generations are stored in 6 bits in a SharedTranspositionTable
+GENERATION_MASK = 0x3f
+#hashes are stored in 64 bits in a SharedTranspositionTable
+KEY_MASK = (1 << 64) - 1
+
+CELL_COUNT = BOARD_LENGTH * BOARD_LENGTH
+
+#positions of the fields of an entry
+ENTRY_KEY = 0
+ENTRY_DEPTH = 1
+ENTRY_FLAG = 2
+ENTRY_VALUE = 3
+ENTRY_MOVE = 4
+ENTRY_GENERATION = 5
+
+#an estimate of the memory one stored entry takes (the tuple, its hash and
+#its value), used to size the table and report its memory use
+_sampleEntry = ((1 << 63) + 1, 3, EXACT, 0.5, NO_MOVE, 0)
+ENTRY_BYTES = sys.getsizeof(_sampleEntry) + sys.getsizeof(_sampleEntry[ENTRY_KEY]) + \
+              sys.getsizeof(_sampleEntry[ENTRY_VALUE])
+#each slot of the table is one list reference
+SLOT_BYTES = 8
+
+##
+# moveKey
+#
+# packs a Move into a small nonzero integer.  Two moves with the same key
+# have the same effect: a MOVE_ANT is identified by where it starts and ends,
+# a BUILD by where and what, and END by its type alone.
+#
+# Parameters:
+#    move - a Move (or None)
+#
+# Return: an int (NO_MOVE for None)
+def moveKey(move):
+    if move is None:
+        return NO_MOVE
+    if move.moveType == MOVE_ANT:
+        start = move.coordList[0]
+        end = move.coordList[-1]
+        where = start[0] * BOARD_LENGTH + start[1] + \
+                CELL_COUNT * (end[0] * BOARD_LENGTH + end[1])
+    elif move.moveType == BUILD:
+        coord = move.coordList[0]
+        where = coord[0] * BOARD_LENGTH + coord[1] + CELL_COUNT * (move.buildType - TUNNEL)
+    else:
+        where = 0
+    return 1 + move.moveType + 3 * where
+
+##
+#TranspositionTable
+#Description: A bounded, hash-indexed table of search results
+#
+#Variables:
+#   policy - DEPTH_PREFERRED or TWO_TIER
+#   maxBytes - The memory cap the table was sized for
+#   slotCount - The number of hash buckets
+#   generation - Incremented by newSearch; entries from earlier searches are
+#       replaced in preference to entries from the current one
+#   probes, hits, stores, replacements - Counters (see getStats)
+##
+class TranspositionTable(object):
+
+    ##
+    #__init__
+    #Description: Creates an empty table
+    #
+    #Parameters:
+    #   maxBytes - Approximate memory cap in bytes (int)
+    #   policy - The replacement policy (DEPTH_PREFERRED or TWO_TIER)
+    ##
+    def __init__(self, maxBytes=DEFAULT_MAX_BYTES, policy=TWO_TIER):
+        self.policy = policy
+        self.maxBytes = maxBytes
+        if policy == TWO_TIER:
+            self.entriesPerSlot = 2
+        else:
+            self.entriesPerSlot = 1
+        self.slotCount = max(1, maxBytes / ((ENTRY_BYTES + SLOT_BYTES) * self.entriesPerSlot))
+        self.clear()
+
+    ##
+    #clear
+    #Description: Empties the table and resets the counters
+    ##
+    def clear(self):
+        self.table = [None] * (self.slotCount * self.entriesPerSlot)
+        self.generation = 0
+        self.filled = 0
+        self.resetStats()
+
+    ##
+    #resetStats
+    #Description: Resets the counters without emptying the table
+    ##
+    def resetStats(self):
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+        self.replacements = 0
+
+    ##
+    #newSearch
+    #Description: Marks the start of a new search.  Entries stored by earlier
+    #   searches stay usable but are the first to be replaced.
+    ##
+    def newSearch(self):
+        self.generation += 1
+
+    ##
+    #probe
+    #Description: Looks a position up
+    #
+    #Parameters:
+    #   key - The position's hash (long)
+    #
+    #Return: the entry, a tuple indexed by the ENTRY_ constants, or None
+    ##
+    def probe(self, key):
+        self.probes += 1
+        index = (key % self.slotCount) * self.entriesPerSlot
+        table = self.table
+        for i in xrange(index, index + self.entriesPerSlot):
+            entry = table[i]
+            if entry is not None and entry[ENTRY_KEY] == key:
+                self.hits += 1
+                return entry
+        return None
+
+    ##
+    #store
+    #Description: Records the result of searching a position
+    #
+    #Parameters:
+    #   key - The position's hash (long)
+    #   depth - How many plies below the position were searched (int)
+    #   flag - EXACT, LOWER_BOUND or UPPER_BOUND
+    #   value - The value found (float)
+    #   move - The moveKey of the best move found (int)
+    ##
+    def store(self, key, depth, flag, value, move):
+        self.stores += 1
+        entry = (key, depth, flag, value, move, self.generation)
+        index = (key % self.slotCount) * self.entriesPerSlot
+        old = self._get(index)
+        #the depth-preferred entry keeps the most valuable (deepest, most
+        #recent) result for the slot
+        if old is None or old[ENTRY_KEY] == key or depth >= old[ENTRY_DEPTH] \
+           or old[ENTRY_GENERATION] != self.generation:
+            self._put(index, entry)
+            if self.policy == TWO_TIER:
+                #don't leave a stale copy of this position behind
+                recent = self._get(index + 1)
+                if recent is not None and recent[ENTRY_KEY] == key:
+                    self._remove(index + 1)
+        elif self.policy == TWO_TIER:
+            #everything else goes in the always-replace entry
+            self._put(index + 1, entry)
+
+    #the entry at an index of the table, or None
+    def _get(self, index):
+        return self.table[index]
+
+    def _put(self, index, entry):
+        old = self._get(index)
+        if old is None:
+            self.filled += 1
+        elif old[ENTRY_KEY] != entry[ENTRY_KEY]:
+            self.replacements += 1
+        self._write(index, entry)
+
+    def _write(self, index, entry):
+        self.table[index] = entry
+
+    def _remove(self, index):
+        self.table[index] = None
+        self.filled -= 1
+
+    ##
+    #hitRate
+    #
+    #Return: the fraction of probes that found their position (float)
+    ##
+    def hitRate(self):
+        if self.probes == 0:
+            return 0.0
+        return float(self.hits) / self.probes
+
+    ##
+    #memoryUsage
+    #
+    #Return: an estimate of the bytes the table is using (int)
+    ##
+    def memoryUsage(self):
+        return self.slotCount * self.entriesPerSlot * SLOT_BYTES + self.filled * ENTRY_BYTES
+
+    ##
+    #getStats
+    #
+    #Return: a dictionary of the table's counters, hit rate and memory use
+    ##
+    def getStats(self):
+        return { "probes" : self.probes,
+                 "hits" : self.hits,
+                 "hit_rate" : self.hitRate(),
+                 "stores" : self.stores,
+                 "replacements" : self.replacements,
+                 "entries" : self.filled,
+                 "capacity" : self.slotCount * self.entriesPerSlot,
+                 "memory_bytes" : self.memoryUsage(),
+                 "max_bytes" : self.maxBytes }
+
+#a SharedTranspositionTable slot: the key XORed with both words of the
+#data, then the data: the value and the rest of the entry
+_SLOT = struct.Struct("<QQQ")
+#the rest of an entry: move, depth, flag | generation << 2
+_INFO = struct.Struct("<HBBxxxx")
+_DOUBLE = struct.Struct("<d")
+_QWORD = struct.Struct("<Q")
+
+##
+#SharedTranspositionTable
+#Description: A TranspositionTable held in an anonymous shared memory map so
+#   that every process forked after it is created reads and writes the same
+#   entries (see ParallelSearch.LazySMPSearch).
+#
+#   Entries are written without locks.  Each takes 24 bytes: the entry's
+#   data packed into two 64 bit words and the position's hash XORed with
+#   both of them.  If two processes write a slot at once the words of the
+#   slot may come from different entries; the XOR then no longer gives back
+#   the hash, so probe treats the slot as empty instead of returning a
+#   corrupt entry.
+#
+#   Values are stored as doubles, exactly as the search found them: a
+#   rounded bound could claim more than the search proved, and the searches'
+#   null windows and margins are finer than a 32 bit float near their
+#   values.  Generations are stored in 6 bits.  The counters (probes, hits,
+#   entries, ...) only count this process's calls.
+##
+class SharedTranspositionTable(TranspositionTable):
+
+    ##
+    #__init__
+    #Description: Creates an empty table
+    #
+    #Parameters:
+    #   maxBytes - The size of the shared memory map in bytes (int)
+    #   policy - The replacement policy (DEPTH_PREFERRED or TWO_TIER)
+    ##
+    def __init__(self, maxBytes=DEFAULT_MAX_BYTES, policy=TWO_TIER):
+        self.policy = policy
+        self.maxBytes = maxBytes
+        if policy == TWO_TIER:
+            self.entriesPerSlot = 2
+        else:
+            self.entriesPerSlot = 1
+        self.slotCount = max(1, maxBytes / (_SLOT.size * self.entriesPerSlot))
+        self.buffer = mmap.mmap(-1, self.slotCount * self.entriesPerSlot * _SLOT.size)
+        self.clear()
+
+    def clear(self):
+        self.buffer[:] = "\0" * len(self.buffer)
+        self.generation = 0
+        self.filled = 0
+        self.resetStats()
+
+    def newSearch(self):
+        self.generation = (self.generation + 1) & GENERATION_MASK
+
+    def probe(self, key):
+        self.probes += 1
+        key &= KEY_MASK
+        index = (key % self.slotCount) * self.entriesPerSlot
+        for i in xrange(index, index + self.entriesPerSlot):
+            entry = self._get(i)
+            if entry is not None and entry[ENTRY_KEY] == key:
+                self.hits += 1
+                return entry
+        return None
+
+    def store(self, key, depth, flag, value, move):
+        TranspositionTable.store(self, key & KEY_MASK, depth, flag, value, move)
+
+    def _get(self, index):
+        check, valueBits, info = _SLOT.unpack_from(self.buffer, index * _SLOT.size)
+        if check == 0 and valueBits == 0 and info == 0:
+            return None
+        value = _DOUBLE.unpack(_QWORD.pack(valueBits))[0]
+        move, depth, flags = _INFO.unpack(_QWORD.pack(info))
+        return (check ^ valueBits ^ info, depth, flags & 3, value, move, flags >> 2)
+
+    def _write(self, index, entry):
+        key, depth, flag, value, move, generation = entry
+        flags = flag | (generation & GENERATION_MASK) << 2
+        valueBits = _QWORD.unpack(_DOUBLE.pack(value))[0]
+        info = _QWORD.unpack(_INFO.pack(move, min(depth, 255), flags))[0]
+        _SLOT.pack_into(self.buffer, index * _SLOT.size, key ^ valueBits ^ info, valueBits, info)
+
+    def _remove(self, index):
+        _SLOT.pack_into(self.buffer, index * _SLOT.size, 0, 0, 0)
+        self.filled -= 1
+
+    def memoryUsage(self):
+        return len(self.buffer)
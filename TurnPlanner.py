@@ -0,0 +1,243 @@
+from Constants import *
+from Ant import UNIT_STATS
+from Move import Move
+from AIPlayerUtils import listAllMovementDestinations, listAllBuildMoves
+from MoveEngine import applyMove, undoMove, isQuietMove
+
+#
+# TurnPlanner.py
+#
+# Searches a game a whole turn at a time.  A turn is a run of MOVE_ANT and
+# BUILD moves ending with END, and a search that counts every move as a ply
+# (as MiniMax.exploreTree does) spends most of its depth inside one player's
+# turn: with three or four ants to move it seldom reaches the opponent's
+# reply.  It also meets the same position again and again, once for every
+# order the ants can be moved in.
+#
+# A TurnPlanner builds plans for whole turns instead: every ant that hasn't
+# moved moves once or stays put, in inventory order, then there is an
+# optional build and END.  Moving the ants in a fixed order means the other
+# orders of the same moves are never generated at all; plans that still reach
+# the same position (by GameState.getHash) are merged, partway through the
+# turn and again once END has picked up and dropped off food.  Plans are
+# built one ant at a time, keeping the stageWidth best partial plans after
+# each ant.  The planWidth best complete plans are the children of a turn,
+# and search runs alpha/beta over turns, so a search of depth 2 always
+# reaches the opponent's reply.
+#
+# Plans are made and searched on one state, applying and undoing the moves
+# with MoveEngine.  The moves are undone even when a search runs out of time
+# (see SearchTimer), so the state is always left as it was found.  The
+# evaluation is given a state and returns its value for the player the
+# planner searches for; as with MiniMax.evaluateState, only a game that is
+# over has a value of exactly 0.0 or 1.0.
+#
+
+#the most complete plans searched for each turn
+PLAN_WIDTH = 6
+#the most partial plans kept after each ant's move is added to them
+STAGE_WIDTH = 12
+
+##
+#TurnPlan
+#Description: The moves of a whole turn
+#
+#Variables:
+#   moves - The Moves, ending with END (fewer while the plan is partial)
+#   value - The evaluation of the position the moves reach
+#   key - The hash of that position
+##
+class TurnPlan(object):
+
+    __slots__ = ("moves", "value", "key")
+
+    def __init__(self, moves, value, key):
+        self.moves = moves
+        self.value = value
+        self.key = key
+
+##
+#TurnPlanner
+#Description: Makes plans for whole turns and searches over them
+#
+#Variables:
+#   playerId - The player whose value is maximized
+#   evaluate - A function(state) giving a state's value for playerId
+#   planWidth - The most plans searched for each turn
+#   stageWidth - The most partial plans kept after each ant
+#   deadline - A SearchDeadline the search checks (or None)
+#   turnsExpanded - Turns expanded into plans since resetStats
+#   positions - Distinct positions the plans reached (and were evaluated)
+#   merged - Plans dropped because another plan reached the same position
+##
+class TurnPlanner(object):
+
+    def __init__(self, playerId, evaluate, planWidth=PLAN_WIDTH, stageWidth=STAGE_WIDTH):
+        self.playerId = playerId
+        self.evaluate = evaluate
+        self.planWidth = planWidth
+        self.stageWidth = stageWidth
+        self.deadline = None
+        self.resetStats()
+
+    def resetStats(self):
+        self.turnsExpanded = 0
+        self.positions = 0
+        self.merged = 0
+
+    ##
+    #plans
+    #Description: Makes the best plans for the player whose turn it is
+    #
+    #Parameters:
+    #   state - The state to plan from (restored before returning)
+    #
+    #Return: a list of complete TurnPlans, best for the player moving first
+    ##
+    def plans(self, state):
+        if self.deadline is not None:
+            self.deadline.check()
+        self.turnsExpanded += 1
+        maximize = state.whoseTurn == self.playerId
+
+        plans = [TurnPlan([], None, None)]
+        for ant in state.inventories[state.whoseTurn].ants:
+            if ant.hasMoved:
+                continue
+            plans = self.extend(state, plans, lambda s: self.antOptions(s, ant),
+                                maximize, self.stageWidth)
+        plans = self.extend(state, plans, lambda s: [None] + listAllBuildMoves(s),
+                            maximize, self.stageWidth)
+        endMove = Move(END, None, None)
+        return self.extend(state, plans, lambda s: [endMove], maximize, self.planWidth)
+
+    ##
+    #antOptions
+    #
+    #Return: the ways an ant can take part in a turn: None (it stays put),
+    #   moving to each cell it can reach, and staying put to attack if an
+    #   enemy is in range
+    ##
+    def antOptions(self, state, ant):
+        options = [None]
+        for path in listAllMovementDestinations(state, ant.coords, UNIT_STATS[ant.type][MOVEMENT],
+                                                ant.type == QUEEN):
+            move = Move(MOVE_ANT, path, None)
+            if len(path) == 1 and isQuietMove(state, move):
+                continue
+            options.append(move)
+        return options
+
+    ##
+    #extend
+    #Description: Adds one more move to each of a list of partial plans
+    #
+    #Parameters:
+    #   state - The state the plans start from
+    #   partials - The TurnPlans
+    #   options - A function(state) listing the moves that may be added in
+    #       the state a plan reaches (None adds nothing)
+    #   maximize - True if the plans are made for playerId
+    #   width - How many plans to keep
+    #
+    #Return: the best width new TurnPlans, one for each position reached
+    ##
+    def extend(self, state, partials, options, maximize, width):
+        found = {}
+        for partial in partials:
+            undos = self.applyPlan(state, partial.moves)
+            try:
+                for move in options(state):
+                    undo = None
+                    if move is not None:
+                        undo = applyMove(state, move)
+                    try:
+                        key = state.getHash()
+                        if key in found:
+                            self.merged += 1
+                        else:
+                            self.positions += 1
+                            moves = partial.moves
+                            if move is not None:
+                                moves = moves + [move]
+                            found[key] = TurnPlan(moves, self.evaluate(state), key)
+                    finally:
+                        if undo is not None:
+                            undoMove(state, undo)
+            finally:
+                self.undoPlan(state, undos)
+
+        return sorted(found.values(), key=lambda plan: plan.value, reverse=maximize)[:width]
+
+    ##
+    #applyPlan
+    #Description: Makes each of a list of moves (all of them or, if one
+    #   fails, none)
+    #
+    #Return: the undo records (see undoPlan)
+    ##
+    def applyPlan(self, state, moves):
+        undos = []
+        try:
+            for move in moves:
+                undos.append(applyMove(state, move))
+        except:
+            self.undoPlan(state, undos)
+            raise
+        return undos
+
+    ##
+    #undoPlan
+    #Description: Takes back moves made with applyPlan
+    ##
+    def undoPlan(self, state, undos):
+        for undo in reversed(undos):
+            undoMove(state, undo)
+
+    ##
+    #search
+    #Description: Searches the turns that follow a state with alpha/beta
+    #
+    #Parameters:
+    #   state - The state to search from (restored before returning)
+    #   turns - How many turns to look ahead (at least 1)
+    #   alpha - The value playerId is already assured of
+    #   beta - The value the opponent is already assured of
+    #
+    #Return: (the value of the state, the best TurnPlan from it)
+    ##
+    def search(self, state, turns, alpha, beta):
+        maximize = state.whoseTurn == self.playerId
+        bestValue = None
+        bestPlan = None
+        for plan in self.plans(state):
+            if turns == 1 or plan.value == 0.0 or plan.value == 1.0:
+                value = plan.value
+            else:
+                undos = self.applyPlan(state, plan.moves)
+                try:
+                    value = self.search(state, turns - 1, alpha, beta)[0]
+                finally:
+                    self.undoPlan(state, undos)
+
+            if bestPlan is None or (maximize and value > bestValue) \
+               or (not maximize and value < bestValue):
+                bestValue = value
+                bestPlan = plan
+            if maximize:
+                alpha = max(alpha, value)
+            else:
+                beta = min(beta, value)
+            if alpha >= beta:
+                break
+        return bestValue, bestPlan
+
+    ##
+    #getStats
+    #
+    #Return: a dictionary of the planner's counters
+    ##
+    def getStats(self):
+        return { "turns_expanded" : self.turnsExpanded,
+                 "plan_positions" : self.positions,
+                 "plans_merged" : self.merged }
@@ -0,0 +1,122 @@
+import random
+from Constants import *
+
+#
+# Zobrist.py
+#
+# Tables of random 64-bit keys used to hash a GameState.  The hash of a state
+# is the XOR of one key for each ant, one for each construction, one for each
+# player's food count and a key for whose turn it is.  Because XOR undoes
+# itself, a change to one piece of the state can be applied to the hash by
+# XOR-ing out the piece's old key and XOR-ing in its new one (see the change
+# notifications in GameState).
+#
+
+CELL_COUNT = BOARD_LENGTH * BOARD_LENGTH
+
+#sizes of the value ranges that get their own key (larger values are clamped)
+MAX_HEALTH_KEYS = 8
+MAX_CAPTURE_KEYS = 4
+MAX_FOOD_KEYS = 32
+
+#a fixed seed keeps hashes identical between runs and between processes
+_random = random.Random(0x416e74696373)
+
+def _newKey():
+    return _random.getrandbits(64)
+
+def _keyTable(*dims):
+    if len(dims) == 1:
+        return [_newKey() for i in xrange(dims[0])]
+    return [_keyTable(*dims[1:]) for i in xrange(dims[0])]
+
+#[player][ant type][cell]
+ANT_KEYS = _keyTable(2, R_SOLDIER + 1, CELL_COUNT)
+#[player][cell][health]
+HEALTH_KEYS = _keyTable(2, CELL_COUNT, MAX_HEALTH_KEYS)
+#[player][cell]
+CARRYING_KEYS = _keyTable(2, CELL_COUNT)
+MOVED_KEYS = _keyTable(2, CELL_COUNT)
+#[owner][construction type - ANTHILL][cell] (owner NEUTRAL for grass and food)
+CONSTR_KEYS = _keyTable(3, FOOD - ANTHILL + 1, CELL_COUNT)
+#[cell][capture health]
+CAPTURE_KEYS = _keyTable(CELL_COUNT, MAX_CAPTURE_KEYS)
+#[player][food count]
+FOOD_KEYS = _keyTable(2, MAX_FOOD_KEYS)
+#XOR-ed in when it is PLAYER_TWO's turn
+TURN_KEY = _newKey()
+
+def _clamp(value, size):
+    if value < 0:
+        return 0
+    if value >= size:
+        return size - 1
+    return value
+
+##
+# antKey
+#
+# Return: the key contributed by an ant (position, type, health, flags)
+def antKey(ant):
+    cell = ant.coords[0] * BOARD_LENGTH + ant.coords[1]
+    player = ant.player
+    key = ANT_KEYS[player][ant.type][cell] ^ \
+          HEALTH_KEYS[player][cell][_clamp(ant.health, MAX_HEALTH_KEYS)]
+    if ant.carrying:
+        key ^= CARRYING_KEYS[player][cell]
+    if ant.hasMoved:
+        key ^= MOVED_KEYS[player][cell]
+    return key
+
+##
+# constrKey
+#
+# Return: the key contributed by a construction (position, type, owner and,
+#   for Buildings, capture health)
+def constrKey(constr):
+    if constr.coords is None:
+        return 0
+    cell = constr.coords[0] * BOARD_LENGTH + constr.coords[1]
+    owner = getattr(constr, "player", NEUTRAL)
+    key = CONSTR_KEYS[owner][constr.type - ANTHILL][cell]
+    captureHealth = getattr(constr, "captureHealth", None)
+    if captureHealth is not None:
+        key ^= CAPTURE_KEYS[cell][_clamp(captureHealth, MAX_CAPTURE_KEYS)]
+    return key
+
+##
+# foodKey
+#
+# Return: the key contributed by a player's food count
+def foodKey(playerId, foodCount):
+    if playerId == NEUTRAL:
+        return 0
+    return FOOD_KEYS[playerId][_clamp(foodCount, MAX_FOOD_KEYS)]
+
+##
+# turnKey
+#
+# Return: the key contributed by whose turn it is
+def turnKey(whoseTurn):
+    if whoseTurn == PLAYER_TWO:
+        return TURN_KEY
+    return 0
+
+##
+# computeHash
+#
+# hashes a whole state from scratch
+#
+# Parameters:
+#    state - a GameState (a board is not required)
+#
+# Return: a 64-bit integer
+def computeHash(state):
+    key = turnKey(state.whoseTurn)
+    for inv in state.inventories:
+        key ^= foodKey(inv.player, inv.foodCount)
+        for ant in inv.ants:
+            key ^= antKey(ant)
+        for constr in inv.constrs:
+            key ^= constrKey(constr)
+    return key
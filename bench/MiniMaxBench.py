@@ -0,0 +1,361 @@
+import os, sys, time, pprint
+
+#the game's modules are imported from the top of the repository and from AI,
+#and the test fixtures supply the positions to search
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (ROOT, os.path.join(ROOT, "AI"), os.path.join(ROOT, "tests")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from Constants import *
+from MiniMax import AIPlayer, TRANSPOSITION_BYTES, SET_POOL, DEPTH_LIMIT, TURN_LIMIT
+from ParallelSearch import LazySMPSearch
+from SearchTimer import MoveClock, SearchDeadline, iterativeDeepening
+from BeamWidth import FixedBeam, AdaptiveBeam
+from MoveEngine import applyMove
+from MCTS import getWinner
+from fixtures import makeState
+
+#
+# MiniMaxBench.py
+#
+# Measurements used when tuning MiniMax's search.  None of this is needed to
+# play a game.  Run a benchmark by name (or all of them):
+#
+#   python bench/MiniMaxBench.py [name ...]
+#
+
+##
+# measureTranspositionSavings
+#
+# Description: Searches a state to each of the given depths with and without
+#   the transposition table and reports how many nodes each search expanded,
+#   along with the table's statistics.  Useful when tuning the search.
+#
+# Parameters:
+#   state - The state to search from (GameState)
+#   depths - The MAX_DEPTH values to try
+#
+# Return: a list with a dictionary of results for each depth
+##
+def measureTranspositionSavings(state, depths=(3, 4)):
+    results = []
+    for depth in depths:
+        player = AIPlayer(state.whoseTurn)
+        player.maxDepth = depth
+        player.useTimeBudget = False
+        player.useTranspositions = False
+        player.getMove(state)
+        nodesWithout = player.nodeCount
+
+        player.useTranspositions = True
+        player.getMove(state)
+        stats = player.getSearchStats()
+        stats["nodes_without_table"] = nodesWithout
+        results.append(stats)
+    return results
+
+##
+# measureLazySMP
+#
+# Description: Searches a state to a fixed depth with this process alone and
+#   then with Lazy SMP, each starting from an empty transposition table, and
+#   reports the time each took, the speedup and the nodes per second of
+#   each worker
+#
+# Parameters:
+#   state - The state to search from (GameState)
+#   depth - The MAX_DEPTH to search to
+#   workers - The number of Lazy SMP workers (None for one per CPU)
+#
+# Return: a dictionary of results
+##
+def measureLazySMP(state, depth=4, workers=None):
+    player = AIPlayer(state.whoseTurn)
+    player.maxDepth = depth
+    player.useTimeBudget = False
+    started = time.time()
+    player.getMove(state)
+    serialSeconds = time.time() - started
+    serialNodes = player.nodeCount
+
+    player.useLazySMP = True
+    player.smp = LazySMPSearch(workers, TRANSPOSITION_BYTES)
+    try:
+        # start the workers before timing the search
+        player.maxDepth = 0
+        player.getMove(state)
+        player.smp.table.clear()
+
+        player.maxDepth = depth
+        started = time.time()
+        player.getMove(state)
+        parallelSeconds = time.time() - started
+        stats = player.smp.getStats()
+    finally:
+        player.smp.close()
+
+    stats["serial_seconds"] = serialSeconds
+    stats["serial_nodes_per_second"] = serialNodes / max(serialSeconds, 1e-6)
+    stats["parallel_seconds"] = parallelSeconds
+    stats["speedup"] = serialSeconds / max(parallelSeconds, 1e-6)
+    return stats
+
+##
+# measureSearchCore
+#
+# Description: Searches each of a suite of states with iterative deepening to
+#   a fixed depth: with plain alpha/beta, then adding principal variation
+#   search, aspiration windows, late move reductions and futility pruning
+#   one at a time (see SEARCH_CORE_SETTINGS), and reports how many nodes each
+#   search expanded and whether they chose the same move as plain alpha/beta
+#
+# Parameters:
+#   states - The states to search from (GameStates)
+#   depth - The depth to deepen to
+#
+# Return: (a list with a dictionary of results for each state, a dictionary
+#   of the totals)
+##
+# (label, usePVS, useAspiration, useLMR, useFutility)
+SEARCH_CORE_SETTINGS = (("plain", False, False, False, False),
+                        ("pvs", True, False, False, False),
+                        ("aspiration", True, True, False, False),
+                        ("lmr", True, False, True, False),
+                        ("futility", True, False, False, True),
+                        ("pruned", True, False, True, True))
+
+def measureSearchCore(states, depth=4):
+    results = []
+    for state in states:
+        result = {}
+        for label, usePVS, useAspiration, useLMR, useFutility in SEARCH_CORE_SETTINGS:
+            player = AIPlayer(state.whoseTurn)
+            player.usePVS = usePVS
+            player.useAspiration = useAspiration
+            player.useLMR = useLMR
+            player.useFutility = useFutility
+            player.startSearch(state)
+            for searchDepth in xrange(depth + 1):
+                move = player.searchToDepth(searchDepth)
+            result[label + "_nodes"] = player.nodeCount
+            result[label + "_move"] = str(move)
+            result[label + "_researches"] = player.pvsResearches + \
+                player.aspirationResearches + player.lmrResearches
+            result[label + "_pruned"] = player.lmrReductions + player.futilityPrunes
+        results.append(result)
+
+    totals = {}
+    for setting in SEARCH_CORE_SETTINGS:
+        label = setting[0]
+        nodes = sum([result[label + "_nodes"] for result in results])
+        totals[label + "_nodes"] = nodes
+        totals[label + "_node_ratio"] = float(nodes) / max(totals["plain_nodes"], 1)
+        totals[label + "_same_moves"] = len([result for result in results
+                                             if result[label + "_move"] == result["plain_move"]])
+    return results, totals
+
+##
+# measureTurnPlanner
+#
+# Description: Gives the move by move search and the turn search (see
+#   TurnPlanner) the same time to search each of a suite of states and
+#   reports how far ahead each looked: the deepest completed move search in
+#   moves and in whole turns (the ENDs along its principal variation), and
+#   the deepest completed turn search in turns
+#
+# Parameters:
+#   states - The states to search from (GameStates)
+#   seconds - The time each search is given
+#
+# Return: (a list with a dictionary of results for each state, a dictionary
+#   of the totals)
+##
+def measureTurnPlanner(states, seconds=1.0):
+    results = []
+    for state in states:
+        player = AIPlayer(state.whoseTurn)
+        player.startSearch(state)
+        turnsReached = {}
+        def searchMoves(depth):
+            move = player.searchToDepth(depth)
+            turns = 0
+            node = player.rootNode.bestChild
+            while node is not None:
+                if node.move.moveType == END:
+                    turns += 1
+                node = node.bestChild
+            turnsReached[depth] = turns
+            return move
+        move, depth = iterativeDeepening(searchMoves, 0, DEPTH_LIMIT, SearchDeadline(seconds))
+        result = { "move_depth" : depth,
+                   "move_turns" : turnsReached[depth],
+                   "move_nodes" : player.nodeCount }
+
+        player.startSearch(state)
+        player.planner.playerId = player.playerId
+        player.planner.resetStats()
+        plan, turns = iterativeDeepening(player.searchTurns, 1, TURN_LIMIT,
+                                         SearchDeadline(seconds))
+        result["plan_turns"] = turns
+        result["plan_positions"] = player.planner.positions
+        result["plans_merged"] = player.planner.merged
+        results.append(result)
+
+    totals = {}
+    for key in ("move_turns", "plan_turns", "move_nodes", "plan_positions", "plans_merged"):
+        totals[key] = sum([result[key] for result in results])
+    return results, totals
+
+##
+# measurePondering
+#
+# Description: Plays the first turns of a game from a state against a
+#   MiniMax opponent, once without pondering and once with it, and reports
+#   how many nodes this player's searches expanded and how many positions
+#   the transposition table answered.  Both players search to a fixed depth
+#   (the opponent one deeper, so there is time to ponder), which keeps the
+#   node counts comparable.  The opponent's moves are passed on with
+#   registerOpponentMove as Game does.
+#
+# Parameters:
+#   state - The state to play from (GameState)
+#   turns - How many turns each player takes
+#   depth - The depth this player searches to
+#
+# Return: a dictionary of results for each setting ("plain", "ponder")
+##
+def measurePondering(state, turns=3, depth=5):
+    results = {}
+    for label, ponder in (("plain", False), ("ponder", True)):
+        game = state.clone()
+        player = AIPlayer(state.whoseTurn)
+        player.usePondering = ponder
+        player.useTimeBudget = False
+        player.maxDepth = depth
+        opponent = AIPlayer(1 - state.whoseTurn)
+        opponent.useTimeBudget = False
+        opponent.maxDepth = depth + 1
+        nodes = 0
+        cutoffs = 0
+        try:
+            for turn in xrange(turns):
+                move = None
+                while move is None or move.moveType != END:
+                    move = player.getMove(game.clone())
+                    # the first turn has nothing to reuse
+                    if turn > 0:
+                        nodes += player.nodeCount
+                        cutoffs += player.tableCutoffs
+                    applyMove(game, move)
+                move = None
+                while move is None or move.moveType != END:
+                    move = opponent.getMove(game.clone())
+                    applyMove(game, move)
+                    theState = None
+                    if player.wantsOpponentState():
+                        theState = game.clone()
+                    player.registerOpponentMove(theState, move)
+        finally:
+            if player.ponder is not None:
+                player.ponder.close()
+        results[label] = { "nodes" : nodes,
+                           "table_cutoffs" : cutoffs,
+                           "ponder_hits" : player.ponderHits,
+                           "ponder_misses" : player.ponderMisses,
+                           "ponder_nodes" : player.ponderNodes }
+    return results
+
+##
+# useSetting
+#
+# Description: Turns one of the selective search settings (see
+#   SelectiveSearch) on or off for a player
+#
+# Parameters:
+#   player - The AIPlayer
+#   setting - "adaptive_beam", or the name of one of the player's use*
+#       variables ("usePVS", "useLMR", ...)
+#   on - True to turn the setting on
+##
+def useSetting(player, setting, on):
+    if setting == "adaptive_beam":
+        if on:
+            player.beam = AdaptiveBeam()
+        else:
+            player.beam = FixedBeam(SET_POOL)
+    else:
+        setattr(player, setting, on)
+
+##
+# measureStrength
+#
+# Description: Plays games between two MiniMax players from each of a suite
+#   of states, one with a search setting on and the other with it off, the
+#   player with it on taking each side in turn.  Every move gets the same
+#   time, so a setting that saves searching can only help by searching
+#   deeper.  A game nobody has won after the last turn goes to the player
+#   evaluateState favours.  A setting should win at least as many games as
+#   it loses before it is turned on by default.
+#
+# Parameters:
+#   states - The states to play from (GameStates)
+#   setting - The setting to compare (see useSetting)
+#   turns - How many turns each player takes at most
+#   seconds - The time each move is given
+#
+# Return: a dictionary of the games the player with the setting on won and
+#   lost, and how many of them were decided by the evaluation
+##
+def measureStrength(states, setting, turns=8, seconds=0.1):
+    result = { "on_wins" : 0, "off_wins" : 0, "evaluated" : 0 }
+    for state in states:
+        for onSide in (PLAYER_ONE, PLAYER_TWO):
+            game = state.fastclone()
+            players = [AIPlayer(PLAYER_ONE), AIPlayer(PLAYER_TWO)]
+            for player in players:
+                player.clock = MoveClock(float("inf"), seconds)
+                useSetting(player, setting, player.playerId == onSide)
+            winner = None
+            for turn in xrange(turns * 2):
+                player = players[game.whoseTurn]
+                move = None
+                while winner is None and (move is None or move.moveType != END):
+                    move = player.getMove(game.fastclone())
+                    applyMove(game, move)
+                    winner = getWinner(game)
+                if winner is not None:
+                    break
+            if winner is None:
+                result["evaluated"] += 1
+                if players[onSide].evaluateForPlayer(game) >= 0.5:
+                    winner = onSide
+                else:
+                    winner = 1 - onSide
+            if winner == onSide:
+                result["on_wins"] += 1
+            else:
+                result["off_wins"] += 1
+    return result
+
+#the selective search settings measureStrength compares
+STRENGTH_SETTINGS = ("adaptive_beam", "usePVS", "useLMR", "useFutility")
+
+#the benchmarks run from the command line, by name
+BENCHMARKS = [("transpositions", lambda: measureTranspositionSavings(makeState(1))),
+              ("lazysmp", lambda: measureLazySMP(makeState(1))),
+              ("searchcore", lambda: measureSearchCore([makeState(seed) for seed in (1, 2, 3)])),
+              ("turnplanner", lambda: measureTurnPlanner([makeState(seed) for seed in (1, 2, 3)])),
+              ("pondering", lambda: measurePondering(makeState(1))),
+              ("strength", lambda: dict([(setting, measureStrength([makeState(seed) for seed in (1, 2, 3)],
+                                                                     setting))
+                                         for setting in STRENGTH_SETTINGS]))]
+
+if __name__ == "__main__":
+    names = sys.argv[1:]
+    for name, run in BENCHMARKS:
+        if len(names) == 0 or name in names:
+            started = time.time()
+            print "%s:" % name
+            pprint.pprint(run())
+            print "(%.1f seconds)" % (time.time() - started)
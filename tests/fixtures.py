@@ -0,0 +1,115 @@
+import os, sys, random
+
+#the game's modules are imported from the top of the repository and from AI
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (ROOT, os.path.join(ROOT, "AI")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from Constants import *
+from GameState import GameState
+from Inventory import Inventory
+from Location import Location
+from Building import Building
+from Construction import getTerrain
+from Ant import Ant
+from SearchTimer import SearchDeadline, SearchTimeout
+
+#
+# fixtures.py
+#
+# States and deadlines shared by the tests.
+#
+
+##
+# makeState
+#
+# builds a game in its play phase from a seed: each player has an anthill,
+# a tunnel, a queen and a worker, grass and food are scattered over the
+# board, and (with fighters) each player also has two fighting ants near the
+# middle of the board
+#
+# Return: a GameState with PLAYER_ONE to move
+def makeState(seed, fighters=True):
+    rnd = random.Random(seed)
+    board = [[Location((x, y)) for y in xrange(BOARD_LENGTH)] for x in xrange(BOARD_LENGTH)]
+    inventories = [Inventory(PLAYER_ONE, [], [], 1), Inventory(PLAYER_TWO, [], [], 1),
+                   Inventory(NEUTRAL, [], [], 0)]
+    state = GameState(board, inventories, PLAY_PHASE, PLAYER_ONE)
+
+    def addConstr(constr, inventory):
+        board[constr.coords[0]][constr.coords[1]].constr = constr
+        inventory.constrs.append(constr)
+
+    def addAnt(coords, antType, playerId):
+        ant = Ant(coords, antType, playerId)
+        board[coords[0]][coords[1]].ant = ant
+        inventories[playerId].ants.append(ant)
+
+    for playerId, rows in ((PLAYER_ONE, range(0, 4)), (PLAYER_TWO, range(6, 10))):
+        cells = rnd.sample([(x, y) for x in xrange(BOARD_LENGTH) for y in rows], 11)
+        addConstr(Building(cells[0], ANTHILL, playerId), inventories[playerId])
+        addConstr(Building(cells[1], TUNNEL, playerId), inventories[playerId])
+        for coords in cells[2:]:
+            addConstr(getTerrain(coords, GRASS), inventories[NEUTRAL])
+        addAnt(cells[0], QUEEN, playerId)
+        addAnt(cells[1], WORKER, playerId)
+
+    #each player's food is on the other player's side of the board
+    for rows in (range(6, 10), range(0, 4)):
+        free = [(x, y) for x in xrange(BOARD_LENGTH) for y in rows
+                if board[x][y].constr is None]
+        for coords in rnd.sample(free, 2):
+            addConstr(getTerrain(coords, FOOD), inventories[NEUTRAL])
+
+    if fighters:
+        free = [(x, y) for x in xrange(BOARD_LENGTH) for y in range(3, 7)
+                if board[x][y].constr is None and board[x][y].ant is None]
+        cells = rnd.sample(free, 4)
+        addAnt(cells[0], DRONE, PLAYER_ONE)
+        addAnt(cells[1], SOLDIER, PLAYER_ONE)
+        addAnt(cells[2], DRONE, PLAYER_TWO)
+        addAnt(cells[3], R_SOLDIER, PLAYER_TWO)
+    return state
+
+##
+#ExpiringDeadline
+#Description: A SearchDeadline that runs out after a fixed number of checks
+#   (rather than at a point in time), so a test can stop a search part of
+#   the way through.  Until then it claims to have plenty of time left.
+##
+class ExpiringDeadline(SearchDeadline):
+
+    def __init__(self, checks):
+        SearchDeadline.__init__(self, 3600.0)
+        self.checksLeft = checks
+
+    def check(self):
+        if not self.enabled:
+            return
+        self.checksLeft -= 1
+        if self.checksLeft < 0:
+            raise SearchTimeout()
+
+    def remaining(self):
+        if self.checksLeft < 0:
+            return 0.0
+        return SearchDeadline.remaining(self)
+
+##
+#ExpiringClock
+#Description: A MoveClock stand-in that gives every move an
+#   ExpiringDeadline
+##
+class ExpiringClock(object):
+
+    def __init__(self, checks):
+        self.checks = checks
+        self.deadline = None
+
+    def startMove(self, currentState):
+        self.deadline = ExpiringDeadline(self.checks)
+        return self.deadline
+
+    def endMove(self):
+        self.deadline = None
@@ -0,0 +1,108 @@
+import unittest, random
+from fixtures import makeState
+
+from Constants import *
+from AIPlayerUtils import listAllLegalMoves, listAllMovementMoves, bestMoveToward, \
+     getAntAt, getConstrAt, listAdjacent, isPathOkForQueen
+from Construction import CONSTR_STATS
+from MoveEngine import applyMove
+
+##
+#playedStates
+#Description: States reached by random play from each seed, for checking
+#   the move lists on more than the opening position
+##
+def playedStates(seeds, plies):
+    for seed in seeds:
+        rnd = random.Random(seed)
+        state = makeState(seed).fastclone()
+        for ply in xrange(plies):
+            yield state
+            move = rnd.choice(listAllLegalMoves(state))
+            state = state.fastclone()
+            applyMove(state, move)
+
+##
+#DestinationTest
+#Description: Listing one path per destination reaches exactly the cells
+#   that listing every path does
+##
+class DestinationTest(unittest.TestCase):
+
+    def testSameDestinations(self):
+        for state in playedStates(xrange(1, 6), 20):
+            allPaths = [tuple(move.coordList) for move in listAllMovementMoves(state)]
+            uniquePaths = [tuple(move.coordList)
+                           for move in listAllMovementMoves(state, uniqueDestinations=True)]
+            ends = lambda paths: set([(path[0], path[-1]) for path in paths])
+            self.assertEqual(ends(uniquePaths), ends(allPaths))
+            #one path per destination, and each of them is a legal path
+            self.assertEqual(len(ends(uniquePaths)), len(uniquePaths))
+            self.assertTrue(set(uniquePaths) <= set(allPaths))
+
+##
+#distanceAround
+#Description: The cheapest cost from src to target stepping around every ant
+#   but the one on the target (and, for a queen, staying in her territory),
+#   or None if there is no way there
+##
+def distanceAround(state, src, target, forQueen):
+    visited = { src : 0 }
+    queue = [ src ]
+    while len(queue) > 0:
+        cell = queue.pop(0)
+        for newCell in listAdjacent(cell):
+            if forQueen and not isPathOkForQueen([newCell]):
+                continue
+            if newCell != target and getAntAt(state, newCell) is not None:
+                continue
+            constr = getConstrAt(state, newCell)
+            cost = 1
+            if constr is not None:
+                cost = CONSTR_STATS[constr.type][MOVE_COST]
+            dist = visited[cell] + cost
+            if newCell not in visited or dist < visited[newCell]:
+                visited[newCell] = dist
+                queue.append(newCell)
+    return visited.get(target)
+
+##
+#BestMoveTest
+#Description: bestMoveToward picks a legal move for the ant that ends on a
+#   reachable cell as close to the target (going around the other ants) as
+#   any other
+##
+class BestMoveTest(unittest.TestCase):
+
+    def testClosestLegalMove(self):
+        checked = 0
+        for state in playedStates(xrange(1, 4), 12):
+            moves = listAllMovementMoves(state)
+            for ant in state.inventories[state.whoseTurn].ants:
+                if ant.hasMoved:
+                    continue
+                paths = [tuple(m.coordList) for m in moves if m.coordList[0] == ant.coords]
+                forQueen = (ant.type == QUEEN)
+                for target in ((0, 0), (9, 9), (4, 5), (8, 2)):
+                    path = tuple(bestMoveToward(state, ant, target).coordList)
+                    self.assertTrue(path in paths)
+                    if path[-1] == target:
+                        continue
+                    best = distanceAround(state, path[-1], target, forQueen)
+                    if best is None:
+                        continue
+                    for other in paths:
+                        dist = distanceAround(state, other[-1], target, forQueen)
+                        self.assertTrue(dist is None or dist >= best)
+                    checked += 1
+        self.assertTrue(checked > 100)
+
+    def testMovementLimit(self):
+        state = makeState(1)
+        drone = state.inventories[PLAYER_ONE].getEntitiesOfType(DRONE)[0]
+        for target in ((0, 9), (9, 9), (5, 9)):
+            path = bestMoveToward(state, drone, target, 1).coordList
+            self.assertTrue(len(path) <= 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+from fixtures import makeState
+
+from Constants import *
+from CompactState import CompactState
+from Zobrist import computeHash
+
+##
+#contents
+#Description: The ants and constructions of a state as sorted tuples, since
+#   a CompactState lists each inventory's constructions in board order
+##
+def contents(state):
+    ants = sorted((ant.coords, ant.type, ant.player, ant.health, ant.hasMoved, ant.carrying)
+                  for inv in state.inventories for ant in inv.ants)
+    constrs = sorted((constr.coords, constr.type, getattr(constr, "player", NEUTRAL),
+                      getattr(constr, "captureHealth", None))
+                     for inv in state.inventories for constr in inv.constrs)
+    foods = [inv.foodCount for inv in state.inventories]
+    return (state.phase, state.whoseTurn, foods, ants, constrs)
+
+##
+#RoundTripTest
+#Description: Packing a GameState and unpacking it again gives back the same
+#   game
+##
+class RoundTripTest(unittest.TestCase):
+
+    def testGameStateRoundTrip(self):
+        for seed in xrange(1, 6):
+            state = makeState(seed)
+            state.inventories[PLAYER_ONE].constrs[0].captureHealth = 1
+            state.inventories[PLAYER_TWO].ants[0].health = 2
+            state.inventories[PLAYER_TWO].ants[1].carrying = True
+            state.inventories[PLAYER_ONE].ants[1].hasMoved = True
+
+            compact = CompactState.fromGameState(state)
+            unpacked = compact.toGameState(withBoard=True)
+            self.assertEqual(contents(unpacked), contents(state))
+            self.assertEqual(computeHash(unpacked), computeHash(state))
+            self.assertEqual(CompactState.fromGameState(unpacked), compact)
+
+    def testSerializeRoundTrip(self):
+        compact = CompactState.fromGameState(makeState(1))
+        copy = CompactState.deserialize(compact.serialize())
+        self.assertEqual(copy, compact)
+        self.assertEqual(contents(copy.toGameState()), contents(compact.toGameState()))
+
+    def testRemoveAntKeepsRecordsContiguous(self):
+        state = makeState(2)
+        compact = CompactState.fromGameState(state)
+        first = state.inventories[PLAYER_ONE].ants[0]
+        compact.removeAnt(first.coords)
+        self.assertEqual(compact.antCount(), len(state.inventories[PLAYER_ONE].ants) +
+                         len(state.inventories[PLAYER_TWO].ants) - 1)
+        self.assertEqual(compact.antAt(first.coords), None)
+        for inv in state.inventories:
+            for ant in inv.ants:
+                if ant is not first:
+                    self.assertEqual(compact.antAt(ant.coords)[:3],
+                                     (ant.type, ant.player, ant.health))
+
+if __name__ == "__main__":
+    unittest.main()
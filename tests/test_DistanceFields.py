@@ -0,0 +1,64 @@
+import unittest
+from fixtures import makeState
+
+from Constants import *
+from Construction import CONSTR_STATS
+from AIPlayerUtils import getConstrAt, listAdjacent, stepsToReach
+from DistanceFields import getDistanceGrid, clearCache
+
+##
+#plainDistances
+#Description: The movement cost from src to every cell, worked out with a
+#   breadth-first search that queues a cell again whenever it is reached
+#   more cheaply (entering a cell costs that cell's movement cost)
+##
+def plainDistances(state, src):
+    visited = { src : 0 }
+    queue = [ src ]
+    while len(queue) > 0:
+        cell = queue.pop(0)
+        for newCell in listAdjacent(cell):
+            constr = getConstrAt(state, newCell)
+            cost = 1
+            if constr is not None:
+                cost = CONSTR_STATS[constr.type][MOVE_COST]
+            dist = visited[cell] + cost
+            if newCell not in visited or dist < visited[newCell]:
+                visited[newCell] = dist
+                queue.append(newCell)
+    return visited
+
+##
+#GridTest
+#Description: The cached distance grids agree with a plain search
+##
+class GridTest(unittest.TestCase):
+
+    def testGridsMatchSearch(self):
+        clearCache()
+        for seed in xrange(1, 4):
+            state = makeState(seed)
+            for x in xrange(BOARD_LENGTH):
+                for y in xrange(BOARD_LENGTH):
+                    expected = plainDistances(state, (x, y))
+                    for dst, dist in expected.items():
+                        self.assertEqual(getDistanceGrid(state, dst)[x][y], dist)
+                    self.assertEqual(stepsToReach(state, (x, y), (9 - x, 9 - y)),
+                                     expected[(9 - x, 9 - y)])
+
+    def testGridsFollowTheTerrain(self):
+        #the boardless clone and the flipped board each get the right grids
+        clearCache()
+        state = makeState(4)
+        for view in (state, state.fastclone()):
+            expected = plainDistances(view, (0, 0))
+            for dst, dist in expected.items():
+                self.assertEqual(stepsToReach(view, (0, 0), dst), dist)
+        flipped = state.clone()
+        flipped.flipBoard()
+        expected = plainDistances(flipped, (0, 0))
+        for dst, dist in expected.items():
+            self.assertEqual(stepsToReach(flipped, (0, 0), dst), dist)
+
+if __name__ == "__main__":
+    unittest.main()
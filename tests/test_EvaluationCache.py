@@ -0,0 +1,72 @@
+import unittest
+import fixtures
+
+from EvaluationCache import EvaluationCache, cachedEvaluation
+
+##
+#ClockTest
+#Description: A full cache makes room by replacing the first entry the
+#   clock hand finds that hasn't been used since the hand last passed it
+##
+class ClockTest(unittest.TestCase):
+
+    def testEviction(self):
+        cache = EvaluationCache(3)
+        for key in "abc":
+            cache.put(key, key.upper())
+        self.assertEqual(cache.evictions, 0)
+
+        #every entry is marked, so the hand clears them all and comes back
+        #round to the first
+        cache.put("d", "D")
+        self.assertEqual(cache.get("a"), None)
+        self.assertEqual([cache.get(key) for key in "bcd"], ["B", "C", "D"])
+
+        #b, c and d are marked again, so the hand sweeps once more
+        cache.put("e", "E")
+        self.assertEqual(cache.get("b"), None)
+
+        #c and d are unmarked now and e is marked: reading c keeps it
+        self.assertEqual(cache.get("c"), "C")
+        cache.put("f", "F")
+        self.assertEqual(cache.get("d"), None)
+        self.assertEqual([cache.get(key) for key in "cef"], ["C", "E", "F"])
+        self.assertEqual(cache.evictions, 3)
+        self.assertEqual(len(cache.slots), 3)
+
+    def testUpdateInPlace(self):
+        cache = EvaluationCache(2)
+        cache.put("a", 1)
+        cache.put("a", 2)
+        self.assertEqual(cache.get("a"), 2)
+        self.assertEqual(len(cache.keys), 1)
+        #None is a value like any other
+        cache.put("b", None)
+        self.assertEqual(cache.get("b", "missing"), None)
+        self.assertEqual(cache.get("c", "missing"), "missing")
+
+##
+#DecoratorTest
+#Description: cachedEvaluation evaluates each (position, player) once
+##
+class DecoratorTest(unittest.TestCase):
+
+    def testCachedByHashAndPlayer(self):
+        class Evaluator(object):
+            calls = 0
+            def __init__(self, playerId):
+                self.playerId = playerId
+            @cachedEvaluation(8)
+            def evaluate(self, currentState):
+                Evaluator.calls += 1
+                return (currentState.getHash(), self.playerId)
+
+        state = fixtures.makeState(1)
+        one, two = Evaluator(0), Evaluator(1)
+        self.assertEqual(one.evaluate(state), (state.getHash(), 0))
+        self.assertEqual(one.evaluate(state.fastclone()), (state.getHash(), 0))
+        self.assertEqual(two.evaluate(state), (state.getHash(), 1))
+        self.assertEqual(Evaluator.calls, 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest, random
+from fixtures import makeState
+
+from Constants import *
+from AIPlayerUtils import listAllLegalMoves, getAntAt, getConstrAt
+from MoveEngine import applyMove, undoMove, stateSignature
+from Zobrist import computeHash
+
+##
+#CloneTest
+#Description: Clones of a state whose buildings have taken capture damage
+#   keep that damage and a correct hash
+##
+class CloneTest(unittest.TestCase):
+
+    def checkClones(self, state):
+        self.assertEqual(state.getHash(), computeHash(state))
+        for clone in (state.fastclone(), state.clone()):
+            self.assertEqual(clone.getHash(), state.getHash())
+            self.assertEqual(computeHash(clone), state.getHash())
+        #clone lists ants in board order, fastclone keeps the inventories' order
+        self.assertEqual(stateSignature(state.fastclone()), stateSignature(state))
+
+    def testDamagedBuilding(self):
+        for seed in xrange(1, 4):
+            state = makeState(seed)
+            state.inventories[PLAYER_TWO].getAnthill().captureHealth -= 1
+            self.checkClones(state)
+            state.inventories[PLAYER_ONE].getTunnels()[0].captureHealth -= 1
+            self.checkClones(state)
+            clone = state.fastclone().fastclone()
+            self.assertEqual(computeHash(clone), state.getHash())
+
+##
+#CoordMapTest
+#Description: The coordinate maps stay in step with the inventories as moves
+#   are made and undone
+##
+class CoordMapTest(unittest.TestCase):
+
+    def checkMaps(self, state):
+        ants = {}
+        constrs = {}
+        for inv in state.inventories:
+            for ant in inv.ants:
+                ants[ant.coords] = ant
+            for constr in inv.constrs:
+                constrs[constr.coords] = constr
+        self.assertEqual(state.getAntMap(), ants)
+        self.assertEqual(state.getConstrMap(), constrs)
+        for coords in ants:
+            self.assertTrue(getAntAt(state, coords) is ants[coords])
+        for coords in constrs:
+            self.assertTrue(getConstrAt(state, coords) is constrs[coords])
+
+    def testRandomPlay(self):
+        for seed in xrange(1, 6):
+            rnd = random.Random(seed)
+            state = makeState(seed).fastclone()
+            self.checkMaps(state)
+            for ply in xrange(60):
+                moves = listAllLegalMoves(state)
+                undo = applyMove(state, rnd.choice(moves))
+                self.checkMaps(state)
+                #sometimes take the move back and play another
+                if rnd.random() < 0.3:
+                    undoMove(state, undo)
+                    self.checkMaps(state)
+                    applyMove(state, rnd.choice(moves))
+                    self.checkMaps(state)
+
+if __name__ == "__main__":
+    unittest.main()
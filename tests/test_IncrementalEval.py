@@ -0,0 +1,47 @@
+import unittest, random
+from fixtures import makeState
+
+from Constants import *
+from AIPlayerUtils import listAllLegalMoves, getConstrList
+from MoveEngine import applyMove, undoMove
+from IncrementalEval import IncrementalScore
+from MiniMax import WorkerScore, WORKER_SCORE
+
+##
+#RunningTotalTest
+#Description: A score's running totals equal a recomputation from scratch
+#   whatever moves are made and undone
+##
+class RunningTotalTest(unittest.TestCase):
+
+    def checkTotals(self, state):
+        score = state.getScore(WORKER_SCORE)
+        for playerId in (PLAYER_ONE, PLAYER_TWO):
+            self.assertEqual(score.total(playerId), score.computeTotal(state, playerId))
+
+    def testApplyAndUndo(self):
+        for seed in xrange(1, 6):
+            rnd = random.Random(seed)
+            state = makeState(seed).fastclone()
+            WorkerScore([f.coords for f in getConstrList(state, NEUTRAL, (FOOD,))]).attach(state)
+            self.checkTotals(state)
+            undos = []
+            for ply in xrange(80):
+                #mostly play on, sometimes take back a few moves
+                if undos and rnd.random() < 0.3:
+                    undoMove(state, undos.pop())
+                else:
+                    undos.append(applyMove(state, rnd.choice(listAllLegalMoves(state))))
+                self.checkTotals(state)
+                self.checkTotals(state.fastclone())
+            while undos:
+                undoMove(state, undos.pop())
+                self.checkTotals(state)
+
+    def testAntTermIsAbstract(self):
+        class NoTerm(IncrementalScore):
+            pass
+        self.assertRaises(TypeError, NoTerm, "none")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest, random
+from fixtures import makeState
+
+from Constants import *
+from Inventory import ALL_ENTITY_TYPES
+from AIPlayerUtils import listAllLegalMoves, getAntList, getConstrList
+from MoveEngine import applyMove, undoMove
+
+##
+#TypeIndexTest
+#Description: Each Inventory's by-type index lists the same entities, in
+#   the same order, as filtering its ant and construction lists
+##
+class TypeIndexTest(unittest.TestCase):
+
+    def checkIndex(self, state):
+        for inv in state.inventories:
+            for entityType in ALL_ENTITY_TYPES:
+                expected = [e for e in list(inv.ants) + list(inv.constrs)
+                            if e.type == entityType]
+                self.assertEqual(list(inv.getEntitiesOfType(entityType)), expected)
+            queens = [ant for ant in inv.ants if ant.type == QUEEN]
+            self.assertTrue(inv.getQueen() is (queens[0] if queens else None))
+            self.assertEqual(inv.getTunnels(), [c for c in inv.constrs if c.type == TUNNEL])
+        for playerId in (PLAYER_ONE, PLAYER_TWO):
+            self.assertEqual(sorted(map(id, getAntList(state, playerId, (DRONE, SOLDIER)))),
+                             sorted([id(ant) for ant in state.inventories[playerId].ants
+                                     if ant.type in (DRONE, SOLDIER)]))
+        self.assertEqual(sorted(map(id, getConstrList(state, None, (FOOD,)))),
+                         sorted([id(c) for inv in state.inventories for c in inv.constrs
+                                 if c.type == FOOD]))
+
+    def testRandomPlay(self):
+        for seed in xrange(1, 6):
+            rnd = random.Random(seed)
+            state = makeState(seed).fastclone()
+            self.checkIndex(state)
+            for ply in xrange(60):
+                moves = listAllLegalMoves(state)
+                undo = applyMove(state, rnd.choice(moves))
+                self.checkIndex(state)
+                if rnd.random() < 0.3:
+                    undoMove(state, undo)
+                    self.checkIndex(state)
+                    applyMove(state, rnd.choice(moves))
+                    self.checkIndex(state)
+
+    def testCloneBuildsIndex(self):
+        state = makeState(1)
+        self.checkIndex(state.fastclone())
+        self.checkIndex(state.clone())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest, random
+from fixtures import makeState
+
+from Constants import *
+from MCTS import AIPlayer
+from AIPlayerUtils import listAllLegalMoves
+from TranspositionTable import moveKey
+from MoveEngine import applyMove, stateSignature
+
+##
+#SearchTest
+#Description: A short search returns a legal move, leaves the state it
+#   searched on as it found it and reuses its tree on the next move
+##
+class SearchTest(unittest.TestCase):
+
+    def testLegalMoveAndReuse(self):
+        for seed in xrange(1, 4):
+            state = makeState(seed).fastclone()
+            player = AIPlayer(PLAYER_ONE)
+            player.random = random.Random(seed)
+            player.rollouts = 40
+
+            move = player.getMove(state.fastclone())
+            legal = [moveKey(m) for m in listAllLegalMoves(state)]
+            self.assertTrue(moveKey(move) in legal)
+            self.assertEqual(player.searchState.getHash(), state.getHash())
+            self.assertEqual(stateSignature(player.searchState), stateSignature(state))
+
+            #the position after the chosen move is already in the tree
+            child = max(player.root["children"], key=lambda node: node["visits"])
+            visits = child["visits"]
+            applyMove(state, move)
+            player.getMove(state.fastclone())
+            self.assertEqual(player.reusedVisits, visits)
+            self.assertTrue(player.reusedVisits > 0)
+            self.assertTrue(player.root is child)
+            self.assertEqual(player.root["hash"], state.getHash())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+import unittest
+from fixtures import makeState, ExpiringClock
+
+from Constants import *
+from MiniMax import AIPlayer
+import Heuristic
+from AIPlayerUtils import listAllLegalMoves, getConstrAt
+from TranspositionTable import moveKey, NO_MOVE
+from Move import Move
+from MoveEngine import applyMove, stateSignature
+from Zobrist import computeHash
+
+##
+#TimeoutTest
+#Description: A search that runs out of time must leave the state it
+#   searches on as it found it
+##
+class TimeoutTest(unittest.TestCase):
+
+    def testSearchStateRestored(self):
+        for seed in xrange(1, 4):
+            for checks in (5, 40, 200):
+                state = makeState(seed)
+                player = AIPlayer(PLAYER_ONE)
+                player.clock = ExpiringClock(checks)
+                player.getMove(state)
+
+                searched = player.searchState
+                self.assertEqual(searched.getHash(), state.getHash())
+                self.assertEqual(computeHash(searched), state.getHash())
+                self.assertEqual(stateSignature(searched), stateSignature(state))
+
+##
+#QueenTest
+#Description: MiniMax only considers moving its queen while she is on a
+#   construction
+##
+class QueenTest(unittest.TestCase):
+
+    def queenMoves(self, state):
+        player = AIPlayer(PLAYER_ONE)
+        player.startSearch(state)
+        player.expandNode(player.rootNode, 0, NO_MOVE, True)
+        queen = state.inventories[PLAYER_ONE].getQueen()
+        return [node.move for node in player.rootNode.children
+                if node.move.moveType == MOVE_ANT and node.move.coordList[0] == queen.coords]
+
+    def testQueenOffHill(self):
+        for seed in xrange(1, 4):
+            state = makeState(seed)
+            self.assertTrue(len(self.queenMoves(state)) > 0)
+            #walk the queen off her anthill and pass the turn back
+            queen = state.inventories[PLAYER_ONE].getQueen()
+            for move in listAllLegalMoves(state):
+                if move.moveType == MOVE_ANT and move.coordList[0] == queen.coords and \
+                   len(move.coordList) > 1 and getConstrAt(state, move.coordList[-1]) is None:
+                    applyMove(state, move)
+                    break
+            applyMove(state, Move(END, None, None))
+            applyMove(state, Move(END, None, None))
+            self.assertEqual(self.queenMoves(state), [])
+
+##
+#ReuseTest
+#Description: The next move of a turn starts from the subtree the last
+#   move's search built below the move made
+##
+class ReuseTest(unittest.TestCase):
+
+    def testSubtreeRetained(self):
+        for seed in xrange(1, 4):
+            state = makeState(seed).fastclone()
+            player = AIPlayer(PLAYER_ONE)
+            player.useTimeBudget = False
+            player.maxDepth = 3
+            move = player.getMove(state.fastclone())
+            self.assertNotEqual(move.moveType, END)
+            reused = player.reuseNode
+            self.assertTrue(reused is not None)
+            applyMove(state, move)
+
+            move = player.getMove(state.fastclone())
+            self.assertTrue(player.rootNode is reused)
+            self.assertTrue(player.getSearchStats()["nodes_retained"] > 1)
+            legal = [moveKey(m) for m in listAllLegalMoves(state)]
+            self.assertTrue(moveKey(move) in legal)
+
+    def testOtherPositionNotRetained(self):
+        state = makeState(1).fastclone()
+        player = AIPlayer(PLAYER_ONE)
+        player.useTimeBudget = False
+        player.maxDepth = 3
+        player.getMove(state.fastclone())
+        #the game goes somewhere the search didn't expect
+        applyMove(state, Move(END, None, None))
+        player.getMove(state.fastclone())
+        self.assertEqual(player.getSearchStats()["nodes_retained"], 0)
+
+##
+#GameTest
+#Description: Plays turns against Heuristic with every move's deadline
+#   running out partway through its search
+##
+class GameTest(unittest.TestCase):
+
+    def playTurns(self, player, seed, turns):
+        opponent = Heuristic.AIPlayer(PLAYER_TWO)
+        state = makeState(seed).fastclone()
+        for turn in xrange(turns * 2):
+            mover = player
+            if state.whoseTurn == PLAYER_TWO:
+                mover = opponent
+            move = None
+            while move is None or move.moveType != END:
+                move = mover.getMove(state.fastclone())
+                if mover is player and move.moveType != END:
+                    legal = [moveKey(m) for m in listAllLegalMoves(state)]
+                    self.assertTrue(moveKey(move) in legal)
+                applyMove(state, move)
+
+    def testExpiringDeadlines(self):
+        for seed in xrange(1, 4):
+            for checks in (20, 150):
+                player = AIPlayer(PLAYER_ONE)
+                player.clock = ExpiringClock(checks)
+                self.playTurns(player, seed, 3)
+
+    def testExpiringDeadlinesWithTurnPlanner(self):
+        for seed in xrange(1, 4):
+            player = AIPlayer(PLAYER_ONE)
+            player.useTurnPlanner = True
+            player.clock = ExpiringClock(30)
+            self.playTurns(player, seed, 3)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+from fixtures import makeState
+
+from Constants import *
+from Move import Move
+from AIPlayerUtils import listAllLegalMoves
+from MoveEngine import applyMove, undoMove, stateSignature
+from Zobrist import computeHash
+
+##
+#UndoTest
+#Description: Undoing any legal move, END included, puts the state back
+#   exactly as it was, hash and all
+##
+class UndoTest(unittest.TestCase):
+
+    def checkUndo(self, state, plies):
+        moves = listAllLegalMoves(state)
+        self.assertEqual(moves[-1].moveType, END)
+        signature = stateSignature(state)
+        stateHash = state.getHash()
+        for move in moves:
+            undo = applyMove(state, move)
+            self.assertEqual(state.getHash(), computeHash(state))
+            if plies > 1:
+                self.checkUndo(state, plies - 1)
+            undoMove(state, undo)
+            self.assertEqual(stateSignature(state), signature)
+            self.assertEqual(state.getHash(), stateHash)
+
+    def testEveryMoveWithBoard(self):
+        for seed in xrange(1, 6):
+            self.checkUndo(makeState(seed), 2)
+
+    def testEveryMoveWithoutBoard(self):
+        for seed in xrange(1, 6):
+            self.checkUndo(makeState(seed).fastclone(), 2)
+
+    def testEveryMoveAfterAnEnemyTurn(self):
+        #an enemy ant moved into our half of the board gives us attacks to undo
+        for seed in xrange(1, 4):
+            state = makeState(seed).fastclone()
+            applyMove(state, Move(END, None, None))
+            for move in listAllLegalMoves(state):
+                if move.moveType == MOVE_ANT and move.coordList[-1][1] <= 5:
+                    applyMove(state, move)
+                    break
+            applyMove(state, Move(END, None, None))
+            self.assertEqual(state.whoseTurn, PLAYER_ONE)
+            self.checkUndo(state, 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,34 @@
+import unittest
+import fixtures
+
+from Constants import *
+from Player import Player
+import Heuristic, MiniMax
+
+##
+#ListeningPlayer
+#Description: A player that overrides registerOpponentMove
+##
+class ListeningPlayer(Player):
+
+    def registerOpponentMove(self, currentState, move):
+        pass
+
+##
+#OpponentStateTest
+#Description: The game only clones the state after an opponent's move for
+#   players that use it
+##
+class OpponentStateTest(unittest.TestCase):
+
+    def testOnlyListenersGetTheState(self):
+        self.assertFalse(Heuristic.AIPlayer(PLAYER_ONE).wantsOpponentState())
+        self.assertTrue(ListeningPlayer(PLAYER_ONE, "listener").wantsOpponentState())
+
+    def testMiniMaxOnlyWhilePondering(self):
+        player = MiniMax.AIPlayer(PLAYER_ONE)
+        self.assertFalse(player.wantsOpponentState())
+        player.registerOpponentMove(None, MiniMax.Move(END, None, None))
+
+if __name__ == "__main__":
+    unittest.main()
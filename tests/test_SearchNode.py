@@ -0,0 +1,101 @@
+import unittest
+from fixtures import makeState
+
+from SearchNode import NodePool
+
+##
+#RecycleTest
+#Description: A pool hands the same nodes out again, cleared, once a search
+#   is recycled, and counts the nodes and states in use
+##
+class RecycleTest(unittest.TestCase):
+
+    def testNodesReused(self):
+        pool = NodePool()
+        first = [pool.new() for i in xrange(5)]
+        for node in first:
+            node.stateValue = 0.5
+            node.children = []
+        self.assertEqual(pool.getStats()["node_allocations"], 5)
+
+        pool.recycle()
+        pool.resetStats()
+        self.assertEqual(pool.getStats()["nodes_discarded"], 5)
+        second = [pool.new() for i in xrange(7)]
+        self.assertEqual(second[:5], first)
+        for node in second:
+            self.assertEqual(node.stateValue, 0.0)
+            self.assertEqual(node.children, None)
+        stats = pool.getStats()
+        self.assertEqual(stats["nodes_reused"], 5)
+        self.assertEqual(stats["node_allocations"], 2)
+        self.assertEqual(stats["pool_size"], 7)
+        self.assertEqual(stats["peak_nodes"], 7)
+
+    def testStatesCounted(self):
+        pool = NodePool()
+        state = makeState(1)
+        nodes = [pool.new() for i in xrange(3)]
+        for node in nodes:
+            pool.setState(node, state)
+        pool.setState(nodes[0], state)
+        self.assertEqual(pool.liveStates, 3)
+        pool.dropState(nodes[1])
+        pool.dropState(nodes[1])
+        self.assertEqual(pool.liveStates, 2)
+        self.assertEqual(nodes[1].state, None)
+        self.assertEqual(pool.getStats()["peak_states"], 3)
+        self.assertTrue(pool.peakBytes() > 0)
+
+        pool.recycle()
+        self.assertEqual(pool.liveStates, 0)
+        self.assertEqual(nodes[0].state, None)
+
+##
+#RetainTest
+#Description: Retaining a node keeps its subtree, as the root of the next
+#   search, and frees every other node
+##
+class RetainTest(unittest.TestCase):
+
+    def testSubtreeKept(self):
+        pool = NodePool()
+        state = makeState(1)
+        root = pool.new()
+        kept, other = pool.new(), pool.new()
+        root.children = [kept, other]
+        keptChildren = [pool.new(), pool.new()]
+        kept.children = keptChildren
+        other.children = [pool.new()]
+        stray = pool.new()
+        for node in keptChildren + [other, stray]:
+            node.parent = root
+            pool.setState(node, state)
+        kept.parent = root
+        kept.move = "move"
+        kept.moveKey = 12
+        kept.stateValue = 0.75
+
+        self.assertTrue(pool.retain(kept) is kept)
+        stats = pool.getStats()
+        self.assertEqual(stats["nodes_retained"], 3)
+        self.assertEqual(stats["nodes_discarded"], 4)
+        self.assertEqual(pool.used, 3)
+        self.assertEqual(pool.liveStates, 2)
+        self.assertEqual(kept.parent, None)
+        self.assertEqual(kept.move, None)
+        self.assertEqual(kept.moveKey, 0)
+        self.assertEqual(kept.stateValue, 0.75)
+        self.assertEqual(kept.children, keptChildren)
+        for node in (root, other, stray):
+            self.assertEqual(node.children, None)
+            self.assertEqual(node.state, None)
+
+        #new nodes come from the freed ones, never from the kept subtree
+        fresh = [pool.new() for i in xrange(4)]
+        for node in fresh:
+            self.assertFalse(node is kept or node in keptChildren)
+        self.assertEqual(pool.getStats()["node_allocations"], 7)
+
+if __name__ == "__main__":
+    unittest.main()
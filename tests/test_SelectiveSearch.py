@@ -0,0 +1,73 @@
+import unittest
+from fixtures import makeState, ExpiringClock
+
+from Constants import *
+import GeneticAlgorithm
+from SelectiveSearch import SelectiveSearch, nullWindow, failsToImprove, NULL_WINDOW
+from BeamWidth import FixedBeam
+from AIPlayerUtils import listAllLegalMoves
+from TranspositionTable import moveKey
+from MoveEngine import applyMove
+
+##
+#AspirationTest
+#Description: An aspiration search opens up the side of the window the value
+#   falls outside of and searches again
+##
+class AspirationTest(unittest.TestCase):
+
+    def testWindowOpened(self):
+        search = SelectiveSearch()
+        search.initSearch(1024 * 1024, FixedBeam(4))
+        search.useAspiration = True
+        windows = []
+        def searchRoot(alpha, beta):
+            windows.append((alpha, beta))
+            return 0.9
+        self.assertEqual(search.aspirationSearch(searchRoot, lambda value: value, 9999), 0.9)
+        self.assertEqual(search.rootValue, 0.9)
+
+        #the next value is far above the window around 0.9
+        windows = []
+        search.aspirationSearch(lambda alpha, beta: searchRoot(alpha, beta) + 0.05,
+                                lambda value: value, 9999)
+        self.assertEqual(len(windows), 2)
+        self.assertEqual(windows[1][1], 9999)
+        self.assertEqual(search.getSelectiveStats()["aspiration_researches"], 1)
+
+    def testNullWindow(self):
+        self.assertEqual(nullWindow(0.2, 0.6, True), (0.2, 0.2 + NULL_WINDOW))
+        self.assertEqual(nullWindow(0.2, 0.6, False), (0.6 - NULL_WINDOW, 0.6))
+        self.assertTrue(failsToImprove(0.2, 0.2, 0.6, True))
+        self.assertFalse(failsToImprove(0.3, 0.2, 0.6, True))
+        self.assertTrue(failsToImprove(0.6, 0.2, 0.6, False))
+
+##
+#CloneSearchTest
+#Description: GeneticAlgorithm finds legal moves through the shared clone
+#   search (NeuralNet's differs only in printing its network's error), with
+#   every selective technique on or off
+##
+class CloneSearchTest(unittest.TestCase):
+
+    def checkMoves(self, module, selective):
+        for seed in xrange(1, 3):
+            state = makeState(seed).fastclone()
+            player = module.AIPlayer(PLAYER_ONE)
+            player.firstMove = False
+            player.clock = ExpiringClock(60)
+            player.usePVS = player.useLMR = player.useFutility = selective
+            for i in xrange(3):
+                move = player.getMove(state.fastclone())
+                legal = [moveKey(m) for m in listAllLegalMoves(state)]
+                self.assertTrue(moveKey(move) in legal)
+                applyMove(state, move)
+                if move.moveType == END:
+                    break
+
+    def testGeneticAlgorithm(self):
+        self.checkMoves(GeneticAlgorithm, False)
+        self.checkMoves(GeneticAlgorithm, True)
+
+if __name__ == "__main__":
+    unittest.main()
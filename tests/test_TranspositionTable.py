@@ -0,0 +1,80 @@
+import unittest
+import fixtures
+
+from TranspositionTable import TranspositionTable, SharedTranspositionTable, \
+     EXACT, LOWER_BOUND, UPPER_BOUND, DEPTH_PREFERRED, TWO_TIER, \
+     ENTRY_KEY, ENTRY_DEPTH, ENTRY_FLAG, ENTRY_VALUE, ENTRY_MOVE
+
+##
+#SharedTableTest
+#Description: Entries read back from the shared table must be the ones
+#   stored, values included: a bound rounded on the way in could claim more
+#   than the search proved
+##
+class SharedTableTest(unittest.TestCase):
+
+    def testEntriesExact(self):
+        table = SharedTranspositionTable(1024 * 1024)
+        values = [0.5 + 1e-9, 0.123456789012, 0.7312 - 0.001, 1.0 - 1e-12, 9999.9, -9999.9]
+        for index, value in enumerate(values):
+            key = (index + 1) * 0x9e3779b97f4a7c15 & ((1 << 64) - 1)
+            table.store(key, index + 3, (LOWER_BOUND, UPPER_BOUND)[index % 2], value, index + 100)
+            entry = table.probe(key)
+            self.assertEqual(entry[ENTRY_KEY], key)
+            self.assertEqual(entry[ENTRY_DEPTH], index + 3)
+            self.assertEqual(entry[ENTRY_FLAG], (LOWER_BOUND, UPPER_BOUND)[index % 2])
+            self.assertEqual(entry[ENTRY_VALUE], value)
+            self.assertEqual(entry[ENTRY_MOVE], index + 100)
+
+##
+#ReplacementTest
+#Description: Positions that share a slot are kept or replaced as the
+#   replacement policy says, in both kinds of table
+##
+class ReplacementTest(unittest.TestCase):
+
+    def depths(self, table, keys):
+        depths = []
+        for key in keys:
+            entry = table.probe(key)
+            depths.append(entry and entry[ENTRY_DEPTH])
+        return depths
+
+    def testTwoTier(self):
+        for tableClass in (TranspositionTable, SharedTranspositionTable):
+            table = tableClass(64 * 1024, TWO_TIER)
+            #four positions that all land in the first slot
+            a, b, c, d = [n * table.slotCount for n in xrange(1, 5)]
+
+            table.store(a, 5, EXACT, 0.5, 1)
+            table.store(b, 2, EXACT, 0.5, 1)
+            #the shallower search goes in the always-replace entry
+            self.assertEqual(self.depths(table, (a, b)), [5, 2])
+            table.store(c, 1, EXACT, 0.5, 1)
+            self.assertEqual(self.depths(table, (a, b, c)), [5, None, 1])
+            #a deeper search takes over the depth-preferred entry
+            table.store(b, 6, EXACT, 0.5, 1)
+            self.assertEqual(self.depths(table, (a, b, c)), [None, 6, 1])
+            #moving a position into the depth-preferred entry leaves no copy
+            table.store(d, 0, EXACT, 0.5, 1)
+            table.store(d, 7, EXACT, 0.5, 1)
+            self.assertEqual(self.depths(table, (b, c, d)), [None, None, 7])
+            self.assertEqual(table.filled, 1)
+            #results from an earlier search are the first to go
+            table.newSearch()
+            table.store(a, 0, EXACT, 0.5, 1)
+            self.assertEqual(self.depths(table, (a, d)), [0, None])
+
+    def testDepthPreferred(self):
+        for tableClass in (TranspositionTable, SharedTranspositionTable):
+            table = tableClass(64 * 1024, DEPTH_PREFERRED)
+            a, b = table.slotCount, 2 * table.slotCount
+            table.store(a, 5, EXACT, 0.5, 1)
+            table.store(b, 2, EXACT, 0.5, 1)
+            self.assertEqual(self.depths(table, (a, b)), [5, None])
+            #the same position is always updated
+            table.store(a, 1, EXACT, 0.5, 1)
+            self.assertEqual(self.depths(table, (a,)), [1])
+
+if __name__ == "__main__":
+    unittest.main()
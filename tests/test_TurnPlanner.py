@@ -0,0 +1,33 @@
+import unittest
+from fixtures import makeState, ExpiringDeadline
+
+from Constants import *
+from TurnPlanner import TurnPlanner
+from MoveEngine import stateSignature
+from SearchTimer import SearchTimeout
+from Zobrist import computeHash
+
+##
+#TimeoutTest
+#Description: A turn search that runs out of time must leave the state it
+#   plans on as it found it
+##
+class TimeoutTest(unittest.TestCase):
+
+    def testStateRestored(self):
+        for seed in xrange(1, 4):
+            for checks in (0, 3, 10):
+                state = makeState(seed).fastclone()
+                hashKey = state.getHash()
+                signature = stateSignature(state)
+
+                planner = TurnPlanner(PLAYER_ONE, lambda s: 0.5)
+                planner.deadline = ExpiringDeadline(checks)
+                self.assertRaises(SearchTimeout, planner.search, state, 3, -1.0, 2.0)
+
+                self.assertEqual(state.getHash(), hashKey)
+                self.assertEqual(computeHash(state), hashKey)
+                self.assertEqual(stateSignature(state), signature)
+
+if __name__ == "__main__":
+    unittest.main()